@@ -0,0 +1,686 @@
+"""
+Local stand-in for a ServiceNow instance, for benchmarks and offline testing.
+
+Emulates the parts of the REST API the MCP server uses:
+
+- Table API (/api/now/table/{table}): list with sysparm_query, sysparm_fields,
+  sysparm_limit/offset and X-Total-Count; get, create, update and delete
+  by sys_id. Encoded queries are evaluated by a small matcher of the
+  mock's own, independent of the server's encoded_query translator, so a
+  translator bug shows up as a difference instead of the same wrong answer.
+  Terms with unknown fields or unsupported operators are ignored.
+- Aggregate API (/api/now/stats/{table}): count, sum/avg/min/max and group_by.
+- sys_db_object and sys_dictionary describing the seeded tables (incident
+  extends task), so schema lookups and validation work.
+- Basic auth with a session cookie, optional MFA push approval
+  (401 with X-Is-Logged-In until approved), and OAuth tokens from /oauth_token.do.
+- Injected latency and HTTP 429 responses with Retry-After.
+
+Usage:
+    python benchmarks/mock_servicenow.py --port 8080 --records 5000 --latency-ms 20
+
+The first line printed is "listening on <url>", so callers can start it with --port 0.
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from operator import ge, gt, le, lt
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+SYSTEM_FIELDS = {
+    'sys_id': 'GUID',
+    'sys_created_on': 'glide_date_time',
+    'sys_updated_on': 'glide_date_time',
+    'sys_class_name': 'sys_class_name'
+}
+
+# table -> (parent table, {field: internal type, or (reference, referenced table)})
+TABLES: Dict[str, Tuple[Optional[str], Dict]] = {
+    'task': (None, {
+        'number': 'string',
+        'short_description': 'string',
+        'description': 'string',
+        'priority': 'integer',
+        'state': 'integer',
+        'active': 'boolean',
+        'assigned_to': ('reference', 'sys_user'),
+        'opened_at': 'glide_date_time'
+    }),
+    'incident': ('task', {
+        'category': 'string',
+        'impact': 'integer',
+        'urgency': 'integer',
+        'caller_id': ('reference', 'sys_user')
+    }),
+    'sys_user': (None, {
+        'user_name': 'string',
+        'name': 'string',
+        'email': 'email',
+        'active': 'boolean'
+    }),
+    'sys_ui_action': (None, {
+        'name': 'string',
+        'table': 'table_name',
+        'action_name': 'string',
+        'script': 'script',
+        'active': 'boolean',
+        'order': 'integer'
+    }),
+    'sys_script': (None, {
+        'name': 'string',
+        'collection': 'table_name',
+        'when': 'string',
+        'script': 'script',
+        'active': 'boolean',
+        'order': 'integer'
+    }),
+    'sys_db_object': (None, {
+        'name': 'string',
+        'label': 'string',
+        'super_class': ('reference', 'sys_db_object')
+    }),
+    'sys_dictionary': (None, {
+        'name': 'string',
+        'element': 'string',
+        'column_label': 'string',
+        'internal_type': 'string',
+        'mandatory': 'boolean',
+        'max_length': 'integer',
+        'reference': 'string'
+    })
+}
+
+# Extra columns stored flat so dot-walked fields the server asks for can be returned
+EXTRA_COLUMNS = {'sys_db_object': ['super_class.name']}
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+STATS_AGGREGATES = ('sum', 'avg', 'min', 'max')
+
+# Operators the mock evaluates, longest first so NOT LIKE wins over LIKE and >= over >
+MATCH_OPERATORS = (
+    'NOT LIKE', 'NOT IN', 'ISNOTEMPTY', 'ISEMPTY', 'STARTSWITH', 'ENDSWITH',
+    'LIKE', 'IN', '!=', '>=', '<=', '=', '>', '<'
+)
+
+_FIELD_PATTERN = re.compile(r'^[a-z0-9_.]+')
+_NUMBER_PATTERN = re.compile(r'^-?\d+(\.\d+)?$')
+
+
+def table_fields(table: str) -> Dict:
+    """Fields of a table including inherited and system fields."""
+    parent, fields = TABLES[table]
+    merged = dict(SYSTEM_FIELDS)
+    if parent:
+        merged.update(table_fields(parent))
+    merged.update(fields)
+    return merged
+
+
+def _sort_key(value: Optional[str]):
+    """Numbers by value, everything else case-insensitively."""
+    value = value or ''
+    if _NUMBER_PATTERN.match(value):
+        return (0, float(value), '')
+    return (1, 0.0, value.lower())
+
+
+def _test(operator: str, operand: str) -> Callable[[Optional[str]], bool]:
+    """Predicate for one condition; string matches ignore case, as on an instance."""
+    target = operand.lower()
+    if operator == 'ISEMPTY':
+        return lambda value: not value
+    if operator == 'ISNOTEMPTY':
+        return lambda value: bool(value)
+    if operator in ('IN', 'NOT IN'):
+        options = {option.lower() for option in operand.split(',')}
+        return lambda value: ((value or '').lower() in options) == (operator == 'IN')
+    if operator == 'LIKE':
+        return lambda value: target in (value or '').lower()
+    if operator == 'NOT LIKE':
+        return lambda value: target not in (value or '').lower()
+    if operator == 'STARTSWITH':
+        return lambda value: (value or '').lower().startswith(target)
+    if operator == 'ENDSWITH':
+        return lambda value: (value or '').lower().endswith(target)
+    if operator == '=':
+        return lambda value: (value or '').lower() == target
+    if operator == '!=':
+        return lambda value: (value or '').lower() != target
+
+    compare = {'>': gt, '>=': ge, '<': lt, '<=': le}[operator]
+    right = _sort_key(operand)
+
+    def ordered(value: Optional[str]) -> bool:
+        left = _sort_key(value)
+        if left[0] != right[0]:
+            # A number and a string: compare both as strings
+            return compare((value or '').lower(), target)
+        return compare(left, right)
+    return ordered
+
+
+def compile_query(encoded_query: str, columns: List[str]) -> Tuple[Callable[[Dict], bool], List]:
+    """
+    Compile an encoded query into a row predicate and (field, descending) sort keys.
+
+    Supports ^, ^OR, ^NQ, ^^ (a literal caret), ORDERBY/ORDERBYDESC and
+    MATCH_OPERATORS with plain values; other terms are ignored.
+    """
+    branches: List[List[List[Tuple[str, Callable]]]] = []
+    order_by: List[Tuple[str, bool]] = []
+    for branch in (encoded_query or '').replace('^^', '\x00').split('^NQ'):
+        clauses: List[List[Tuple[str, Callable]]] = []
+        for term in branch.split('^'):
+            term = term.replace('\x00', '^')
+            if term.startswith('ORDERBYDESC') or term.startswith('ORDERBY'):
+                descending = term.startswith('ORDERBYDESC')
+                field = term[len('ORDERBYDESC' if descending else 'ORDERBY'):]
+                if field in columns:
+                    order_by.append((field, descending))
+                continue
+
+            is_or = term.startswith('OR')
+            body = term[2:] if is_or else term
+            match = _FIELD_PATTERN.match(body)
+            if not match or match.group() not in columns:
+                continue
+            rest = body[match.end():]
+            operator = next((op for op in MATCH_OPERATORS if rest.startswith(op)), None)
+            if operator is None or rest.startswith('javascript:', len(operator)):
+                continue
+            condition = (match.group(), _test(operator, rest[len(operator):]))
+            if is_or and clauses:
+                clauses[-1].append(condition)
+            else:
+                clauses.append([condition])
+        if clauses:
+            branches.append(clauses)
+
+    def matches(row: Dict) -> bool:
+        if not branches:
+            return True
+        return any(
+            all(any(test(row.get(field)) for field, test in clause) for clause in clauses)
+            for clauses in branches
+        )
+
+    return matches, order_by
+
+
+class MockInstance:
+    """In-memory tables and the behavior knobs of the mock instance."""
+
+    def __init__(
+        self,
+        records: int = 1000,
+        username: str = 'admin',
+        password: str = 'admin',
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        throttle_rate: float = 0,
+        retry_after: float = 1,
+        mfa_delay: Optional[float] = None,
+        seed: int = 1
+    ):
+        self.username = username
+        self.password = password
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.mfa_delay = mfa_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.tokens = set()
+        self.mfa_started: Dict[str, float] = {}
+        self.counters = {'requests': 0, 'throttled': 0, 'unauthorized': 0}
+
+        self.db = sqlite3.connect(':memory:', check_same_thread=False)
+        # Decoded rows of each table, dropped on writes, so queries do not re-read SQLite
+        self._rows: Dict[str, List[Dict]] = {}
+        self.columns: Dict[str, List[str]] = {}
+        for table in TABLES:
+            self.columns[table] = list(table_fields(table)) + EXTRA_COLUMNS.get(table, [])
+            column_sql = ', '.join(f'"{column}" TEXT' for column in self.columns[table])
+            self.db.execute(f'CREATE TABLE "{table}" ({column_sql})')
+            self.db.execute(f'CREATE UNIQUE INDEX "{table}_sys_id" ON "{table}" ("sys_id")')
+        self._seed(records)
+
+    def count(self, counter: str):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def _insert(self, table: str, row: Dict) -> Dict:
+        now = datetime.utcnow().strftime(DATETIME_FORMAT)
+        row = {
+            'sys_id': uuid.uuid4().hex,
+            'sys_created_on': now,
+            'sys_updated_on': now,
+            'sys_class_name': table,
+            **row
+        }
+        row = {key: value for key, value in row.items() if key in self.columns[table]}
+        columns = ', '.join(f'"{key}"' for key in row)
+        placeholders = ', '.join('?' for _ in row)
+        self.db.execute(
+            f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})',
+            [None if value is None else str(value) for value in row.values()]
+        )
+        return row
+
+    def _seed(self, records: int):
+        rand = self.random
+        start = datetime.utcnow() - timedelta(days=30)
+
+        def moment(index: int, total: int) -> str:
+            return (start + timedelta(days=30) * index / max(total, 1)).strftime(DATETIME_FORMAT)
+
+        table_ids = {}
+        for table, (parent, fields) in TABLES.items():
+            table_ids[table] = self._insert('sys_db_object', {
+                'name': table,
+                'label': table.replace('_', ' ').title(),
+                'super_class': table_ids.get(parent, ''),
+                'super_class.name': parent or ''
+            })['sys_id']
+        for table, (parent, fields) in TABLES.items():
+            own = dict(fields) if parent else {**SYSTEM_FIELDS, **fields}
+            self._insert('sys_dictionary', {'name': table, 'element': ''})
+            for element, kind in own.items():
+                reference = kind[1] if isinstance(kind, tuple) else ''
+                self._insert('sys_dictionary', {
+                    'name': table,
+                    'element': element,
+                    'column_label': element.replace('_', ' ').title(),
+                    'internal_type': 'reference' if reference else kind,
+                    'mandatory': 'true' if element == 'sys_id' else 'false',
+                    'max_length': 40 if reference else 255,
+                    'reference': reference
+                })
+
+        users = []
+        for index in range(100):
+            users.append(self._insert('sys_user', {
+                'user_name': f'user{index}',
+                'name': f'User {index}',
+                'email': f'user{index}@example.com',
+                'active': 'true',
+                'sys_updated_on': moment(index, 100)
+            })['sys_id'])
+
+        categories = ('inquiry', 'software', 'hardware', 'network', 'database')
+        for index in range(records):
+            self._insert('incident', {
+                'number': f'INC{index:07d}',
+                'short_description': f'Incident {index} reported by monitoring',
+                'description': 'Benchmark record. ' * rand.randint(1, 20),
+                'priority': rand.randint(1, 5),
+                'state': rand.choice((1, 2, 3, 6, 7)),
+                'active': rand.choice(('true', 'false')),
+                'assigned_to': rand.choice(users),
+                'caller_id': rand.choice(users),
+                'category': rand.choice(categories),
+                'impact': rand.randint(1, 3),
+                'urgency': rand.randint(1, 3),
+                'opened_at': moment(index, records),
+                'sys_created_on': moment(index, records),
+                'sys_updated_on': moment(index, records)
+            })
+
+        for index in range(30):
+            self._insert('sys_ui_action', {
+                'name': f'Action {index}',
+                'table': 'incident',
+                'action_name': f'action_{index}',
+                'script': 'current.update();',
+                'active': 'true',
+                'order': index * 100
+            })
+            self._insert('sys_script', {
+                'name': f'Business rule {index}',
+                'collection': 'incident',
+                'when': rand.choice(('before', 'after', 'async')),
+                'script': '(function executeRule(current, previous) {})(current, previous);',
+                'active': 'true',
+                'order': index * 100
+            })
+        self.db.commit()
+
+    def query(self, table: str, encoded_query: str) -> List[Dict]:
+        """Rows matching encoded_query in its order, by sys_id when it has no ORDERBY."""
+        matches, order_by = compile_query(encoded_query, self.columns[table])
+        with self.lock:
+            if table not in self._rows:
+                cursor = self.db.execute(f'SELECT * FROM "{table}" ORDER BY "sys_id"')
+                names = [description[0] for description in cursor.description]
+                self._rows[table] = [dict(zip(names, values)) for values in cursor]
+            rows = [row for row in self._rows[table] if matches(row)]
+
+        for field, descending in reversed(order_by):
+            rows.sort(key=lambda row: _sort_key(row.get(field)), reverse=descending)
+        return rows
+
+    def select(self, table: str, encoded_query: str, limit: int, offset: int) -> Tuple[List[Dict], int]:
+        rows = self.query(table, encoded_query)
+        return rows[offset:offset + limit], len(rows)
+
+    def get(self, table: str, sys_id: str) -> Optional[Dict]:
+        with self.lock:
+            cursor = self.db.execute(f'SELECT * FROM "{table}" WHERE "sys_id" = ?', [sys_id])
+            names = [description[0] for description in cursor.description]
+            row = cursor.fetchone()
+        return dict(zip(names, row)) if row else None
+
+    def create(self, table: str, data: Dict) -> Dict:
+        data = {key: value for key, value in data.items() if key != 'sys_id'}
+        if table in ('incident', 'task') and 'number' not in data:
+            data['number'] = f'INC{secrets.randbelow(10 ** 7):07d}'
+        with self.lock:
+            row = self._insert(table, data)
+            self.db.commit()
+            self._rows.pop(table, None)
+        return self.get(table, row['sys_id'])
+
+    def update(self, table: str, sys_id: str, data: Dict) -> Optional[Dict]:
+        data = {key: value for key, value in data.items() if key in self.columns[table] and key != 'sys_id'}
+        data['sys_updated_on'] = datetime.utcnow().strftime(DATETIME_FORMAT)
+        assignments = ', '.join(f'"{key}" = ?' for key in data)
+        with self.lock:
+            cursor = self.db.execute(
+                f'UPDATE "{table}" SET {assignments} WHERE "sys_id" = ?',
+                [None if value is None else str(value) for value in data.values()] + [sys_id]
+            )
+            self.db.commit()
+            self._rows.pop(table, None)
+        return self.get(table, sys_id) if cursor.rowcount else None
+
+    def delete(self, table: str, sys_id: str) -> bool:
+        with self.lock:
+            cursor = self.db.execute(f'DELETE FROM "{table}" WHERE "sys_id" = ?', [sys_id])
+            self.db.commit()
+            self._rows.pop(table, None)
+        return cursor.rowcount > 0
+
+    def stats(self, table: str, params: Dict[str, str]) -> object:
+        """Aggregate API result: one object, or a list of groups with group_by."""
+        rows = self.query(table, params.get('sysparm_query', ''))
+        group_by = [field for field in params.get('sysparm_group_by', '').split(',') if field]
+        selects: List[Tuple[str, Optional[str]]] = []
+        if params.get('sysparm_count') == 'true':
+            selects.append(('count', None))
+        for aggregate in STATS_AGGREGATES:
+            for field in filter(None, params.get(f'sysparm_{aggregate}_fields', '').split(',')):
+                selects.append((aggregate, field))
+
+        grouped: Dict[Tuple, List[Dict]] = {}
+        for row in rows:
+            grouped.setdefault(tuple(row.get(field) or '' for field in group_by), []).append(row)
+        if not group_by:
+            grouped = {(): rows}
+
+        groups = []
+        for key in sorted(grouped, key=lambda key: [_sort_key(value) for value in key]):
+            members = grouped[key]
+            stats: Dict = {}
+            for aggregate, field in selects:
+                if field is None:
+                    stats['count'] = str(len(members))
+                    continue
+                numbers = [float(row[field]) for row in members if _NUMBER_PATTERN.match(row.get(field) or '')]
+                if not numbers:
+                    value = ''
+                elif aggregate == 'sum':
+                    value = str(sum(numbers))
+                elif aggregate == 'avg':
+                    value = str(sum(numbers) / len(numbers))
+                else:
+                    value = str(min(numbers) if aggregate == 'min' else max(numbers))
+                stats.setdefault(aggregate, {})[field] = value
+            group = {'stats': stats}
+            if group_by:
+                group['groupby_fields'] = [
+                    {'field': field, 'value': value} for field, value in zip(group_by, key)
+                ]
+            groups.append(group)
+        return groups if group_by else groups[0]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """HTTP handler; keep-alive so pooled clients reuse connections as they would on an instance."""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, delayed ACKs add ~40ms per response
+    disable_nagle_algorithm = True
+    instance: MockInstance = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Optional[object] = None, headers: Optional[Dict] = None):
+        payload = b'' if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _authorized(self) -> Tuple[bool, Dict]:
+        """Check credentials; returns (authorized, headers to send)."""
+        instance = self.instance
+        cookie = self.headers.get('Cookie', '')
+        if any(part.strip().startswith('JSESSIONID=') and part.strip()[11:] in instance.sessions
+               for part in cookie.split(';')):
+            return True, {}
+
+        authorization = self.headers.get('Authorization', '')
+        if authorization.startswith('Bearer '):
+            return authorization[7:] in instance.tokens, {}
+        if not authorization.startswith('Basic '):
+            return False, {}
+        try:
+            username, _, password = base64.b64decode(authorization[6:]).decode().partition(':')
+        except ValueError:
+            return False, {}
+        if (username, password) != (instance.username, instance.password):
+            return False, {}
+
+        if instance.mfa_delay is not None:
+            with instance.lock:
+                started = instance.mfa_started.setdefault(username, time.monotonic())
+            if time.monotonic() - started < instance.mfa_delay:
+                # Waiting for the push approval
+                return False, {'X-Is-Logged-In': 'false'}
+
+        session_id = secrets.token_hex(16)
+        instance.sessions.add(session_id)
+        return True, {'Set-Cookie': f'JSESSIONID={session_id}; Path=/'}
+
+    def _handle(self, method: str):
+        instance = self.instance
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        body = self._body()
+        instance.count('requests')
+
+        if instance.latency_ms or instance.jitter_ms:
+            time.sleep((instance.latency_ms + instance.random.uniform(0, instance.jitter_ms)) / 1000)
+
+        if url.path == '/oauth_token.do' and method == 'POST':
+            return self._token(dict((k, v[-1]) for k, v in parse_qs(body.decode()).items()))
+
+        authorized, auth_headers = self._authorized()
+        if not authorized:
+            instance.count('unauthorized')
+            return self._send(401, {'error': {'message': 'User Not Authenticated'}}, auth_headers)
+
+        if instance.throttle_rate and instance.random.random() < instance.throttle_rate:
+            instance.count('throttled')
+            return self._send(
+                429, {'error': {'message': 'Rate limit exceeded'}},
+                {'Retry-After': instance.retry_after, **auth_headers}
+            )
+
+        parts = [part for part in url.path.split('/') if part]
+        if parts[:3] == ['api', 'now', 'stats'] and len(parts) == 4 and method == 'GET':
+            if parts[3] not in TABLES:
+                return self._send(400, {'error': {'message': 'Invalid table'}})
+            return self._send(200, {'result': instance.stats(parts[3], params)}, auth_headers)
+        if parts[:3] != ['api', 'now', 'table'] or len(parts) not in (4, 5):
+            return self._send(404, {'error': {'message': 'Requested URI does not represent any resource'}})
+
+        table = parts[3]
+        if table not in TABLES:
+            return self._send(400, {'error': {'message': 'Invalid table ' + table}})
+        sys_id = parts[4] if len(parts) == 5 else None
+
+        if method == 'GET' and sys_id is None:
+            limit = int(params.get('sysparm_limit') or 10000)
+            offset = int(params.get('sysparm_offset') or 0)
+            rows, total = instance.select(table, params.get('sysparm_query', ''), limit, offset)
+            headers = dict(auth_headers)
+            if params.get('sysparm_no_count') != 'true':
+                headers['X-Total-Count'] = total
+            return self._send(200, {'result': [self._render(table, row, params) for row in rows]}, headers)
+
+        if method == 'POST' and sys_id is None:
+            row = instance.create(table, json.loads(body or b'{}'))
+            return self._send(201, {'result': self._render(table, row, params)}, auth_headers)
+
+        if sys_id is None:
+            return self._send(405, {'error': {'message': 'Method not supported'}})
+        if method == 'GET':
+            row = instance.get(table, sys_id)
+        elif method in ('PUT', 'PATCH'):
+            row = instance.update(table, sys_id, json.loads(body or b'{}'))
+        elif method == 'DELETE':
+            if not instance.delete(table, sys_id):
+                return self._send(404, {'error': {'message': 'No Record found'}})
+            return self._send(204, None, auth_headers)
+        else:
+            return self._send(405, {'error': {'message': 'Method not supported'}})
+
+        if row is None:
+            return self._send(404, {'error': {'message': 'No Record found'}})
+        return self._send(200, {'result': self._render(table, row, params)}, auth_headers)
+
+    def _render(self, table: str, row: Dict, params: Dict[str, str]) -> Dict:
+        """Apply sysparm_fields and reference link formatting to a stored row."""
+        fields = [field for field in params.get('sysparm_fields', '').split(',') if field]
+        if fields:
+            row = {field: row.get(field, '') for field in fields}
+        else:
+            row = {key: value for key, value in row.items() if '.' not in key}
+        row = {key: '' if value is None else value for key, value in row.items()}
+
+        if params.get('sysparm_exclude_reference_link') != 'true':
+            base = f"http://{self.headers.get('Host', 'localhost')}/api/now/table"
+            for field, kind in table_fields(table).items():
+                if isinstance(kind, tuple) and row.get(field):
+                    row[field] = {'link': f"{base}/{kind[1]}/{row[field]}", 'value': row[field]}
+        return row
+
+    def _token(self, form: Dict[str, str]):
+        instance = self.instance
+        grant_type = form.get('grant_type')
+        if grant_type == 'password' and (form.get('username'), form.get('password')) != (
+            instance.username, instance.password
+        ):
+            return self._send(401, {'error': 'access_denied'})
+        if grant_type not in ('password', 'client_credentials', 'refresh_token'):
+            return self._send(400, {'error': 'unsupported_grant_type'})
+        token = secrets.token_hex(16)
+        instance.tokens.add(token)
+        return self._send(200, {
+            'access_token': token,
+            'refresh_token': secrets.token_hex(16),
+            'token_type': 'Bearer',
+            'expires_in': 1800
+        })
+
+    def _dispatch(self, method: str):
+        try:
+            self._handle(method)
+        except (ValueError, sqlite3.Error) as e:
+            self._send(500, {'error': {'message': str(e)}})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+
+def serve(instance: MockInstance, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Start the mock on a background thread; the bound port is server.server_address[1]."""
+    handler = type('BoundMockHandler', (MockHandler,), {'instance': instance})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock ServiceNow instance for benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='Port to listen on (default: any free port)')
+    parser.add_argument('--records', type=int, default=1000, help='Incident records to seed (default: 1000)')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra delay, up to this much')
+    parser.add_argument('--throttle-rate', type=float, default=0, help='Fraction of requests answered 429')
+    parser.add_argument('--retry-after', type=float, default=1, help='Retry-After seconds sent with 429')
+    parser.add_argument('--mfa-delay', type=float, help='Seconds until a basic auth login is MFA-approved')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    instance = MockInstance(
+        records=args.records,
+        username=args.username,
+        password=args.password,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        mfa_delay=args.mfa_delay,
+        seed=args.seed
+    )
+    server = serve(instance, args.host, args.port)
+    print(f"listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
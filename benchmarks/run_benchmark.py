@@ -0,0 +1,316 @@
+"""
+Benchmark tool calls against the local mock ServiceNow instance.
+
+Starts benchmarks/mock_servicenow.py, points a ServiceNowMCPServer at it
+and drives its call_tool handler in-process: each scenario makes --calls
+tool calls with a fixed number in flight, for every combination of
+concurrency and record count. Reports p50/p99 latency, calls/s and the
+peak RSS of this process (which hosts the server; the mock runs in its own
+process). Peak RSS only grows, so each row shows the peak up to that scenario.
+
+Results can be saved with --json and compared against a saved baseline
+with --compare; the exit status is 1 when a scenario regressed by more than
+--tolerance, so the script can gate changes offline.
+
+Usage:
+    python benchmarks/run_benchmark.py [--concurrency 1,8,32] [--records 10,100,1000]
+        [--calls 200] [--latency-ms 20] [--throttle-rate 0.05]
+        [--json results.json] [--compare baseline.json --tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+INSTANCE = 'mock'
+
+# Tries of each setup request, which the mock may answer with 429
+SETUP_ATTEMPTS = 20
+
+CONFIG_TEMPLATE = """\
+instances:
+  {instance}:
+    url: {url}
+    username: admin
+    password: admin
+session:
+  cache_location: {tmp}/sessions.json
+schema_catalog:
+  location: {tmp}/schema
+sync:
+  location: {tmp}/mirror
+rate_limit:
+  requests_per_second: {requests_per_second}
+  burst: {burst}
+"""
+
+# Metrics compared by --compare, and whether a higher value is better
+COMPARED_METRICS = {'p50_ms': False, 'p99_ms': False, 'calls_per_second': True}
+
+
+def start_mock(args: argparse.Namespace, records: int) -> subprocess.Popen:
+    """Start the mock instance; its URL is the process's url attribute."""
+    command = [
+        sys.executable, str(Path(__file__).parent / 'mock_servicenow.py'),
+        '--records', str(records),
+        '--latency-ms', str(args.latency_ms),
+        '--jitter-ms', str(args.jitter_ms),
+        '--throttle-rate', str(args.throttle_rate),
+        '--retry-after', str(args.retry_after)
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, cwd=str(PROJECT_ROOT))
+    line = process.stdout.readline()
+    if not line.startswith('listening on '):
+        process.kill()
+        raise RuntimeError("Mock ServiceNow instance failed to start")
+    process.url = line.split()[-1]
+    return process
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def tool_arguments(tool: str, index: int, records: int, sys_ids: List[str]) -> Dict:
+    """Arguments for the index-th call of a scenario."""
+    if tool == 'get_records':
+        return {'instance': INSTANCE, 'table': 'incident', 'limit': records,
+                'query': f'priority>={index % 3 + 1}^ORDERBYnumber'}
+    if tool == 'get_record':
+        return {'instance': INSTANCE, 'table': 'incident', 'sys_id': sys_ids[index % len(sys_ids)]}
+    if tool == 'get_aggregates':
+        return {'instance': INSTANCE, 'table': 'incident', 'group_by': ['priority'],
+                'avg_fields': ['impact'], 'query': f'state!={index % 5}'}
+    if tool == 'get_table_schema':
+        return {'instance': INSTANCE, 'table': 'incident'}
+    raise ValueError(f"No benchmark arguments for tool '{tool}'")
+
+
+async def run_scenario(call, tool: str, concurrency: int, records: int, calls: int,
+                       sys_ids: List[str]) -> Dict:
+    """Make calls tool calls with concurrency of them in flight at a time."""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < calls:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            text = await call(tool, tool_arguments(tool, index, records, sys_ids))
+            latencies.append((time.perf_counter() - started) * 1000)
+            if text.startswith('Error:'):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'name': f"{tool} records={records} concurrency={concurrency}",
+        'tool': tool,
+        'records': records,
+        'concurrency': concurrency,
+        'calls': calls,
+        'errors': errors,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'calls_per_second': round(calls / elapsed, 2),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+async def run_benchmark(args: argparse.Namespace, url: str) -> List[Dict]:
+    import httpx
+    from mcp.types import CallToolRequest, CallToolRequestParams
+
+    from servicenow_mcp.auth import AuthenticationError, ServiceNowAuth
+    from servicenow_mcp.mcp_server.server import ServiceNowMCPServer
+    from servicenow_mcp.session_cache import SessionCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, 'instances.yaml')
+        with open(config_path, 'w') as f:
+            f.write(CONFIG_TEMPLATE.format(
+                instance=INSTANCE,
+                url=url,
+                tmp=tmp,
+                requests_per_second=args.requests_per_second,
+                burst=max(1, int(args.requests_per_second))
+            ))
+        os.environ['SERVICENOW_MCP_CONFIG'] = config_path
+
+        # Log in the way sn-connect does, so the server starts from a cached session;
+        # setup requests are retried because the mock may be injecting 429s
+        for attempt in range(SETUP_ATTEMPTS):
+            try:
+                session = ServiceNowAuth(url, 'admin', 'admin', output=lambda message: None).authenticate(
+                    interactive=False
+                )
+                break
+            except AuthenticationError:
+                if attempt == SETUP_ATTEMPTS - 1:
+                    raise
+        SessionCache(cache_path=os.path.join(tmp, 'sessions.json')).save_session(INSTANCE, session)
+
+        for _ in range(SETUP_ATTEMPTS):
+            response = httpx.get(
+                f"{url}/api/now/table/incident",
+                params={'sysparm_fields': 'sys_id', 'sysparm_limit': 500},
+                auth=('admin', 'admin')
+            )
+            if response.status_code != 429:
+                break
+        response.raise_for_status()
+        sys_ids = [row['sys_id'] for row in response.json()['result']]
+
+        server = ServiceNowMCPServer()
+        # Retries of injected 429s are logged at INFO; keep the report readable
+        logging.getLogger('servicenow_mcp').setLevel(logging.WARNING)
+        handler = server.app.request_handlers[CallToolRequest]
+
+        async def call(name: str, arguments: Dict) -> str:
+            result = await handler(CallToolRequest(
+                method='tools/call', params=CallToolRequestParams(name=name, arguments=arguments)
+            ))
+            return result.root.content[0].text
+
+        results = []
+        try:
+            for tool in args.tools:
+                # Record count only changes the get_records workload
+                record_counts = args.records if tool == 'get_records' else [args.records[0]]
+                for records in record_counts:
+                    for _ in range(args.warmup):
+                        await call(tool, tool_arguments(tool, 0, records, sys_ids))
+                    for concurrency in args.concurrency:
+                        result = await run_scenario(call, tool, concurrency, records, args.calls, sys_ids)
+                        results.append(result)
+                        print_row(result)
+        finally:
+            await server.session_pool.close_all()
+        return results
+
+
+def print_row(result: Dict):
+    rss = result['peak_rss_mb']
+    print(
+        f"{result['name']:<48}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+        f"{result['calls_per_second']:>10.1f}{result['errors']:>8}"
+        f"{rss if rss is None else round(rss, 1):>10}",
+        flush=True
+    )
+
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float) -> List[str]:
+    """List the scenarios that regressed by more than tolerance against the baseline."""
+    with open(baseline_path, 'r') as f:
+        baseline = {result['name']: result for result in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result['name'])
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous[metric], result[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{result['name']}: {metric} {old} -> {new} ({change:+.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tool calls against a mock ServiceNow instance')
+    parser.add_argument('--tools', default='get_records,get_record,get_aggregates',
+                        help='Comma-separated tools to benchmark (default: get_records,get_record,get_aggregates)')
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated calls in flight (default: 1,8,32)')
+    parser.add_argument('--records', default='10,100,1000',
+                        help='Comma-separated get_records limits (default: 10,100,1000)')
+    parser.add_argument('--calls', type=int, default=200, help='Calls per scenario (default: 200)')
+    parser.add_argument('--warmup', type=int, default=3, help='Unmeasured calls before each record count')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Mock response delay')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Mock random extra delay, up to this much')
+    parser.add_argument('--throttle-rate', type=float, default=0, help='Fraction of mock responses that are 429')
+    parser.add_argument('--retry-after', type=float, default=0, help='Retry-After seconds of mock 429 responses')
+    parser.add_argument('--requests-per-second', type=float, default=10000,
+                        help='Server rate limit for the mock instance (default: 10000, effectively off)')
+    parser.add_argument('--json', dest='json_path', help='Write results to this file')
+    parser.add_argument('--compare', help='Baseline results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative slowdown against the baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    args.tools = [tool for tool in args.tools.split(',') if tool]
+    args.concurrency = [int(value) for value in args.concurrency.split(',')]
+    args.records = [int(value) for value in args.records.split(',')]
+
+    mock = start_mock(args, max(args.records + [500]))
+    try:
+        print(f"{'scenario':<48}{'p50 ms':>10}{'p99 ms':>10}{'calls/s':>10}{'errors':>8}{'rss MB':>10}")
+        results = asyncio.run(run_benchmark(args, mock.url))
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'options': {key: getattr(args, key) for key in (
+                    'calls', 'latency_ms', 'jitter_ms', 'throttle_rate', 'retry_after',
+                    'requests_per_second'
+                )},
+                'results': results
+            }, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Measure MCP server cold start: process launch to the initialize response.
+
+Each run spawns a fresh server over stdio, as MCP clients do per session,
+sends initialize and then tools/list twice, and reports the latency of
+each step. The first run also parses instances.yaml; later runs load the
+config snapshot.
+
+Usage:
+    python benchmarks/startup.py [--runs 10] [--config path/to/instances.yaml]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Used when no --config is given; the server does not contact instances at startup
+SAMPLE_CONFIG = """\
+instances:
+  benchmark:
+    url: https://benchmark.service-now.com
+    username: admin
+"""
+
+
+def _send(process: subprocess.Popen, message: Dict):
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def _receive(process: subprocess.Popen, request_id: int) -> Dict:
+    """Read messages until the response to request_id arrives."""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("Server exited before responding")
+        message = json.loads(line)
+        if message.get('id') == request_id:
+            if 'error' in message:
+                raise RuntimeError(f"Server returned an error: {message['error']}")
+            return message
+
+
+def run_once(command: List[str], env: Dict[str, str]) -> Dict[str, float]:
+    """Start one server and time initialize and two tools/list requests, in milliseconds."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        cwd=str(PROJECT_ROOT),
+        text=True
+    )
+    timings = {}
+    try:
+        _send(process, {
+            'jsonrpc': '2.0',
+            'id': 1,
+            'method': 'initialize',
+            'params': {
+                'protocolVersion': '2024-11-05',
+                'capabilities': {},
+                'clientInfo': {'name': 'startup-benchmark', 'version': '1.0'}
+            }
+        })
+        _receive(process, 1)
+        timings['initialize'] = (time.perf_counter() - started) * 1000
+        _send(process, {'jsonrpc': '2.0', 'method': 'notifications/initialized'})
+
+        for request_id, label in ((2, 'tools_list_first'), (3, 'tools_list_repeat')):
+            sent = time.perf_counter()
+            _send(process, {'jsonrpc': '2.0', 'id': request_id, 'method': 'tools/list'})
+            tools = _receive(process, request_id)['result']['tools']
+            timings[label] = (time.perf_counter() - sent) * 1000
+        timings['tools'] = len(tools)
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure MCP server startup time')
+    parser.add_argument('--runs', type=int, default=10, help='Server launches to time (default: 10)')
+    parser.add_argument('--config', help='instances.yaml to start with (default: a one-instance sample)')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get('PYTHONPATH')]))
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = args.config
+        if config_path is None:
+            config_path = os.path.join(tmp, 'instances.yaml')
+            with open(config_path, 'w') as f:
+                f.write(SAMPLE_CONFIG)
+        env['SERVICENOW_MCP_CONFIG'] = os.path.abspath(config_path)
+
+        command = [sys.executable, '-m', 'servicenow_mcp.main']
+        runs = [run_once(command, env) for _ in range(args.runs)]
+
+    print(f"{args.runs} runs, {runs[0]['tools']} tools")
+    print(f"{'step':<20}{'first':>10}{'min':>10}{'median':>10}{'max':>10}  (ms)")
+    for step in ('initialize', 'tools_list_first', 'tools_list_repeat'):
+        values = [run[step] for run in runs]
+        print(
+            f"{step:<20}{values[0]:>10.1f}{min(values):>10.1f}"
+            f"{statistics.median(values):>10.1f}{max(values):>10.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,17 @@
 """Authentication module for ServiceNow."""
 
-from .servicenow_auth import ServiceNowAuth
+from .errors import AuthenticationError
 
-__all__ = ['ServiceNowAuth']
+__all__ = ['AuthenticationError', 'OAuthTokenAuth', 'ServiceNowAuth']
+
+
+def __getattr__(name):
+    # ServiceNowAuth needs requests and OAuthTokenAuth needs httpx, which not every
+    # importer of this package does; import them on first use
+    if name == 'ServiceNowAuth':
+        from .servicenow_auth import ServiceNowAuth
+        return ServiceNowAuth
+    if name == 'OAuthTokenAuth':
+        from .oauth import OAuthTokenAuth
+        return OAuthTokenAuth
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
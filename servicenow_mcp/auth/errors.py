@@ -0,0 +1,6 @@
+"""Authentication errors, importable without the HTTP client libraries."""
+
+
+class AuthenticationError(Exception):
+    """Raised when authentication fails."""
+    pass
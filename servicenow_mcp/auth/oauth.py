@@ -0,0 +1,196 @@
+"""OAuth 2.0 bearer token authentication against a ServiceNow instance."""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import AsyncGenerator, Callable, Dict, List, Optional
+
+import httpx
+
+
+TOKEN_PATH = "/oauth_token.do"
+
+GRANT_TYPES = ('password', 'client_credentials')
+
+
+def token_request_data(
+    grant_type: str,
+    oauth_config: Dict,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    refresh_token: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Build the form body of a token request.
+
+    Args:
+        grant_type: password, client_credentials or refresh_token
+        oauth_config: Instance OAuth settings with client_id and client_secret
+        username: User for the password grant
+        password: Password for the password grant
+        refresh_token: Token for the refresh_token grant
+    """
+    data = {
+        'grant_type': grant_type,
+        'client_id': oauth_config['client_id'],
+        'client_secret': oauth_config.get('client_secret') or ''
+    }
+    if grant_type == 'password':
+        data.update({'username': username or '', 'password': password or ''})
+    elif grant_type == 'refresh_token':
+        data['refresh_token'] = refresh_token or ''
+    elif grant_type != 'client_credentials':
+        raise ValueError(
+            f"Unknown OAuth grant type '{grant_type}'. Use one of: {', '.join(GRANT_TYPES)}"
+        )
+    return data
+
+
+def new_oauth_session(instance_url: str) -> Dict:
+    """Session data without a token yet; OAuthTokenAuth obtains one on first use."""
+    return {
+        'auth_mode': 'oauth',
+        'instance_url': instance_url,
+        'cookies': {},
+        'authenticated_at': datetime.now().isoformat()
+    }
+
+
+def session_from_token(token: Dict, instance_url: str, previous: Optional[Dict] = None) -> Dict:
+    """
+    Build cached session data from a token endpoint response.
+
+    A refresh keeps the original authenticated_at, so pooled clients built
+    from the session stay valid, and keeps the refresh token if the
+    instance did not rotate it.
+    """
+    previous = previous or {}
+    return {
+        'auth_mode': 'oauth',
+        'token_type': token.get('token_type', 'Bearer'),
+        'access_token': token['access_token'],
+        'refresh_token': token.get('refresh_token') or previous.get('refresh_token'),
+        'access_token_expires_at': time.time() + float(token.get('expires_in', 1800)),
+        'instance_url': instance_url,
+        'cookies': {},
+        'authenticated_at': previous.get('authenticated_at') or datetime.now().isoformat()
+    }
+
+
+class OAuthTokenAuth(httpx.Auth):
+    """
+    httpx.AsyncClient authentication presenting a bearer token and renewing it before expiry.
+
+    The token is renewed when it is within refresh_margin_seconds of expiring,
+    or once after a request is rejected with HTTP 401. Renewal uses the refresh
+    token, falling back to the configured grant when there is none or it was
+    rejected. Concurrent requests share a single renewal.
+    """
+
+    def __init__(
+        self,
+        session_data: Dict,
+        oauth_config: Dict,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        on_token: Optional[Callable[[Dict], None]] = None
+    ):
+        self.session_data = dict(session_data)
+        self.oauth_config = oauth_config
+        self.username = username
+        self.password = password
+        self.on_token = on_token
+        self.token_url = f"{session_data['instance_url'].rstrip('/')}{TOKEN_PATH}"
+        self._lock: Optional[asyncio.Lock] = None
+        self.refreshes = 0
+
+    def _needs_refresh(self) -> bool:
+        if not self.session_data.get('access_token'):
+            return True
+        expires_at = self.session_data.get('access_token_expires_at') or 0
+        margin = float(self.oauth_config.get('refresh_margin_seconds', 60))
+        return time.time() >= expires_at - margin
+
+    def _grant_requests(self) -> List[httpx.Request]:
+        """Token requests to try in order: refresh token first, then the configured grant."""
+        grants = []
+        if self.session_data.get('refresh_token'):
+            grants.append(token_request_data(
+                'refresh_token', self.oauth_config, refresh_token=self.session_data['refresh_token']
+            ))
+        grant_type = self.oauth_config.get('grant_type', 'password')
+        if grant_type == 'client_credentials' or (grant_type == 'password' and self.password):
+            grants.append(token_request_data(
+                grant_type, self.oauth_config, self.username, self.password
+            ))
+        return [
+            httpx.Request('POST', self.token_url, data=data, headers={'Accept': 'application/json'})
+            for data in grants
+        ]
+
+    def _accept(self, response: httpx.Response) -> bool:
+        """Store the token from a successful, already read token response."""
+        if response.status_code != 200:
+            return False
+        try:
+            token = response.json()
+        except ValueError:
+            return False
+        if not token.get('access_token'):
+            return False
+
+        self.session_data = session_from_token(
+            token, self.session_data['instance_url'], previous=self.session_data
+        )
+        self.refreshes += 1
+        if self.on_token is not None:
+            self.on_token(self.session_data)
+        return True
+
+    def adopt(self, session_data: Dict):
+        """Take over a token renewed by another process if it outlives the current one."""
+        if session_data.get('access_token') and (
+            (session_data.get('access_token_expires_at') or 0)
+            > (self.session_data.get('access_token_expires_at') or 0)
+        ):
+            self.session_data = dict(session_data)
+
+    def _authorize(self, request: httpx.Request):
+        access_token = self.session_data.get('access_token')
+        if access_token:
+            token_type = self.session_data.get('token_type', 'Bearer')
+            request.headers['Authorization'] = f"{token_type} {access_token}"
+
+    async def async_auth_flow(
+        self,
+        request: httpx.Request
+    ) -> AsyncGenerator[httpx.Request, httpx.Response]:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        if self._needs_refresh():
+            async with self._lock:
+                # Another request may have renewed the token while this one waited
+                if self._needs_refresh():
+                    for token_request in self._grant_requests():
+                        token_response = yield token_request
+                        await token_response.aread()
+                        if self._accept(token_response):
+                            break
+
+        self._authorize(request)
+        sent_token = self.session_data.get('access_token')
+        response = yield request
+        if response.status_code != 401:
+            return
+
+        async with self._lock:
+            if self.session_data.get('access_token') == sent_token:
+                for token_request in self._grant_requests():
+                    token_response = yield token_request
+                    await token_response.aread()
+                    if self._accept(token_response):
+                        break
+        if self.session_data.get('access_token') != sent_token:
+            self._authorize(request)
+            yield request
@@ -2,17 +2,34 @@
 
 import time
 import requests
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from datetime import datetime
 
+from .errors import AuthenticationError
+from .oauth import TOKEN_PATH, session_from_token, token_request_data
+
 
 class ServiceNowAuth:
     """Handles ServiceNow authentication including MFA."""
 
-    def __init__(self, instance_url: str, username: str, password: str):
+    def __init__(
+        self,
+        instance_url: str,
+        username: str,
+        password: str,
+        oauth_config: Optional[Dict] = None,
+        output: Callable[[str], None] = print,
+        mfa_poll_interval: float = 5,
+        mfa_timeout: float = 300
+    ):
         self.instance_url = instance_url.rstrip('/')
         self.username = username
         self.password = password
+        self.oauth_config = oauth_config
+        # Progress messages go here; sn-connect prefixes them when running several instances
+        self.output = output
+        self.mfa_poll_interval = mfa_poll_interval
+        self.mfa_timeout = mfa_timeout
         self.session = None
 
     def authenticate(self, interactive: bool = True) -> Dict:
@@ -25,8 +42,10 @@ class ServiceNowAuth:
         Returns:
             Dict containing session cookies and metadata
         """
-        print(f"\n[AUTH] Authenticating to {self.instance_url}...")
-        print(f"       User: {self.username}")
+        self.output(f"\n[AUTH] Authenticating to {self.instance_url}...")
+        if self.oauth_config:
+            return self._authenticate_oauth()
+        self.output(f"       User: {self.username}")
 
         # Create session
         session = requests.Session()
@@ -47,13 +66,13 @@ class ServiceNowAuth:
 
             # Check if we got a valid response
             if response.status_code == 200:
-                print("[OK] Authentication successful (no MFA required)")
+                self.output("[OK] Authentication successful (no MFA required)")
                 return self._create_session_data(session)
 
             # Check for MFA required (401 with specific header or response)
             elif response.status_code == 401:
                 if interactive and self._check_mfa_required(response):
-                    print("\n[WARNING] MFA Required")
+                    self.output("\n[WARNING] MFA Required")
                     return self._handle_mfa_authentication(session)
                 else:
                     raise AuthenticationError(
@@ -68,6 +87,30 @@ class ServiceNowAuth:
         except requests.exceptions.RequestException as e:
             raise AuthenticationError(f"Connection error: {str(e)}")
 
+    def _authenticate_oauth(self) -> Dict:
+        """Obtain an access and refresh token from the instance's OAuth endpoint."""
+        grant_type = self.oauth_config.get('grant_type', 'password')
+        self.output(f"       OAuth grant: {grant_type}")
+
+        data = token_request_data(grant_type, self.oauth_config, self.username, self.password)
+        try:
+            response = requests.post(
+                f"{self.instance_url}{TOKEN_PATH}",
+                data=data,
+                headers={'Accept': 'application/json'},
+                timeout=30
+            )
+        except requests.exceptions.RequestException as e:
+            raise AuthenticationError(f"Connection error: {str(e)}")
+
+        if response.status_code != 200:
+            raise AuthenticationError(
+                f"OAuth token request failed: {response.status_code} - {response.text}"
+            )
+
+        self.output("[OK] OAuth token obtained")
+        return session_from_token(response.json(), self.instance_url)
+
     def _check_mfa_required(self, response: requests.Response) -> bool:
         """Check if MFA is required based on response."""
         # ServiceNow may indicate MFA in various ways
@@ -77,27 +120,27 @@ class ServiceNowAuth:
 
     def _handle_mfa_authentication(self, session: requests.Session) -> Dict:
         """Handle interactive MFA authentication."""
-        print("\n[MFA] MFA Authentication Required")
-        print("      Please approve the login request on your mobile device...")
-        print("      (This usually appears as a push notification)")
+        self.output("\n[MFA] MFA Authentication Required")
+        self.output("      Please approve the login request on your mobile device...")
+        self.output("      (This usually appears as a push notification)")
 
-        # Poll for MFA approval
-        max_attempts = 60  # 5 minutes with 5-second intervals
-        attempt = 0
+        # Poll for MFA approval until the deadline
+        started = time.monotonic()
+        deadline = started + self.mfa_timeout
+        next_report = 30
 
         test_url = f"{self.instance_url}/api/now/table/sys_user"
         params = {'sysparm_limit': 1, 'sysparm_fields': 'sys_id,user_name'}
 
-        while attempt < max_attempts:
-            attempt += 1
-            time.sleep(5)
+        while time.monotonic() < deadline:
+            time.sleep(min(self.mfa_poll_interval, max(0, deadline - time.monotonic())))
 
             try:
                 # Try the API call again
                 response = session.get(test_url, params=params, timeout=30)
 
                 if response.status_code == 200:
-                    print("\n[OK] MFA approved! Authentication successful")
+                    self.output("\n[OK] MFA approved! Authentication successful")
                     return self._create_session_data(session)
 
                 elif response.status_code != 401:
@@ -107,16 +150,19 @@ class ServiceNowAuth:
                     )
 
                 # Still waiting for MFA approval
-                if attempt % 6 == 0:  # Every 30 seconds
-                    print(f"      Still waiting... ({attempt * 5}s elapsed)")
+                elapsed = time.monotonic() - started
+                if elapsed >= next_report:  # Every 30 seconds
+                    self.output(f"      Still waiting... ({int(elapsed)}s elapsed)")
+                    next_report += 30
 
             except requests.exceptions.RequestException as e:
-                if attempt >= max_attempts:
+                if time.monotonic() >= deadline:
                     raise AuthenticationError(f"MFA polling failed: {str(e)}")
                 continue
 
         raise AuthenticationError(
-            "MFA approval timeout. Please try again and approve within 5 minutes."
+            f"MFA approval timeout. Please try again and approve within "
+            f"{int(self.mfa_timeout // 60)} minutes."
         )
 
     def _create_session_data(self, session: requests.Session) -> Dict:
@@ -135,12 +181,15 @@ class ServiceNowAuth:
         session = requests.Session()
 
         # Restore cookies
-        for name, value in session_data['cookies'].items():
+        for name, value in session_data.get('cookies', {}).items():
             session.cookies.set(name, value)
 
-        # Restore basic auth
+        # Restore basic auth, or present the OAuth bearer token
         if 'auth' in session_data:
             session.auth = tuple(session_data['auth'])
+        elif session_data.get('access_token'):
+            token_type = session_data.get('token_type', 'Bearer')
+            session.headers['Authorization'] = f"{token_type} {session_data['access_token']}"
 
         return session
 
@@ -157,8 +206,3 @@ class ServiceNowAuth:
 
         except:
             return False
-
-
-class AuthenticationError(Exception):
-    """Raised when authentication fails."""
-    pass
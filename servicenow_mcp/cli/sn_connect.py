@@ -2,7 +2,11 @@
 
 import argparse
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Dict, List, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -12,16 +16,194 @@ from servicenow_mcp.session_cache import SessionCache
 from servicenow_mcp.auth.servicenow_auth import ServiceNowAuth, AuthenticationError
 
 
+# Serializes output lines from concurrent instance workers
+_print_lock = threading.Lock()
+
+
+def _prefixed_output(instance_name: str) -> Callable[[str], None]:
+    """Print each message line prefixed with the instance name."""
+    def output(message: str):
+        with _print_lock:
+            for line in message.strip('\n').splitlines():
+                print(f"[{instance_name}] {line.strip()}")
+    return output
+
+
+def connect_instance(
+    instance_name: str,
+    config_manager: ConfigManager,
+    session_cache: SessionCache,
+    force: bool = False,
+    output: Callable[[str], None] = print,
+    mfa_poll_interval: float = 5,
+    authenticate: bool = True
+) -> Optional[Dict]:
+    """
+    Verify the cached session of one instance, authenticating if needed.
+
+    With authenticate=False, None is returned instead of logging in when
+    there is no valid cached session.
+
+    Returns:
+        Dict with 'instance', 'status' (verified, authenticated or failed),
+        'detail' and 'seconds'
+    """
+    started = time.monotonic()
+
+    def result(status: str, detail: str) -> Dict:
+        return {
+            'instance': instance_name,
+            'status': status,
+            'detail': detail,
+            'seconds': round(time.monotonic() - started, 1)
+        }
+
+    try:
+        # Get instance configuration
+        instance_config = config_manager.get_instance_config(instance_name)
+        oauth_config = None
+        if config_manager.get_auth_mode(instance_name) == 'oauth':
+            oauth_config = config_manager.get_oauth_config(instance_name)
+        password_required = (
+            oauth_config is None or oauth_config['grant_type'] == 'password'
+        )
+
+        # Check for password
+        if password_required and not instance_config.get('password'):
+            output(f"\n[ERROR] Password not found for instance '{instance_name}'")
+            output(f"        Set it in config/instances.yaml or environment variable:")
+            output(f"        SERVICENOW_PASSWORD_{instance_name.upper().replace('-', '_')}")
+            return result('failed', 'password not configured')
+
+        auth = ServiceNowAuth(
+            instance_url=instance_config['url'],
+            username=instance_config.get('username'),
+            password=instance_config.get('password'),
+            oauth_config=oauth_config,
+            output=output,
+            mfa_poll_interval=mfa_poll_interval
+        )
+
+        # Check for cached session
+        if not force:
+            cached_session = session_cache.get_session(instance_name)
+            if cached_session:
+                output(f"\n[OK] Using cached session for '{instance_name}'")
+                output(f"     Session valid until: {cached_session.get('expires_at', 'unknown')}")
+
+                # Verify session is still valid
+                if auth.verify_session(cached_session):
+                    output("     [OK] Session verified and active")
+                    return result('verified', 'cached session is active')
+                else:
+                    output("     [WARNING] Session validation failed, re-authenticating...")
+                    session_cache.invalidate_session(instance_name)
+
+        if not authenticate:
+            return None
+
+        # Authenticate
+        session_data = auth.authenticate(interactive=True)
+
+        # Cache the session
+        session_cache.save_session(instance_name, session_data)
+        return result('authenticated', 'new session cached')
+
+    except ValueError as e:
+        output(f"\n[ERROR] {str(e)}")
+        return result('failed', str(e))
+    except AuthenticationError as e:
+        output(f"\n[ERROR] Authentication Failed:\n        {str(e)}")
+        return result('failed', str(e))
+
+
+def connect_instances(
+    instance_names: List[str],
+    config_manager: ConfigManager,
+    session_cache: SessionCache,
+    force: bool = False,
+    workers: int = 8,
+    mfa_poll_interval: float = 5
+) -> List[Dict]:
+    """
+    Connect several instances concurrently.
+
+    Verification, authentication and MFA approval polling run in parallel, so
+    the total time is that of the slowest instance rather than the sum.
+    Cached sessions are verified first and the removal of stale ones is
+    written once; each new session is saved as soon as its login completes,
+    so a slow MFA approval or an interrupted run does not hold back the others.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        def run_all(names: List[str], **kwargs) -> List[Optional[Dict]]:
+            futures = [
+                executor.submit(
+                    connect_instance,
+                    instance_name,
+                    config_manager,
+                    session_cache,
+                    output=_prefixed_output(instance_name),
+                    mfa_poll_interval=mfa_poll_interval,
+                    **kwargs
+                )
+                for instance_name in names
+            ]
+            return [future.result() for future in futures]
+
+        with session_cache.batch():
+            results = dict(zip(instance_names, run_all(instance_names, force=force, authenticate=False)))
+
+        pending = [name for name, result in results.items() if result is None]
+        results.update(zip(pending, run_all(pending, force=True)))
+        return [results[name] for name in instance_names]
+
+
+def print_status_table(results: List[Dict]):
+    """Print one line per instance with its final status."""
+    headers = ('INSTANCE', 'STATUS', 'TIME', 'DETAIL')
+    rows = [
+        (r['instance'], r['status'].upper(), f"{r['seconds']}s", r['detail'].splitlines()[0][:80])
+        for r in results
+    ]
+    widths = [max(len(str(row[i])) for row in rows + [headers]) for i in range(3)]
+
+    print("\n[STATUS] Instances:")
+    for row in [headers] + rows:
+        print("         " + "  ".join(
+            [str(value).ljust(widths[i]) for i, value in enumerate(row[:3])] + [row[3]]
+        ))
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
-        description='Authenticate to a ServiceNow instance with MFA support'
+        description='Authenticate to ServiceNow instances with MFA support'
     )
     parser.add_argument(
         '--instance',
-        required=True,
         help='Instance name from config/instances.yaml'
     )
+    parser.add_argument(
+        '--instances',
+        help='Comma-separated instance names to connect concurrently'
+    )
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='Connect all configured instances concurrently'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Maximum instances connected at the same time (default: 8)'
+    )
+    parser.add_argument(
+        '--mfa-poll-interval',
+        type=float,
+        default=5,
+        help='Seconds between MFA approval checks (default: 5)'
+    )
     parser.add_argument(
         '--force',
         action='store_true',
@@ -44,6 +226,9 @@ def main():
     )
 
     args = parser.parse_args()
+    if not (args.instance or args.instances or args.all or args.list or args.show_cache
+            or args.clear_cache):
+        parser.error('one of --instance, --instances or --all is required')
 
     try:
         # Initialize managers
@@ -81,52 +266,40 @@ def main():
             print("[OK] All cached sessions cleared")
             return 0
 
-        # Get instance configuration
-        instance_name = args.instance
-        instance_config = config_manager.get_instance_config(instance_name)
-
-        # Check for password
-        if 'password' not in instance_config or not instance_config['password']:
-            print(f"\n[ERROR] Password not found for instance '{instance_name}'")
-            print(f"        Set it in config/instances.yaml or environment variable:")
-            print(f"        SERVICENOW_PASSWORD_{instance_name.upper().replace('-', '_')}")
-            return 1
-
-        # Check for cached session
-        if not args.force:
-            cached_session = session_cache.get_session(instance_name)
-            if cached_session:
-                print(f"\n[OK] Using cached session for '{instance_name}'")
-                print(f"     Session valid until: {cached_session.get('expires_at', 'unknown')}")
+        # Several instances: connect concurrently and summarize
+        if args.all or args.instances:
+            if args.all:
+                instance_names = config_manager.list_instances()
+            else:
+                instance_names = [name.strip() for name in args.instances.split(',') if name.strip()]
 
-                # Verify session is still valid
-                auth = ServiceNowAuth(
-                    instance_url=instance_config['url'],
-                    username=instance_config['username'],
-                    password=instance_config['password']
-                )
-                if auth.verify_session(cached_session):
-                    print("     [OK] Session verified and active")
-                    return 0
-                else:
-                    print("     [WARNING] Session validation failed, re-authenticating...")
-                    session_cache.invalidate_session(instance_name)
+            print(f"\n[AUTH] Connecting {len(instance_names)} instance(s)...")
+            results = connect_instances(
+                instance_names,
+                config_manager,
+                session_cache,
+                force=args.force,
+                workers=args.workers,
+                mfa_poll_interval=args.mfa_poll_interval
+            )
+            print_status_table(results)
+            return 0 if all(r['status'] != 'failed' for r in results) else 1
 
-        # Authenticate
-        auth = ServiceNowAuth(
-            instance_url=instance_config['url'],
-            username=instance_config['username'],
-            password=instance_config['password']
+        instance_name = args.instance
+        result = connect_instance(
+            instance_name,
+            config_manager,
+            session_cache,
+            force=args.force,
+            mfa_poll_interval=args.mfa_poll_interval
         )
+        if result['status'] == 'failed':
+            return 1
 
-        session_data = auth.authenticate(interactive=True)
-
-        # Cache the session
-        session_cache.save_session(instance_name, session_data)
-
-        print(f"\n[OK] Authentication complete!")
-        print(f"     Session cached for {session_config.get('cache_duration_hours', 8)} hours")
-        print(f"\n     You can now use the ServiceNow MCP server with instance: {instance_name}")
+        if result['status'] == 'authenticated':
+            print(f"\n[OK] Authentication complete!")
+            print(f"     Session cached for {session_config.get('cache_duration_hours', 8)} hours")
+            print(f"\n     You can now use the ServiceNow MCP server with instance: {instance_name}")
 
         return 0
 
@@ -136,9 +309,6 @@ def main():
     except ValueError as e:
         print(f"\n[ERROR] {str(e)}")
         return 1
-    except AuthenticationError as e:
-        print(f"\n[ERROR] Authentication Failed:\n        {str(e)}")
-        return 1
     except KeyboardInterrupt:
         print("\n\n[WARNING] Authentication cancelled by user")
         return 1
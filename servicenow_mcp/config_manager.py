@@ -1,34 +1,165 @@
 """Configuration manager for ServiceNow instances."""
 
+import json
+import logging
 import os
-import yaml
+import tempfile
 from pathlib import Path
-from typing import Dict, Optional
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the snapshot layout changes, so older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+# Keys whose values never leave the YAML file; configs holding them are not snapshotted
+SECRET_KEYS = ('password', 'client_secret')
+
+# Top-level sections merged into each instance's settings by _get_layered_config
+LAYERED_SECTIONS = (
+    'http', 'rate_limit', 'resilience', 'read_defaults', 'output', 'batch', 'validation', 'bulk'
+)
 
 
 class ConfigManager:
-    """Manages ServiceNow instance configurations from YAML file."""
+    """
+    Manages ServiceNow instance configurations from YAML file.
 
-    def __init__(self, config_path: Optional[str] = None):
-        if config_path is None:
-            # Default to config/instances.yaml in project root
-            project_root = Path(__file__).parent.parent
-            config_path = project_root / "config" / "instances.yaml"
+    The parsed configuration is also written to a JSON snapshot next to the
+    YAML file, keyed by its modification time and size; later processes load
+    the snapshot instead of parsing the YAML again while the file is
+    unchanged. Files holding passwords or client secrets are not
+    snapshotted, so the secrets are not copied. reload_if_changed() picks up
+    edits to the file at runtime.
+    """
 
+    def __init__(self, config_path: Optional[str] = None, snapshot_path: Optional[str] = None):
+        project_root = Path(__file__).parent.parent
+        if config_path is None:
+            # SERVICENOW_MCP_CONFIG, else config/instances.yaml in project root
+            config_path = os.environ.get('SERVICENOW_MCP_CONFIG') or (
+                project_root / "config" / "instances.yaml"
+            )
         self.config_path = Path(config_path)
+        if snapshot_path is None:
+            # One snapshot per config file, e.g. config/.instances.yaml.snapshot.json
+            snapshot_path = self.config_path.with_name(f".{self.config_path.name}.snapshot.json")
+        self.snapshot_path = Path(snapshot_path)
+        self._reload_lock = Lock()
+        self._stamp = self._file_stamp()
         self.config = self._load_config()
+        self.reloads = 0
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        """Modification time and size of the YAML file; None if it does not exist."""
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
 
     def _load_config(self) -> Dict:
-        """Load configuration from YAML file."""
-        if not self.config_path.exists():
+        """Load configuration from the snapshot if it is current, else from the YAML file."""
+        if self._stamp is None:
             raise FileNotFoundError(
                 f"Configuration file not found: {self.config_path}\n"
                 f"Please copy config/instances.yaml.example to config/instances.yaml "
                 f"and configure your ServiceNow instances."
             )
 
+        config = self._load_snapshot()
+        if config is not None:
+            return config
+
+        # Imported here: with a current snapshot, startup never needs PyYAML
+        import yaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
         with open(self.config_path, 'r') as f:
-            return yaml.safe_load(f)
+            config = yaml.load(f, Loader=loader) or {}
+        self._save_snapshot(config)
+        return config
+
+    def _snapshot_key(self) -> Dict:
+        return {
+            'version': SNAPSHOT_VERSION,
+            'source': str(self.config_path.resolve()),
+            'stamp': list(self._stamp)
+        }
+
+    def _load_snapshot(self) -> Optional[Dict]:
+        """Return the snapshotted configuration if it was taken from the current file."""
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get('key') != self._snapshot_key():
+            return None
+        return snapshot.get('config')
+
+    def _save_snapshot(self, config: Dict):
+        """Write the parsed configuration atomically; failures only cost a parse next time."""
+        if _contains_secrets(config):
+            logger.debug(f"Not snapshotting {self.config_path}: it contains passwords or client secrets")
+            return
+
+        try:
+            data = json.dumps({'key': self._snapshot_key(), 'config': config}, separators=(',', ':'))
+        except (TypeError, ValueError):
+            # Values JSON cannot hold (e.g. YAML dates): always parse this file
+            return
+
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.snapshot_path.parent), prefix=self.snapshot_path.name, suffix='.tmp'
+            )
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.snapshot_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.debug(f"Could not write config snapshot: {e}")
+
+    def reload_if_changed(self) -> Set[str]:
+        """
+        Re-read the configuration file if it changed since it was last loaded.
+
+        An invalid or missing file is reported and the current configuration is
+        kept until the file changes again.
+
+        Returns:
+            Instances added, removed or whose settings changed, including
+            changes inherited from top-level sections
+        """
+        with self._reload_lock:
+            stamp = self._file_stamp()
+            if stamp == self._stamp:
+                return set()
+
+            import yaml
+
+            self._stamp = stamp
+            try:
+                config = self._load_config()
+            except (OSError, yaml.YAMLError) as e:
+                logger.warning(f"Keeping previous configuration, reload failed: {e}")
+                return set()
+            if not isinstance(config.get('instances', {}), dict):
+                logger.warning("Keeping previous configuration, 'instances' is not a mapping")
+                return set()
+
+            previous, self.config = self.config, config
+            self.reloads += 1
+
+        changed = changed_instances(previous, config)
+        logger.info(f"Reloaded {self.config_path}; changed instances: {sorted(changed) or 'none'}")
+        return changed
 
     def get_instance_config(self, instance_name: str) -> Dict:
         """Get configuration for a specific instance."""
@@ -52,13 +183,207 @@ class ConfigManager:
 
         return instance_config
 
+    def get_auth_mode(self, instance_name: str) -> str:
+        """Return how the instance authenticates: 'basic' (default) or 'oauth'."""
+        return self.get_instance_config(instance_name).get('auth', 'basic')
+
+    def get_oauth_config(self, instance_name: str) -> Dict:
+        """Get OAuth client settings; the secret may come from the environment."""
+        instance_config = self.get_instance_config(instance_name)
+        oauth_config = {
+            'grant_type': 'password',
+            'client_id': None,
+            'client_secret': None,
+            'refresh_margin_seconds': 60
+        }
+        oauth_config.update(instance_config.get('oauth', {}) or {})
+
+        if not oauth_config['client_secret']:
+            env_var = f"SERVICENOW_CLIENT_SECRET_{instance_name.upper().replace('-', '_')}"
+            oauth_config['client_secret'] = os.environ.get(env_var)
+
+        if not oauth_config['client_id']:
+            raise ValueError(f"Instance '{instance_name}' uses OAuth but has no oauth.client_id")
+        return oauth_config
+
     def list_instances(self) -> list:
         """List all configured instance names."""
         return list(self.config.get('instances', {}).keys())
 
+    def _get_layered_config(
+        self,
+        section: str,
+        defaults: Dict,
+        instance_name: Optional[str]
+    ) -> Dict:
+        """Merge defaults, the top-level section and the instance's own section."""
+        merged = dict(defaults)
+        merged.update(self.config.get(section, {}) or {})
+
+        instance = self.config.get('instances', {}).get(instance_name) or {}
+        merged.update(instance.get(section, {}) or {})
+
+        return merged
+
+    def get_http_config(self, instance_name: str) -> Dict:
+        """Get HTTP client settings, with per-instance overrides."""
+        return self._get_layered_config('http', {
+            'pool_maxsize': 10,
+            'keep_alive': True,
+            'keepalive_expiry': 30,
+            'timeout': 60,
+            'coalesce_reads': True
+        }, instance_name)
+
+    def get_rate_limit_config(self, instance_name: str) -> Dict:
+        """Get request admission settings, with per-instance overrides."""
+        return self._get_layered_config('rate_limit', {
+            'requests_per_second': 20,
+            'burst': 40,
+            'initial_concurrency': 4,
+            'min_concurrency': 1,
+            'max_concurrency': 16,
+            'max_retries': 3
+        }, instance_name)
+
+    def get_resilience_config(self, instance_name: str) -> Dict:
+        """Get read retry and circuit breaker settings, with per-instance overrides."""
+        return self._get_layered_config('resilience', {
+            'max_retries': 2,
+            'backoff_base_seconds': 0.5,
+            'max_backoff_seconds': 8,
+            'failure_threshold': 5,
+            'cooldown_seconds': 30
+        }, instance_name)
+
+    def get_read_config(self, instance_name: str) -> Dict:
+        """Get default payload options for read tools, with per-instance overrides."""
+        return self._get_layered_config('read_defaults', {
+            'exclude_reference_links': True,
+            'no_count': True,
+            'display_value': 'false',
+            'fields': {},
+            'source': 'instance',
+            'max_staleness_seconds': 3600
+        }, instance_name)
+
+    def get_output_config(self, instance_name: Optional[str] = None) -> Dict:
+        """Get tool result encoding settings, with per-instance overrides."""
+        return self._get_layered_config('output', {
+            'format': 'json',
+            'max_bytes': 0,
+            'fast_encoder': True
+        }, instance_name)
+
+    def get_batch_config(self, instance_name: str) -> Dict:
+        """Get batch tool settings, with per-instance overrides."""
+        return self._get_layered_config('batch', {
+            'chunk_size': 20,
+            'fallback': True
+        }, instance_name)
+
+    def get_validation_config(self, instance_name: str) -> Dict:
+        """Get query and payload validation settings, with per-instance overrides."""
+        return self._get_layered_config('validation', {
+            'mode': 'warn',
+            'fetch_missing_schemas': False
+        }, instance_name)
+
+    def get_bulk_config(self, instance_name: str) -> Dict:
+        """Get bulk write tool settings, with per-instance overrides."""
+        return self._get_layered_config('bulk', {
+            'concurrency': 8,
+            'max_records': 10000,
+            'page_size': 500
+        }, instance_name)
+
+    def get_response_cache_config(self) -> Dict:
+        """Get read-through response cache settings."""
+        cache_config = {
+            'enabled': True,
+            'max_entries': 256,
+            'ttl_seconds': {
+                'sys_db_object': 3600,
+                'sys_ui_action': 300,
+                'sys_script': 300
+            }
+        }
+        cache_config.update(self.config.get('response_cache', {}) or {})
+        return cache_config
+
+    def get_schema_catalog_config(self) -> Dict:
+        """Get local schema catalog settings."""
+        return self.config.get('schema_catalog', {
+            'location': None,
+            'refresh_interval_seconds': 3600
+        })
+
+    def get_sync_config(self) -> Dict:
+        """Get local table mirror settings."""
+        return self.config.get('sync', {
+            'location': None,
+            'page_size': 1000
+        })
+
+    def get_metrics_config(self) -> Dict:
+        """Get performance metrics export settings."""
+        metrics_config = {
+            'textfile': None,
+            'textfile_interval_seconds': 15
+        }
+        metrics_config.update(self.config.get('metrics', {}) or {})
+        return metrics_config
+
+    def get_trace_config(self) -> Dict:
+        """Get tool call trace log settings."""
+        trace_config = {
+            'file': None,
+            'sample_rate': 1.0,
+            'profile_slowest': 0,
+            'profile_dir': 'cache/profiles'
+        }
+        trace_config.update(self.config.get('trace', {}) or {})
+        return trace_config
+
+    def get_reload_config(self) -> Dict:
+        """Get configuration hot reload settings."""
+        reload_config = {
+            'enabled': True,
+            'check_interval_seconds': 5
+        }
+        reload_config.update(self.config.get('reload', {}) or {})
+        return reload_config
+
     def get_session_config(self) -> Dict:
         """Get session cache configuration."""
         return self.config.get('session', {
             'cache_duration_hours': 8,
-            'cache_location': 'cache/sessions.json'
+            'cache_location': 'cache/sessions.json',
+            'validation': 'optimistic',
+            'verify_interval_seconds': 300
         })
+
+
+def _contains_secrets(value) -> bool:
+    """Check whether a parsed config holds a non-empty value under one of SECRET_KEYS."""
+    if isinstance(value, dict):
+        return any(
+            (key in SECRET_KEYS and item) or _contains_secrets(item) for key, item in value.items()
+        )
+    if isinstance(value, list):
+        return any(_contains_secrets(item) for item in value)
+    return False
+
+
+def changed_instances(previous: Dict, current: Dict) -> Set[str]:
+    """Instances whose own entry or inherited top-level sections differ between two configs."""
+    previous_instances = previous.get('instances', {}) or {}
+    current_instances = current.get('instances', {}) or {}
+    names = set(previous_instances) | set(current_instances)
+
+    if any(previous.get(section) != current.get(section) for section in LAYERED_SECTIONS):
+        return names
+    return {
+        name for name in names
+        if previous_instances.get(name) != current_instances.get(name)
+    }
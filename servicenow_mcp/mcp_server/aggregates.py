@@ -0,0 +1,96 @@
+"""Request building and result flattening for the Aggregate (stats) API."""
+
+from typing import Any, Dict, List, Optional
+
+
+STATS_PATH = "/api/now/stats"
+
+AGGREGATES = ('sum', 'avg', 'min', 'max')
+
+
+def _field_list(fields: Any) -> str:
+    """Join a list of field names, or a comma-separated string of them, for a sysparm_* value."""
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    return ','.join(field.strip() for field in fields if field.strip())
+
+
+def build_stats_params(args: Dict) -> Dict:
+    """
+    Translate get_aggregates arguments into sysparm_* parameters.
+
+    Args:
+        args: Tool arguments: query, count, {sum,avg,min,max}_fields,
+            group_by, having, order_by, display_value
+
+    Returns:
+        Query parameters for GET /api/now/stats/{table}
+    """
+    params: Dict[str, Any] = {}
+    if args.get('query'):
+        params['sysparm_query'] = args['query']
+
+    for aggregate in AGGREGATES:
+        fields = _field_list(args.get(f'{aggregate}_fields') or [])
+        if fields:
+            params[f'sysparm_{aggregate}_fields'] = fields
+
+    count = args.get('count')
+    if count is None:
+        # A request without any aggregate returns nothing useful; count by default
+        count = not any(f'sysparm_{aggregate}_fields' in params for aggregate in AGGREGATES)
+    if count:
+        params['sysparm_count'] = 'true'
+
+    group_by = _field_list(args.get('group_by') or [])
+    if group_by:
+        params['sysparm_group_by'] = group_by
+    if args.get('having'):
+        params['sysparm_having'] = args['having']
+    if args.get('order_by'):
+        params['sysparm_order_by'] = args['order_by']
+    if args.get('display_value'):
+        params['sysparm_display_value'] = args['display_value']
+
+    return params
+
+
+def _number(value: Any) -> Any:
+    """Convert the API's numeric strings to int or float, leaving other values alone."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _flatten_group(group: Dict) -> Dict:
+    """Turn one stats entry into a flat row: group values, count, then 'sum.field' style keys."""
+    row: Dict[str, Any] = {}
+    for group_field in group.get('groupby_fields', []):
+        row[group_field['field']] = group_field.get('display_value', group_field.get('value'))
+
+    stats = group.get('stats', {})
+    if 'count' in stats:
+        row['count'] = _number(stats['count'])
+    for aggregate in AGGREGATES:
+        for field, value in (stats.get(aggregate) or {}).items():
+            row[f'{aggregate}.{field}'] = _number(value)
+    return row
+
+
+def flatten_stats(result: Optional[Any]) -> List[Dict]:
+    """
+    Flatten a stats API result into one row per group.
+
+    Ungrouped requests return a single object and become a single row.
+    """
+    if result is None:
+        return []
+    groups = result if isinstance(result, list) else [result]
+    return [_flatten_group(group) for group in groups]
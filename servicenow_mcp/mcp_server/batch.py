@@ -0,0 +1,133 @@
+"""Translation of tool sub-operations to and from the ServiceNow Batch API."""
+
+import base64
+import json
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+from .resilience import CircuitOpenError
+
+
+BATCH_PATH = "/api/now/v1/batch"
+
+OPERATION_METHODS = {
+    'get': 'GET',
+    'create': 'POST',
+    'update': 'PUT',
+    'delete': 'DELETE',
+}
+
+JSON_HEADERS = [
+    {'name': 'Content-Type', 'value': 'application/json'},
+    {'name': 'Accept', 'value': 'application/json'},
+]
+
+
+def operation_request(operation: Dict, read_params: Optional[Dict] = None) -> Dict:
+    """
+    Describe one sub-operation as a method, instance-relative URL and JSON body.
+
+    Args:
+        operation: {'op': get|create|update|delete, 'table', 'sys_id', 'data', 'query', 'limit'}
+        read_params: sysparm projection options applied to 'get' operations
+
+    Returns:
+        Dict with 'method', 'url' and 'body' (None when there is no body)
+    """
+    op = operation.get('op')
+    if op not in OPERATION_METHODS:
+        raise ValueError(
+            f"Unknown batch operation '{op}'. Use one of: {', '.join(OPERATION_METHODS)}"
+        )
+    table = operation.get('table')
+    if not table:
+        raise ValueError("Every batch operation needs a table")
+    sys_id = operation.get('sys_id')
+    if op in ('update', 'delete') and not sys_id:
+        raise ValueError(f"Batch '{op}' operations need a sys_id")
+    if op in ('create', 'update') and not isinstance(operation.get('data'), dict):
+        raise ValueError(f"Batch '{op}' operations need a data object")
+
+    url = f"/api/now/table/{table}"
+    if sys_id and op != 'create':
+        url += f"/{sys_id}"
+
+    params = {}
+    if op == 'get':
+        params.update(read_params or {})
+        if not sys_id:
+            params['sysparm_limit'] = int(operation.get('limit', 10))
+            if operation.get('query'):
+                params['sysparm_query'] = operation['query']
+    if params:
+        url += f"?{urlencode(params)}"
+
+    return {
+        'method': OPERATION_METHODS[op],
+        'url': url,
+        'body': operation.get('data') if op in ('create', 'update') else None
+    }
+
+
+def is_clear_rejection(error: BaseException) -> bool:
+    """
+    Check whether a failed Batch API request certainly ran none of its operations.
+
+    True when the request was never sent (connection failure, open circuit)
+    or the instance rejected it with a 4xx, e.g. because the Batch API is
+    unavailable. After a timeout, a dropped connection or a 5xx the
+    instance may have run some operations, so resending writes could
+    apply them twice.
+    """
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, CircuitOpenError)):
+        return True
+    return isinstance(error, httpx.HTTPStatusError) and 400 <= error.response.status_code < 500
+
+
+def build_batch_body(batch_id: str, requests: List[Dict]) -> Dict:
+    """Build a Batch API request body from (id, request) pairs."""
+    rest_requests = []
+    for request in requests:
+        rest_request = {
+            'id': request['id'],
+            'method': request['method'],
+            'url': request['url'],
+            'headers': JSON_HEADERS,
+            'exclude_response_headers': True
+        }
+        if request['body'] is not None:
+            encoded = json.dumps(request['body']).encode('utf-8')
+            rest_request['body'] = base64.b64encode(encoded).decode('ascii')
+        rest_requests.append(rest_request)
+
+    return {'batch_request_id': batch_id, 'rest_requests': rest_requests}
+
+
+def decode_serviced_request(serviced: Dict) -> Dict:
+    """Turn one serviced_requests entry into a per-operation result."""
+    status_code = serviced.get('status_code')
+    body = None
+    if serviced.get('body'):
+        raw = base64.b64decode(serviced['body'])
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            body = raw.decode('utf-8', errors='replace')
+
+    return operation_result(status_code, body)
+
+
+def operation_result(status_code: Optional[int], body, error: Optional[str] = None) -> Dict:
+    """Uniform per-operation result shared by the batch and fallback paths."""
+    success = status_code is not None and 200 <= status_code < 300
+    result = {'status_code': status_code, 'success': success}
+    if success:
+        result['result'] = body.get('result') if isinstance(body, dict) else body
+    else:
+        if error is None and isinstance(body, dict):
+            body_error = body.get('error')
+            error = body_error.get('message') if isinstance(body_error, dict) else body_error
+        result['error'] = error or f"HTTP {status_code}"
+    return result
@@ -0,0 +1,134 @@
+"""Helpers for bulk writes against the Table API."""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from .metrics import decode_json
+from .pagination import build_page_query
+
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+async def count_records(client: httpx.AsyncClient, table_url: str, query: str) -> int:
+    """Count records matching query without downloading them."""
+    params = {'sysparm_fields': 'sys_id', 'sysparm_limit': 1}
+    if query:
+        params['sysparm_query'] = query
+
+    response = await client.get(table_url, params=params)
+    response.raise_for_status()
+    return int(response.headers.get('X-Total-Count', 0))
+
+
+async def iter_sys_ids(
+    client: httpx.AsyncClient,
+    table_url: str,
+    query: str,
+    page_size: int = 500
+) -> AsyncIterator[List[str]]:
+    """Yield the sys_ids of records matching query, one keyset page at a time."""
+    last_sys_id = None
+    while True:
+        params = {
+            'sysparm_query': build_page_query(query, 'sys_id', [last_sys_id] if last_sys_id else None),
+            'sysparm_fields': 'sys_id',
+            'sysparm_limit': page_size,
+            'sysparm_no_count': 'true'
+        }
+        response = await client.get(table_url, params=params)
+        response.raise_for_status()
+
+        # ACL-filtered pages can be short before the end, so only an empty page is the last
+        sys_ids = [row['sys_id'] for row in decode_json(response).get('result', [])]
+        if not sys_ids:
+            return
+        yield sys_ids
+        last_sys_id = sys_ids[-1]
+
+
+async def run_writes(
+    client: httpx.AsyncClient,
+    writes: List[Dict],
+    concurrency: int,
+    progress: Optional[ProgressCallback] = None,
+    total: Optional[int] = None,
+    completed: int = 0
+) -> List[Dict]:
+    """
+    Send writes with at most concurrency requests in flight.
+
+    Args:
+        client: Authenticated client for the instance
+        writes: Dicts with 'method', 'url', optional 'body' and a 'key'
+            identifying the record in the report
+        concurrency: Maximum concurrent requests
+        progress: Awaited with (completed, total) as writes finish
+        total: Total writes across all calls, for progress reporting
+        completed: Writes already completed by earlier calls
+
+    Returns:
+        One outcome per write, in input order
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    total = total if total is not None else len(writes)
+    done = completed
+    report_every = max(1, total // 20)
+
+    async def send(write: Dict) -> Dict:
+        nonlocal done
+        async with semaphore:
+            outcome = {'key': write['key']}
+            try:
+                response = await client.request(write['method'], write['url'], json=write.get('body'))
+                outcome['status_code'] = response.status_code
+                outcome['success'] = response.is_success
+                if response.is_success and response.content:
+                    outcome['sys_id'] = decode_json(response).get('result', {}).get('sys_id')
+                elif not response.is_success:
+                    outcome['error'] = _error_message(response)
+            except (httpx.HTTPError, ValueError) as e:
+                outcome.update({'status_code': None, 'success': False, 'error': str(e)})
+
+        done += 1
+        if progress is not None and (done % report_every == 0 or done == total):
+            await progress(done, total)
+        return outcome
+
+    return list(await asyncio.gather(*[send(write) for write in writes]))
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        error = decode_json(response).get('error')
+    except ValueError:
+        error = None
+    if isinstance(error, dict):
+        error = error.get('message')
+    return error or f"HTTP {response.status_code}"
+
+
+def summarize(outcomes: List[Dict], dry_run: bool = False, matched: Optional[int] = None) -> Dict:
+    """Build the tool result: counts, failures in full and the sys_ids that succeeded."""
+    failures = [outcome for outcome in outcomes if not outcome['success']]
+    summary = {
+        'requested': len(outcomes),
+        'succeeded': len(outcomes) - len(failures),
+        'failed': len(failures),
+        'dry_run': dry_run
+    }
+    if matched is not None:
+        summary['matched'] = matched
+
+    return {
+        'summary': summary,
+        'failures': [
+            {key: value for key, value in outcome.items() if key != 'success'}
+            for outcome in failures
+        ],
+        'succeeded': [
+            outcome.get('sys_id') or outcome['key'] for outcome in outcomes if outcome['success']
+        ]
+    }
@@ -0,0 +1,102 @@
+"""Single-flight sharing of identical in-flight GET requests."""
+
+import asyncio
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from .metrics import ServerMetrics, current_call, phase
+
+# Response extensions copied to the shared responses
+SHARED_EXTENSIONS = ('http_version', 'reason_phrase')
+
+
+class CoalescingTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport letting concurrent identical GETs share one upstream request.
+
+    The first GET for a URL (query parameters included) is sent; GETs for
+    the same URL arriving while it is in flight wait for it and receive a
+    copy of its response, or the exception it raised. GETs only join a
+    request that started after the last write through this client
+    finished, so a read issued after a write never gets a pre-write
+    response. Sits at the top of an
+    instance's client, so all requests share the same credentials and
+    followers skip admission, retries and the circuit breaker. Each saved
+    request is counted as 'coalesced' for the instance and tool call.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        metrics: Optional[ServerMetrics],
+        instance_name: str
+    ):
+        self._transport = transport
+        self.metrics = metrics
+        self.instance_name = instance_name
+        # (URL, write generation) -> future resolved with (response parts, exception) of the
+        # request in flight; both are None when the request was cancelled
+        self._in_flight: Dict[Tuple[str, int], asyncio.Future] = {}
+        # Number of non-GET requests completed; part of the key, so reads started after
+        # a write never share a request started before it finished
+        self._write_generation = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != 'GET':
+            try:
+                return await self._transport.handle_async_request(request)
+            finally:
+                self._write_generation += 1
+
+        key = (str(request.url), self._write_generation)
+        while key in self._in_flight:
+            with phase('coalesced_wait'):
+                parts, error = await asyncio.shield(self._in_flight[key])
+            if parts is None and error is None:
+                # The leading request was cancelled; send our own
+                continue
+            if self.metrics is not None:
+                self.metrics.count_upstream(self.instance_name, current_call(), coalesced=1)
+            if error is not None:
+                raise error
+            return self._replay(request, parts)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        outcome: Tuple = (None, None)
+        try:
+            response = await self._transport.handle_async_request(request)
+            try:
+                # Raw bytes, so each copy is decoded by its own client as the original would be
+                body = b''.join([chunk async for chunk in response.stream])
+            finally:
+                await response.stream.aclose()
+            parts = (
+                response.status_code,
+                response.headers.raw,
+                body,
+                {name: value for name, value in response.extensions.items() if name in SHARED_EXTENSIONS}
+            )
+            outcome = (parts, None)
+            return self._replay(request, parts)
+        except Exception as e:
+            outcome = (None, e)
+            raise
+        finally:
+            del self._in_flight[key]
+            future.set_result(outcome)
+
+    @staticmethod
+    def _replay(request: httpx.Request, parts: Tuple) -> httpx.Response:
+        status_code, headers, body, extensions = parts
+        return httpx.Response(
+            status_code,
+            headers=headers,
+            stream=httpx.ByteStream(body),
+            request=request,
+            extensions=dict(extensions)
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
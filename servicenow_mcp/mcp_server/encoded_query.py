@@ -0,0 +1,352 @@
+"""Parsing of ServiceNow encoded queries and their translation to SQLite SQL."""
+
+import calendar
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Longest first, so NOT LIKE wins over LIKE and >= over >
+OPERATORS = (
+    'NOT INSTANCEOF', 'NOT LIKE', 'NOT IN', 'ISNOTEMPTY', 'ISEMPTY', 'EMPTYSTRING',
+    'STARTSWITH', 'ENDSWITH', 'INSTANCEOF', 'ANYTHING', 'BETWEEN', 'NOTON', 'ON',
+    'RELATIVEGT', 'RELATIVEGE', 'RELATIVELT', 'RELATIVELE', 'RELATIVEEE', 'DATEPART',
+    'NSAMEAS', 'SAMEAS', 'DYNAMIC', 'VALCHANGES', 'CHANGESFROM', 'CHANGESTO',
+    'GT_OR_EQUALS_FIELD', 'LT_OR_EQUALS_FIELD', 'GT_FIELD', 'LT_FIELD', 'MORETHAN', 'LESSTHAN',
+    'LIKE', 'IN', '!=', '>=', '<=', '=', '>', '<',
+)
+
+# Operators whose value is another field of the same record
+FIELD_OPERATORS = (
+    'SAMEAS', 'NSAMEAS', 'GT_FIELD', 'LT_FIELD', 'GT_OR_EQUALS_FIELD', 'LT_OR_EQUALS_FIELD'
+)
+
+# Operators that take no value
+UNARY_OPERATORS = ('ISNOTEMPTY', 'ISEMPTY', 'EMPTYSTRING', 'ANYTHING', 'VALCHANGES')
+
+_TERM_PATTERN = re.compile(
+    r'^([a-z0-9_.]+)(' + '|'.join(re.escape(op) for op in OPERATORS) + r')(.*)$',
+    re.DOTALL
+)
+_SCRIPT_PATTERN = re.compile(r"^javascript:\s*gs\.(\w+)\(([^)]*)\)\s*;?$")
+_NUMBER_PATTERN = re.compile(r'^-?\d+(\.\d+)?$')
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Stand-in for the ^^ escape (a literal caret) while splitting on ^
+_CARET = '\x00'
+
+
+class UnsupportedQueryError(ValueError):
+    """Raised when an encoded query cannot be parsed or evaluated locally."""
+
+
+def parse(query: str, errors: Optional[List[str]] = None) -> Dict:
+    """
+    Parse an encoded query.
+
+    Args:
+        query: Encoded query
+        errors: If given, unparseable terms are reported here and skipped
+            instead of raising UnsupportedQueryError
+
+    Returns:
+        Dict with 'groups' (^NQ branches, each a list of AND-ed clauses,
+        each clause a list of OR-ed conditions {field, operator, value})
+        and 'order_by' (list of (field, descending) pairs)
+    """
+    groups: List[List[List[Dict]]] = []
+    order_by: List[Tuple[str, bool]] = []
+
+    for branch in (query or '').replace('^^', _CARET).split('^NQ'):
+        clauses: List[List[Dict]] = []
+        for term in branch.split('^'):
+            term = term.replace(_CARET, '^').strip()
+            if not term or term == 'EQ':
+                continue
+            if term.startswith('ORDERBYDESC'):
+                order_by.append((term[len('ORDERBYDESC'):], True))
+                continue
+            if term.startswith('ORDERBY'):
+                order_by.append((term[len('ORDERBY'):], False))
+                continue
+            if term.startswith('GROUPBY'):
+                continue
+
+            is_or = term.startswith('OR')
+            try:
+                condition = _parse_term(term[2:] if is_or else term)
+            except UnsupportedQueryError as e:
+                if errors is None:
+                    raise
+                errors.append(str(e))
+                continue
+            if is_or and clauses:
+                clauses[-1].append(condition)
+            else:
+                clauses.append([condition])
+        if clauses:
+            groups.append(clauses)
+
+    return {'groups': groups, 'order_by': order_by}
+
+
+def _parse_term(term: str) -> Dict:
+    match = _TERM_PATTERN.match(term)
+    if not match:
+        raise UnsupportedQueryError(f"Cannot parse query term '{term}'")
+    field, operator, value = match.groups()
+    return {'field': field, 'operator': operator, 'value': value}
+
+
+def referenced_fields(parsed: Dict) -> List[str]:
+    """Fields used in conditions and ordering, in order of first use."""
+    fields: Dict[str, None] = {}
+    for clauses in parsed['groups']:
+        for clause in clauses:
+            for condition in clause:
+                fields.setdefault(condition['field'], None)
+                if condition['operator'] in FIELD_OPERATORS:
+                    fields.setdefault(condition['value'], None)
+    for field, _ in parsed['order_by']:
+        fields.setdefault(field, None)
+    return list(fields)
+
+
+def translate(
+    query: str,
+    columns: Iterable[str],
+    now: Optional[datetime] = None
+) -> Tuple[str, List, List[str]]:
+    """
+    Translate an encoded query into a SQLite WHERE clause and ORDER BY terms.
+
+    Args:
+        query: Encoded query
+        columns: Columns available in the mirror table
+        now: Reference time for relative date operators (UTC); defaults to now
+
+    Returns:
+        (where_sql, parameters, order_terms)
+
+    Raises:
+        UnsupportedQueryError: If a term, operator or field cannot be served locally
+    """
+    parsed = parse(query)
+    available = set(columns)
+    missing = [field for field in referenced_fields(parsed) if field not in available]
+    if missing:
+        raise UnsupportedQueryError(f"Fields not in the mirror: {', '.join(missing)}")
+
+    now = now or datetime.now(timezone.utc)
+    params: List = []
+    branches = []
+    for clauses in parsed['groups']:
+        ands = []
+        for clause in clauses:
+            ors = [_condition_sql(condition, params, now) for condition in clause]
+            ands.append(ors[0] if len(ors) == 1 else f"({' OR '.join(ors)})")
+        branches.append(' AND '.join(ands))
+
+    if not branches:
+        where = '1'
+    elif len(branches) == 1:
+        where = branches[0]
+    else:
+        where = ' OR '.join(f"({branch})" for branch in branches)
+
+    order_terms = [f"{_column(field)} {'DESC' if desc else 'ASC'}" for field, desc in parsed['order_by']]
+    return where, params, order_terms
+
+
+def _column(field: str) -> str:
+    return f'"{field}"'
+
+
+def _like_pattern(value: str, prefix: str, suffix: str) -> str:
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{prefix}{escaped}{suffix}"
+
+
+def _condition_sql(condition: Dict, params: List, now: datetime) -> str:
+    column = _column(condition['field'])
+    operator = condition['operator']
+    value = condition['value']
+    empty = f"({column} IS NULL OR {column} = '')"
+
+    # ServiceNow compares strings case-insensitively, so equality does too
+    if operator in ('=', '!='):
+        value = _evaluate(value, now)
+        params.append(value)
+        if operator == '=':
+            return f"{column} = ? COLLATE NOCASE"
+        return f"({column} IS NULL OR {column} != ? COLLATE NOCASE)"
+
+    if operator in ('>', '>=', '<', '<='):
+        value = _evaluate(value, now)
+        if _NUMBER_PATTERN.match(value):
+            params.append(float(value))
+            return f"CAST({column} AS REAL) {operator} ?"
+        params.append(value)
+        return f"{column} {operator} ?"
+
+    if operator in ('IN', 'NOT IN'):
+        values = value.split(',')
+        params.extend(values)
+        placeholders = ', '.join('?' for _ in values)
+        if operator == 'IN':
+            return f"{column} COLLATE NOCASE IN ({placeholders})"
+        return f"({column} IS NULL OR {column} COLLATE NOCASE NOT IN ({placeholders}))"
+
+    if operator in ('LIKE', 'NOT LIKE', 'STARTSWITH', 'ENDSWITH'):
+        prefix = '' if operator == 'STARTSWITH' else '%'
+        suffix = '' if operator == 'ENDSWITH' else '%'
+        params.append(_like_pattern(value, prefix, suffix))
+        if operator == 'NOT LIKE':
+            return f"({column} IS NULL OR {column} NOT LIKE ? ESCAPE '\\')"
+        return f"{column} LIKE ? ESCAPE '\\'"
+
+    if operator == 'ISEMPTY':
+        return empty
+    if operator == 'ISNOTEMPTY':
+        return f"NOT {empty}"
+    if operator == 'EMPTYSTRING':
+        return f"{column} = ''"
+    if operator == 'ANYTHING':
+        return '1'
+    if operator == 'SAMEAS':
+        return f"{column} = {_column(value)}"
+    if operator == 'NSAMEAS':
+        return f"{column} != {_column(value)}"
+
+    if operator in ('BETWEEN', 'ON', 'NOTON'):
+        parts = value.split('@')
+        if operator != 'BETWEEN':
+            # ON values carry a label first: Today@javascript:...@javascript:...
+            parts = parts[1:]
+        if len(parts) != 2:
+            raise UnsupportedQueryError(f"Cannot parse {operator} range '{value}'")
+        params.extend(_evaluate(part, now) for part in parts)
+        if operator == 'NOTON':
+            return f"NOT ({column} BETWEEN ? AND ?)"
+        return f"{column} BETWEEN ? AND ?"
+
+    if operator.startswith('RELATIVE') and operator != 'RELATIVEEE':
+        params.append(_relative(value, now))
+        comparison = {'GT': '>', 'GE': '>=', 'LT': '<', 'LE': '<='}[operator[-2:]]
+        return f"{column} {comparison} ?"
+
+    raise UnsupportedQueryError(f"Operator '{operator}' is not supported locally")
+
+
+def _format(moment: datetime) -> str:
+    return moment.strftime(DATETIME_FORMAT)
+
+
+def _start_of_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _end_of_day(moment: datetime) -> datetime:
+    return moment.replace(hour=23, minute=59, second=59, microsecond=0)
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+def _period(moment: datetime, unit: str, offset: int) -> Tuple[datetime, datetime]:
+    """Start and end of the week, month or year containing moment, shifted by offset periods."""
+    day = _start_of_day(moment)
+    if unit == 'Week':
+        start = day - timedelta(days=day.weekday()) + timedelta(weeks=offset)
+        end = start + timedelta(days=6)
+    elif unit == 'Month':
+        start = _add_months(day.replace(day=1), offset)
+        end = _add_months(start, 1) - timedelta(days=1)
+    else:
+        start = day.replace(year=day.year + offset, month=1, day=1)
+        end = start.replace(month=12, day=31)
+    return start, _end_of_day(end)
+
+
+_RELATIVE_UNITS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+
+
+def _shift(now: datetime, unit: str, amount: int) -> datetime:
+    if unit == 'month':
+        return _add_months(now, amount)
+    if unit == 'year':
+        return _add_months(now, 12 * amount)
+    if unit not in _RELATIVE_UNITS:
+        raise UnsupportedQueryError(f"Unsupported relative date unit '{unit}'")
+    return now + _RELATIVE_UNITS[unit] * amount
+
+
+def _relative(value: str, now: datetime) -> str:
+    """Evaluate a RELATIVE operand such as @hour@ago@3."""
+    parts = value.strip('@').split('@')
+    if len(parts) != 3 or parts[1] not in ('ago', 'ahead') or not parts[2].isdigit():
+        raise UnsupportedQueryError(f"Cannot parse relative date '{value}'")
+    unit, direction, amount = parts[0], parts[1], int(parts[2])
+    return _format(_shift(now, unit, -amount if direction == 'ago' else amount))
+
+
+def _unit_bounds(moment: datetime, unit: str) -> Tuple[datetime, datetime]:
+    """First and last second of the minute, hour, day or month containing moment."""
+    moment = moment.replace(microsecond=0)
+    if unit == 'minutes':
+        return moment.replace(second=0), moment.replace(second=59)
+    if unit == 'hours':
+        return moment.replace(minute=0, second=0), moment.replace(minute=59, second=59)
+    if unit == 'days':
+        return _start_of_day(moment), _end_of_day(moment)
+    return _period(moment, 'Month', 0)
+
+
+def _evaluate(value: str, now: datetime) -> str:
+    """Evaluate the javascript:gs.* date helpers used in filters; plain values pass through."""
+    if not value.startswith('javascript:'):
+        return value
+
+    match = _SCRIPT_PATTERN.match(value)
+    if not match:
+        raise UnsupportedQueryError(f"Cannot evaluate script value '{value}'")
+    function, raw_args = match.groups()
+    args = [arg.strip().strip('\'"') for arg in raw_args.split(',') if arg.strip()]
+
+    if function == 'dateGenerate' and len(args) == 2:
+        time_part = {'start': '00:00:00', 'end': '23:59:59'}.get(args[1], args[1])
+        return f"{args[0]} {time_part}"
+
+    named_days = {'Today': 0, 'Yesterday': -1, 'Tomorrow': 1}
+    for prefix, boundary in (('beginningOf', _start_of_day), ('endOf', _end_of_day)):
+        if not function.startswith(prefix):
+            continue
+        name = function[len(prefix):]
+        if name in named_days:
+            return _format(boundary(now + timedelta(days=named_days[name])))
+        for relation, offset in (('This', 0), ('Last', -1), ('Next', 1)):
+            unit = name[len(relation):]
+            if name.startswith(relation) and unit in ('Week', 'Month', 'Year'):
+                start, end = _period(now, unit, offset)
+                return _format(start if prefix == 'beginningOf' else end)
+
+    ago = re.match(r'^(minutes|hours|days|months)Ago(Start|End)?$', function)
+    if ago and args and args[0].lstrip('-').isdigit():
+        unit, edge = ago.groups()
+        moment = _shift(now, unit[:-1], -int(args[0]))
+        if edge:
+            start, end = _unit_bounds(moment, unit)
+            moment = start if edge == 'Start' else end
+        return _format(moment)
+
+    raise UnsupportedQueryError(f"Cannot evaluate script value '{value}'")
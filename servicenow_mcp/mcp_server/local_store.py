@@ -0,0 +1,409 @@
+"""Local SQLite mirrors of ServiceNow tables, kept current by delta sync."""
+
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from .bulk import count_records, iter_sys_ids
+from .encoded_query import UnsupportedQueryError, parse, referenced_fields, translate
+from .metrics import decode_json
+from .pagination import build_page_query
+
+
+logger = logging.getLogger(__name__)
+
+STATE_TABLE = '_sync_state'
+
+# Columns every mirror needs: the primary key and the delta watermark
+REQUIRED_FIELDS = ('sys_id', 'sys_updated_on')
+
+_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_.]+$')
+
+
+def _identifier(name: str) -> str:
+    """Quote a table or field name for SQL, rejecting anything but ServiceNow-style names."""
+    if not _NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid table or field name '{name}'")
+    return f'"{name}"'
+
+
+def _to_text(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(',', ':'))
+
+
+class MirrorUnavailableError(Exception):
+    """Raised when a read cannot be served from the local mirror."""
+
+
+class LocalStore:
+    """
+    One SQLite database per instance holding mirrors of synced tables.
+
+    Each mirror has a TEXT column per synced field and sys_id as primary
+    key. The first sync downloads the whole table; later syncs fetch only
+    rows with sys_updated_on at or past the stored watermark. Deletes are
+    detected by comparing the local row count with the instance's, and only
+    when they differ are the instance's sys_ids scanned to find the rows to
+    remove.
+    """
+
+    def __init__(self, location: Optional[str] = None, page_size: int = 1000):
+        if location is None:
+            project_root = Path(__file__).parent.parent.parent
+            location = project_root / "cache" / "mirror"
+
+        self.location = Path(location)
+        self.page_size = page_size
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        # (instance, table, field) combinations already indexed for offline queries
+        self._indexed = set()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _path(self, instance_name: str) -> Path:
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in instance_name)
+        return self.location / f"{safe_name}.db"
+
+    def _connect(self, instance_name: str) -> sqlite3.Connection:
+        """Return the instance's database connection, creating the database on first use."""
+        conn = self._connections.get(instance_name)
+        if conn is not None:
+            return conn
+
+        self.location.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self._path(instance_name)), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+            "table_name TEXT PRIMARY KEY, fields TEXT, watermark TEXT, "
+            "synced_at REAL, row_count INTEGER)"
+        )
+        conn.commit()
+        self._connections[instance_name] = conn
+        return conn
+
+    def _get_lock(self, instance_name: str) -> asyncio.Lock:
+        lock = self._locks.get(instance_name)
+        if lock is None:
+            lock = self._locks[instance_name] = asyncio.Lock()
+        return lock
+
+    def get_state(self, instance_name: str, table: str) -> Optional[Dict]:
+        """Return the sync state of a mirror, or None if the table was never synced."""
+        row = self._connect(instance_name).execute(
+            f"SELECT * FROM {STATE_TABLE} WHERE table_name = ?", (table,)
+        ).fetchone()
+        if row is None:
+            return None
+        state = dict(row)
+        state['fields'] = json.loads(state['fields']) if state['fields'] else None
+        return state
+
+    def _save_state(self, conn: sqlite3.Connection, table: str, state: Dict):
+        conn.execute(
+            f"INSERT OR REPLACE INTO {STATE_TABLE} "
+            "(table_name, fields, watermark, synced_at, row_count) VALUES (?, ?, ?, ?, ?)",
+            (
+                table,
+                json.dumps(state['fields']) if state['fields'] else None,
+                state['watermark'],
+                state['synced_at'],
+                state['row_count']
+            )
+        )
+
+    def _reset(self, conn: sqlite3.Connection, table: str):
+        conn.execute(f"DROP TABLE IF EXISTS {_identifier(table)}")
+        conn.execute(f"DELETE FROM {STATE_TABLE} WHERE table_name = ?", (table,))
+
+    def _columns(self, conn: sqlite3.Connection, table: str) -> List[str]:
+        return [row['name'] for row in conn.execute(f"PRAGMA table_info({_identifier(table)})")]
+
+    def _upsert(self, conn: sqlite3.Connection, table: str, rows: List[Dict]):
+        """Insert or replace rows, adding columns for fields not seen before."""
+        if not rows:
+            return
+
+        names: Dict[str, None] = {}
+        for row in rows:
+            for field in row:
+                names.setdefault(field, None)
+
+        columns = self._columns(conn, table)
+        if not columns:
+            definitions = ', '.join(
+                f"{_identifier(name)} TEXT{' PRIMARY KEY' if name == 'sys_id' else ''}"
+                for name in names
+            )
+            conn.execute(f"CREATE TABLE {_identifier(table)} ({definitions})")
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_identifier(table + '_updated')} "
+                f"ON {_identifier(table)} (sys_updated_on)"
+            )
+        else:
+            for name in names:
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE {_identifier(table)} ADD COLUMN {_identifier(name)} TEXT")
+
+        fields = list(names)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {_identifier(table)} "
+            f"({', '.join(_identifier(field) for field in fields)}) "
+            f"VALUES ({', '.join('?' for _ in fields)})",
+            [[_to_text(row.get(field)) for field in fields] for row in rows]
+        )
+
+    def _count(self, conn: sqlite3.Connection, table: str) -> int:
+        if not self._columns(conn, table):
+            return 0
+        return conn.execute(f"SELECT COUNT(*) FROM {_identifier(table)}").fetchone()[0]
+
+    async def sync_table(
+        self,
+        instance_name: str,
+        client: httpx.AsyncClient,
+        base_url: str,
+        table: str,
+        fields: Optional[List[str]] = None,
+        full: bool = False
+    ) -> Dict:
+        """
+        Bring the local mirror of a table up to date.
+
+        Args:
+            instance_name: Instance the mirror belongs to
+            client: Authenticated client for the instance
+            base_url: Instance URL
+            table: Table name
+            fields: Fields to mirror; all fields when omitted. sys_id and
+                sys_updated_on are always included. Changing the list
+                triggers a full re-sync.
+            full: Discard the mirror and download the table again
+
+        Returns:
+            Dict describing the sync: mode, rows fetched and deleted,
+            mirror size and the new watermark
+        """
+        _identifier(table)
+        if fields:
+            fields = list(dict.fromkeys(list(REQUIRED_FIELDS) + list(fields)))
+            for field in fields:
+                _identifier(field)
+
+        async with self._get_lock(instance_name):
+            started = time.monotonic()
+            conn = self._connect(instance_name)
+            state = self.get_state(instance_name, table)
+            if full or state is None or state['fields'] != fields:
+                self._reset(conn, table)
+                conn.commit()
+                self._indexed = {key for key in self._indexed if key[:2] != (instance_name, table)}
+                state = None
+
+            watermark = state['watermark'] if state else None
+            table_url = f"{base_url}/api/now/table/{table}"
+            fetched = await self._fetch_changes(conn, table_url, client, table, fields, watermark)
+            if fetched['watermark']:
+                watermark = fetched['watermark']
+
+            deleted = 0
+            remote_count = None
+            if state is not None:
+                remote_count = await count_records(client, table_url, '')
+                if self._count(conn, table) != remote_count:
+                    deleted = await self._remove_deleted(conn, client, table_url, table)
+
+            row_count = self._count(conn, table)
+            self._save_state(conn, table, {
+                'fields': fields,
+                'watermark': watermark,
+                'synced_at': time.time(),
+                'row_count': row_count
+            })
+            conn.commit()
+
+        logger.info(
+            f"Synced {instance_name}/{table}: {fetched['rows']} fetched, {deleted} deleted, "
+            f"{row_count} rows"
+        )
+        return {
+            'table': table,
+            'mode': 'delta' if state is not None else 'full',
+            'fetched': fetched['rows'],
+            'deleted': deleted,
+            'rows': row_count,
+            'remote_rows': remote_count if remote_count is not None else row_count,
+            'watermark': watermark,
+            'duration_ms': round((time.monotonic() - started) * 1000)
+        }
+
+    async def _fetch_changes(
+        self,
+        conn: sqlite3.Connection,
+        table_url: str,
+        client: httpx.AsyncClient,
+        table: str,
+        fields: Optional[List[str]],
+        watermark: Optional[str]
+    ) -> Dict:
+        """Page through rows changed since watermark, ordered by (sys_updated_on, sys_id)."""
+        # >= because sys_updated_on has one-second resolution; upserting rows
+        # at the watermark again is harmless
+        query = f"sys_updated_on>={watermark}" if watermark else ''
+        last_values = None
+        rows_fetched = 0
+        newest = watermark
+
+        while True:
+            params = {
+                'sysparm_query': build_page_query(query, 'sys_updated_on', last_values),
+                'sysparm_limit': self.page_size,
+                'sysparm_exclude_reference_link': 'true',
+                'sysparm_no_count': 'true'
+            }
+            if fields:
+                params['sysparm_fields'] = ','.join(fields)
+
+            response = await client.get(table_url, params=params)
+            response.raise_for_status()
+            page = decode_json(response).get('result', [])
+            # A short page may only be missing ACL-hidden rows; stop on an empty one
+            if not page:
+                return {'rows': rows_fetched, 'watermark': newest}
+
+            self._upsert(conn, table, page)
+            conn.commit()
+            rows_fetched += len(page)
+            last = page[-1]
+            last_values = [last.get('sys_updated_on') or '', last['sys_id']]
+            newest = max(newest or '', last_values[0]) or None
+
+    async def _remove_deleted(
+        self,
+        conn: sqlite3.Connection,
+        client: httpx.AsyncClient,
+        table_url: str,
+        table: str
+    ) -> int:
+        """Delete local rows whose sys_id no longer exists on the instance."""
+        remote_ids = set()
+        async for sys_ids in iter_sys_ids(client, table_url, '', self.page_size):
+            remote_ids.update(sys_ids)
+
+        local_ids = [row[0] for row in conn.execute(f"SELECT sys_id FROM {_identifier(table)}")]
+        stale = [(sys_id,) for sys_id in local_ids if sys_id not in remote_ids]
+        conn.executemany(f"DELETE FROM {_identifier(table)} WHERE sys_id = ?", stale)
+        conn.commit()
+        return len(stale)
+
+    def read(
+        self,
+        instance_name: str,
+        table: str,
+        query: str,
+        fields: Optional[List[str]],
+        limit: int,
+        max_staleness_seconds: float,
+        page_keys: Optional[List[str]] = None,
+        after: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Run an encoded query against the local mirror.
+
+        Args:
+            instance_name: Instance the mirror belongs to
+            table: Table name
+            query: Encoded query, translated to SQL
+            fields: Columns to return; all mirrored fields when omitted
+            limit: Maximum rows
+            max_staleness_seconds: Refuse mirrors synced longer ago than this
+            page_keys: Sort keys for keyset pagination; replaces ORDERBY terms
+            after: Key values of the last row of the previous page
+
+        Returns:
+            Dict with the rows and the mirror's freshness
+
+        Raises:
+            MirrorUnavailableError: If the table is not mirrored, the mirror is
+                too old, or the query or fields cannot be served locally
+        """
+        state = self.get_state(instance_name, table)
+        if state is None:
+            raise MirrorUnavailableError(f"Table '{table}' is not mirrored; run sync_table first")
+        staleness = time.time() - state['synced_at']
+        if staleness > max_staleness_seconds:
+            raise MirrorUnavailableError(
+                f"Mirror of '{table}' was synced {round(staleness)}s ago, "
+                f"more than max_staleness ({max_staleness_seconds}s)"
+            )
+
+        conn = self._connect(instance_name)
+        columns = self._columns(conn, table)
+        missing = [field for field in fields or [] if field not in columns]
+        if missing:
+            raise MirrorUnavailableError(f"Fields not in the mirror: {', '.join(missing)}")
+
+        try:
+            where, params, order_terms = translate(query, columns)
+            self._ensure_indexes(conn, instance_name, table, referenced_fields(parse(query)))
+        except UnsupportedQueryError as e:
+            raise MirrorUnavailableError(str(e))
+
+        if page_keys:
+            order_terms = [f"{_identifier(key)} ASC" for key in page_keys]
+            if after:
+                keys = ', '.join(_identifier(key) for key in page_keys)
+                marks = ', '.join('?' for _ in page_keys)
+                where = f"({where}) AND ({keys}) > ({marks})"
+                params = params + list(after)
+
+        select = ', '.join(_identifier(field) for field in fields) if fields else '*'
+        sql = f"SELECT {select} FROM {_identifier(table)} WHERE {where}"
+        if order_terms:
+            sql += f" ORDER BY {', '.join(order_terms)}"
+        sql += " LIMIT ?"
+
+        rows = [dict(row) for row in conn.execute(sql, params + [limit])]
+        return {
+            'result': rows,
+            'source': 'mirror',
+            'synced_at': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(state['synced_at'])),
+            'staleness_seconds': round(staleness, 1)
+        }
+
+    def _ensure_indexes(
+        self,
+        conn: sqlite3.Connection,
+        instance_name: str,
+        table: str,
+        fields: List[str]
+    ):
+        """Index the columns an offline query filters or sorts on, once per column.
+
+        The index uses NOCASE collation to match the case-insensitive equality
+        the encoded query translation emits.
+        """
+        for field in fields:
+            if field == 'sys_id' or (instance_name, table, field) in self._indexed:
+                continue
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_identifier(f'{table}__{field}__nocase')} "
+                f"ON {_identifier(table)} ({_identifier(field)} COLLATE NOCASE)"
+            )
+            self._indexed.add((instance_name, table, field))
+        conn.commit()
+
+    def close_all(self):
+        """Close every open database connection."""
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
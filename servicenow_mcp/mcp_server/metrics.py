@@ -0,0 +1,418 @@
+"""Latency histograms and request counters for tool calls and upstream HTTP traffic."""
+
+import bisect
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, as in Prometheus client defaults plus a long tail for slow queries
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Upstream requests made by one tool call
+REQUEST_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000)
+
+UPSTREAM_COUNTERS = (
+    'requests', 'http_errors', 'throttled', 'request_bytes', 'response_bytes', 'coalesced'
+)
+
+# httpcore trace steps and the call phase their duration counts towards
+TRACE_PHASES = {
+    'connect_tcp': 'connect',
+    'connect_unix_socket': 'connect',
+    'start_tls': 'connect',
+    'send_request_headers': 'server_wait',
+    'send_request_body': 'server_wait',
+    'receive_response_headers': 'server_wait',
+    'receive_response_body': 'download'
+}
+
+# Upstream requests listed individually in the record of a traced call
+MAX_TRACED_REQUESTS = 100
+
+# Prometheus HELP text of the counters
+COUNTER_HELP = {
+    'calls': 'Tool calls.',
+    'errors': 'Tool calls that returned an error.',
+    'requests': 'HTTP round trips to the instance, including retries.',
+    'http_errors': 'Upstream responses with status 400 or above.',
+    'throttled': 'Upstream HTTP 429 responses.',
+    'request_bytes': 'Request body bytes sent upstream.',
+    'response_bytes': 'Response body bytes received from upstream.',
+    'coalesced': 'GET requests not sent because an identical one was in flight.'
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram with quantile estimates."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One count per bucket plus the +Inf bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def summary(self, digits: int = 4, quantiles: bool = True) -> Dict:
+        """Count, mean, p50/p95/p99 (unless quantiles is False) and maximum."""
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, digits)
+
+        result = {
+            'count': self.count,
+            'mean': rounded(self.sum / self.count) if self.count else None
+        }
+        if quantiles:
+            result.update({
+                'p50': rounded(self.quantile(0.5)),
+                'p95': rounded(self.quantile(0.95)),
+                'p99': rounded(self.quantile(0.99))
+            })
+        result['max'] = rounded(self.max) if self.count else None
+        return result
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs in Prometheus bucket order."""
+        pairs = []
+        total = 0
+        for bound, bucket_count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += bucket_count
+            pairs.append((str(bound), total))
+        return pairs
+
+
+class CallStats:
+    """What one tool call spent, collected while it runs."""
+
+    def __init__(self, tool: str, instance: Optional[str]):
+        self.tool = tool
+        self.instance = instance
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.upstream = dict.fromkeys(UPSTREAM_COUNTERS, 0)
+        self.error: Optional[str] = None
+        # Individual upstream requests; only recorded, with network phases, for traced calls
+        self.requests: Optional[List[Dict]] = None
+
+
+# The tool call the current task is serving; asyncio tasks it starts share the same CallStats
+_current_call: ContextVar[Optional[CallStats]] = ContextVar('servicenow_mcp_call', default=None)
+
+
+def current_call() -> Optional[CallStats]:
+    """The tool call the current task is serving, if any."""
+    return _current_call.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the block's duration to a phase of the current tool call, if any."""
+    call = _current_call.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if call is not None:
+            call.phases[name] = call.phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def decode_json(response: httpx.Response) -> Any:
+    """Parse a response body as JSON, timed as the json_decode phase."""
+    with phase('json_decode'):
+        return response.json()
+
+
+def _network_trace(call: CallStats):
+    """httpcore trace callback adding connect, server wait and download time to the call."""
+    started: Dict[str, float] = {}
+
+    async def trace(event_name: str, info: Dict):
+        # e.g. 'connection.start_tls.started' or 'http11.receive_response_body.complete'
+        step, _, stage = event_name.rpartition('.')
+        step = step.rpartition('.')[2]
+        name = TRACE_PHASES.get(step)
+        if name is None:
+            return
+        if stage == 'started':
+            started[step] = time.perf_counter()
+        elif step in started:
+            elapsed = time.perf_counter() - started.pop(step)
+            call.phases[name] = call.phases.get(name, 0.0) + elapsed
+
+    return trace
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Response body stream that reports its size once read."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_bytes):
+        self._stream = stream
+        self._on_bytes = on_bytes
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._on_bytes(len(chunk))
+            yield chunk
+
+    async def aclose(self):
+        await self._stream.aclose()
+
+
+class MetricsTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport counting round trips, status codes and body bytes.
+
+    Counts go to the instance totals and to the tool call being served.
+    Placed below the admission layer, so every retry is a round trip.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: 'ServerMetrics', instance_name: str):
+        self._transport = transport
+        self.metrics = metrics
+        self.instance_name = instance_name
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        call = _current_call.get()
+        try:
+            request_bytes = len(request.content)
+        except httpx.RequestNotRead:
+            request_bytes = int(request.headers.get('Content-Length', 0))
+
+        traced = call is not None and call.requests is not None
+        if traced:
+            request.extensions['trace'] = _network_trace(call)
+            started = time.perf_counter()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self.metrics.count_upstream(
+                self.instance_name, call, requests=1, http_errors=1, request_bytes=request_bytes
+            )
+            raise
+
+        status = response.status_code
+        if traced and len(call.requests) < MAX_TRACED_REQUESTS:
+            call.requests.append({
+                'method': request.method,
+                'path': request.url.path,
+                'status': status,
+                'ms': round((time.perf_counter() - started) * 1000, 3)
+            })
+        self.metrics.count_upstream(
+            self.instance_name,
+            call,
+            requests=1,
+            http_errors=int(status >= 400),
+            throttled=int(status == 429),
+            request_bytes=request_bytes
+        )
+
+        def on_bytes(size: int):
+            self.metrics.count_upstream(self.instance_name, call, response_bytes=size)
+
+        response.stream = _CountingStream(response.stream, on_bytes)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class ServerMetrics:
+    """
+    Per-tool and per-instance latency histograms and upstream counters.
+
+    Each tool call is timed as a whole and by phase (session lookup and
+    verification, validation, the tool's own work, result serialization).
+    Optionally the metrics are written in Prometheus text format to a file
+    for node_exporter's textfile collector.
+    """
+
+    def __init__(self, textfile: Optional[str] = None, textfile_interval_seconds: float = 15):
+        self.textfile = textfile
+        self.textfile_interval_seconds = textfile_interval_seconds
+        self._lock = Lock()
+        self._tool_latency: Dict[str, Histogram] = {}
+        self._tool_requests: Dict[str, Histogram] = {}
+        self._instance_latency: Dict[str, Histogram] = {}
+        self._phase_latency: Dict[Tuple[str, str], Histogram] = {}
+        self._tool_counters: Dict[str, Dict[str, int]] = {}
+        self._upstream: Dict[str, Dict[str, int]] = {}
+        self._textfile_written_at = 0.0
+
+    @contextmanager
+    def track_call(self, tool: str, instance: Optional[str]) -> Iterator[CallStats]:
+        """Time a tool call and attribute the upstream requests made inside it."""
+        call = CallStats(tool, instance)
+        token = _current_call.set(call)
+        try:
+            yield call
+        finally:
+            _current_call.reset(token)
+            self._record_call(call, time.perf_counter() - call.started)
+            self.maybe_write_textfile()
+
+    def count_upstream(self, instance_name: str, call: Optional[CallStats], **counts: int):
+        with self._lock:
+            totals = self._upstream.setdefault(instance_name, dict.fromkeys(UPSTREAM_COUNTERS, 0))
+            for key, value in counts.items():
+                totals[key] += value
+                if call is not None:
+                    call.upstream[key] += value
+
+    def _record_call(self, call: CallStats, seconds: float):
+        with self._lock:
+            self._tool_latency.setdefault(call.tool, Histogram()).observe(seconds)
+            self._tool_requests.setdefault(call.tool, Histogram(REQUEST_COUNT_BUCKETS)).observe(
+                call.upstream['requests']
+            )
+            if call.instance:
+                self._instance_latency.setdefault(call.instance, Histogram()).observe(seconds)
+            for name, phase_seconds in call.phases.items():
+                self._phase_latency.setdefault((call.tool, name), Histogram()).observe(phase_seconds)
+
+            counters = self._tool_counters.setdefault(
+                call.tool, {'calls': 0, 'errors': 0, **dict.fromkeys(UPSTREAM_COUNTERS, 0)}
+            )
+            counters['calls'] += 1
+            counters['errors'] += int(call.error is not None)
+            for key, value in call.upstream.items():
+                counters[key] += value
+
+    def snapshot(self) -> Dict:
+        """Summaries for get_server_metrics."""
+        with self._lock:
+            tools = {}
+            for tool, counters in sorted(self._tool_counters.items()):
+                tools[tool] = {
+                    **counters,
+                    'latency_seconds': self._tool_latency[tool].summary(),
+                    'upstream_requests_per_call': self._tool_requests[tool].summary(digits=2, quantiles=False),
+                    'phases_seconds': {
+                        name: histogram.summary()
+                        for (phase_tool, name), histogram in sorted(self._phase_latency.items())
+                        if phase_tool == tool
+                    }
+                }
+            instances = {
+                name: {
+                    'latency_seconds': self._instance_latency[name].summary()
+                    if name in self._instance_latency else None,
+                    'upstream': dict(self._upstream.get(name, {}))
+                }
+                for name in sorted(set(self._instance_latency) | set(self._upstream))
+            }
+        return {'tools': tools, 'instances': instances}
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, series: Dict[Tuple[Tuple[str, str], ...], Histogram]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, hist in sorted(series.items()):
+                for le, total in hist.cumulative():
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {total}")
+                lines.append(f"{name}_sum{_labels(labels)} {hist.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+
+        def counter(name: str, help_text: str, series: Dict[Tuple[Tuple[str, str], ...], int]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+        with self._lock:
+            histogram(
+                'servicenow_mcp_tool_duration_seconds', 'Tool call duration.',
+                {(('tool', tool),): hist for tool, hist in self._tool_latency.items()}
+            )
+            histogram(
+                'servicenow_mcp_tool_phase_duration_seconds', 'Time spent per phase of a tool call.',
+                {(('tool', tool), ('phase', name)): hist for (tool, name), hist in self._phase_latency.items()}
+            )
+            histogram(
+                'servicenow_mcp_tool_upstream_requests', 'Upstream HTTP requests per tool call.',
+                {(('tool', tool),): hist for tool, hist in self._tool_requests.items()}
+            )
+            histogram(
+                'servicenow_mcp_instance_duration_seconds', 'Tool call duration per instance.',
+                {(('instance', name),): hist for name, hist in self._instance_latency.items()}
+            )
+            for key in ('calls', 'errors'):
+                counter(
+                    f'servicenow_mcp_tool_{key}_total', COUNTER_HELP[key],
+                    {(('tool', tool),): counters[key] for tool, counters in self._tool_counters.items()}
+                )
+            for key in UPSTREAM_COUNTERS:
+                counter(
+                    f'servicenow_mcp_upstream_{key}_total', COUNTER_HELP[key],
+                    {(('instance', name),): totals[key] for name, totals in self._upstream.items()}
+                )
+        return '\n'.join(lines) + '\n'
+
+    def maybe_write_textfile(self, force: bool = False):
+        """Rewrite the textfile if configured and the interval has passed."""
+        if not self.textfile:
+            return
+        now = time.monotonic()
+        if not force and now - self._textfile_written_at < self.textfile_interval_seconds:
+            return
+        self._textfile_written_at = now
+
+        path = os.path.abspath(self.textfile)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # The collector must never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.servicenow_mcp', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(self.render_prometheus())
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to write metrics textfile: {e}")
+
+
+def _labels(pairs: Tuple[Tuple[str, str], ...]) -> str:
+    if not pairs:
+        return ''
+    escaped = []
+    for key, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
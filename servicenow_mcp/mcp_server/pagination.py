@@ -0,0 +1,103 @@
+"""Keyset pagination over the ServiceNow Table API using opaque cursors."""
+
+import base64
+import json
+from typing import Dict, List, Optional
+
+
+# Sort keys available for pagination; the last key of each must be unique per record
+PAGE_KEYS = {
+    'sys_id': ('sys_id',),
+    'sys_updated_on': ('sys_updated_on', 'sys_id'),
+}
+
+CURSOR_VERSION = 1
+
+
+def encode_cursor(table: str, query: str, order_by: str, last_values: List[str]) -> str:
+    """Encode the position after a page as an opaque continuation token."""
+    state = {'v': CURSOR_VERSION, 't': table, 'q': query, 'o': order_by, 'k': last_values}
+    raw = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """Decode a continuation token produced by encode_cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor: not a token returned by this server")
+
+    if not isinstance(state, dict) or state.get('v') != CURSOR_VERSION:
+        raise ValueError("Invalid cursor: unsupported cursor version")
+    if state.get('o') not in PAGE_KEYS or len(state.get('k') or []) != len(PAGE_KEYS[state['o']]):
+        raise ValueError("Invalid cursor: unknown sort key")
+
+    return state
+
+
+def build_page_query(query: str, order_by: str, last_values: Optional[List[str]] = None) -> str:
+    """
+    Build the encoded query for one page.
+
+    The first page only adds the ORDERBY terms. Later pages also filter to
+    records sorting after last_values, so each page is an indexed range
+    scan instead of an ever-growing offset.
+    """
+    if order_by not in PAGE_KEYS:
+        raise ValueError(
+            f"Cannot paginate by '{order_by}'. Supported keys: {', '.join(PAGE_KEYS)}"
+        )
+    if 'ORDERBY' in query:
+        raise ValueError("Paginated queries cannot contain ORDERBY; use order_by instead")
+
+    keys = PAGE_KEYS[order_by]
+    order_terms = '^'.join(f"ORDERBY{key}" for key in keys)
+    prefix = f"{query}^" if query else ''
+
+    if not last_values:
+        return f"{prefix}{order_terms}"
+
+    if len(keys) == 1:
+        return f"{prefix}{keys[0]}>{last_values[0]}^{order_terms}"
+
+    # (a > x) OR (a = x AND b > y), expressed as two OR'ed queries with ^NQ
+    if '^NQ' in query:
+        raise ValueError(f"Queries containing ^NQ cannot be paginated by '{order_by}'")
+    first, second = keys
+    return (
+        f"{prefix}{first}>{last_values[0]}"
+        f"^NQ{prefix}{first}={last_values[0]}^{second}>{last_values[1]}"
+        f"^{order_terms}"
+    )
+
+
+def next_page_cursor(
+    table: str,
+    query: str,
+    order_by: str,
+    records: List[Dict]
+) -> Optional[str]:
+    """
+    Return the cursor for the page after records, or None when records is empty.
+
+    A page shorter than the requested limit is not necessarily the last:
+    ServiceNow drops rows the caller's ACLs hide after applying the limit,
+    so only an empty page marks the end.
+    """
+    if not records:
+        return None
+
+    last_record = records[-1]
+    last_values = [last_record.get(key) for key in PAGE_KEYS[order_by]]
+    # With sysparm_display_value=all each field is a {value, display_value} pair
+    last_values = [
+        value.get('value') if isinstance(value, dict) else value for value in last_values
+    ]
+    if any(value is None for value in last_values):
+        raise ValueError(
+            f"Records are missing the pagination key(s) {', '.join(PAGE_KEYS[order_by])}"
+        )
+
+    return encode_cursor(table, query, order_by, [str(value) for value in last_values])
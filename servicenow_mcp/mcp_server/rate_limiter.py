@@ -0,0 +1,238 @@
+"""Per-instance admission control for ServiceNow API requests."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from .metrics import phase
+from .resilience import IDEMPOTENT_METHODS
+
+
+logger = logging.getLogger(__name__)
+
+# Status codes ServiceNow returns when rate limit rules or semaphores reject a request
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class TokenBucket:
+    """Token bucket limiting the sustained request rate."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdmissionController:
+    """
+    Decides when a request to one instance may be sent.
+
+    Combines a token bucket for the request rate with an AIMD concurrency
+    window: the window grows additively while requests succeed and is cut
+    multiplicatively when the instance answers 429/503. A Retry-After
+    header pauses all new requests to the instance until it has elapsed.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 20,
+        burst: int = 40,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        decrease_factor: float = 0.5,
+        decrease_interval_seconds: float = 1.0
+    ):
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.decrease_factor = decrease_factor
+        self.decrease_interval_seconds = decrease_interval_seconds
+
+        self._window = float(
+            min(max(initial_concurrency, self.min_concurrency), self.max_concurrency)
+        )
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        # Created lazily so the controller can be built outside the event loop
+        self._condition: Optional[asyncio.Condition] = None
+
+        self.stats = {
+            'requests': 0,
+            'throttled': 0,
+            'retries': 0,
+            'wait_seconds': 0.0
+        }
+
+    @property
+    def window(self) -> int:
+        """Number of requests currently allowed in flight."""
+        return int(self._window)
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        """Wait for a pause, a free concurrency slot and a rate token."""
+        started = time.monotonic()
+
+        delay = self._paused_until - started
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < self.window)
+            self._in_flight += 1
+
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            # Cancelled while waiting for a token: the slot was never used
+            async with condition:
+                self._in_flight -= 1
+                condition.notify_all()
+            raise
+
+        self.stats['requests'] += 1
+        self.stats['wait_seconds'] += time.monotonic() - started
+
+    async def release(self, status_code: Optional[int], retry_after: Optional[float] = None):
+        """
+        Free the request's slot and adapt the window to the response.
+
+        Args:
+            status_code: HTTP status of the response, or None on a transport error
+            retry_after: Seconds the instance asked us to wait, if any
+        """
+        now = time.monotonic()
+
+        if status_code in THROTTLE_STATUS_CODES:
+            self.stats['throttled'] += 1
+            if now - self._last_decrease >= self.decrease_interval_seconds:
+                self._window = max(self.min_concurrency, self._window * self.decrease_factor)
+                self._last_decrease = now
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+        elif status_code is not None and status_code < 500:
+            self._window = min(self.max_concurrency, self._window + 1 / self._window)
+
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    def get_stats(self) -> Dict:
+        """Current window and counters."""
+        return {
+            'window': self.window,
+            'in_flight': self._in_flight,
+            'paused_seconds': max(0.0, round(self._paused_until - time.monotonic(), 3)),
+            **self.stats,
+            'wait_seconds': round(self.stats['wait_seconds'], 3)
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdmissionTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that sends every request through an AdmissionController.
+
+    Throttled requests are retried up to max_retries times after the
+    Retry-After delay, or an exponential backoff when none is given. A 429
+    comes from the instance's rate limit rules before the request is
+    processed, so it is retried for every method. A 503 may come from a
+    gateway or node after a write was applied, so it is only retried for
+    idempotent methods.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        controller: AdmissionController,
+        max_retries: int = 3,
+        max_backoff_seconds: float = 30.0
+    ):
+        self._transport = transport
+        self.controller = controller
+        self.max_retries = max_retries
+        self.max_backoff_seconds = max_backoff_seconds
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            with phase('admission_wait'):
+                await self.controller.acquire()
+            try:
+                response = await self._transport.handle_async_request(request)
+            except BaseException:
+                await self.controller.release(None)
+                raise
+
+            retry_after = None
+            if response.status_code in THROTTLE_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is None:
+                    retry_after = min(self.max_backoff_seconds, 2.0 ** attempt)
+            await self.controller.release(response.status_code, retry_after)
+
+            retryable = response.status_code == 429 or (
+                response.status_code in THROTTLE_STATUS_CODES and request.method in IDEMPOTENT_METHODS
+            )
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            attempt += 1
+            self.controller.stats['retries'] += 1
+            logger.info(
+                f"{request.url.host} answered {response.status_code}, "
+                f"retrying in {retry_after:.1f}s (attempt {attempt}/{self.max_retries})"
+            )
+            await response.aclose()
+
+    async def aclose(self):
+        await self._transport.aclose()
@@ -0,0 +1,175 @@
+"""Retries of idempotent requests and a per-instance circuit breaker."""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+# Methods that can be sent again without changing anything on the instance
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Gateway errors in front of an instance that is waking up or restarting; 503 is
+# left to the admission layer, which treats it as throttling
+RETRY_STATUS_CODES = (502, 504)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while an instance's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fails requests to an unreachable instance fast instead of waiting on each one.
+
+    After failure_threshold consecutive failures (transport errors or 5xx
+    responses) the circuit opens and requests are rejected for
+    cooldown_seconds. The first request after the cool-down is let through
+    as a probe while others are still rejected; its success closes the
+    circuit, its failure opens it for another cool-down.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 30):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+        self.stats = {
+            'retries': 0,
+            'opened': 0,
+            'rejected': 0,
+            'probes': 0
+        }
+
+    def before_request(self, instance_name: str):
+        """Admit a request, or raise CircuitOpenError while the circuit is open."""
+        if self.state == 'closed':
+            return
+
+        remaining = self._opened_at + self.cooldown_seconds - time.monotonic()
+        if self.state == 'open' and remaining <= 0:
+            self.state = 'half_open'
+        if self.state == 'half_open' and not self._probing:
+            self._probing = True
+            self.stats['probes'] += 1
+            return
+
+        self.stats['rejected'] += 1
+        raise CircuitOpenError(
+            f"Instance '{instance_name}' is unreachable after {self._failures} consecutive "
+            f"failures; next attempt allowed in {max(0.0, remaining):.0f}s"
+        )
+
+    def record_success(self):
+        """Close the circuit after a response below 500."""
+        if self.state != 'closed':
+            logger.info("Circuit closed after a successful probe")
+        self.state = 'closed'
+        self._failures = 0
+        self._probing = False
+
+    def record_abandoned(self):
+        """Free the probe slot of a request that ended without reaching the instance."""
+        self._probing = False
+
+    def record_failure(self):
+        """Count a transport error or 5xx; open the circuit at the threshold or on a failed probe."""
+        self._failures += 1
+        if self.state == 'half_open' or self._failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.stats['opened'] += 1
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def get_stats(self) -> Dict:
+        """Current state and counters."""
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            **self.stats
+        }
+
+
+def backoff_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (1-based)."""
+    return random.uniform(0, min(max_seconds, base_seconds * 2 ** (attempt - 1)))
+
+
+class ResilienceTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that retries idempotent requests and applies a circuit breaker.
+
+    GET/HEAD requests failing with a connection error or a 502/504 are
+    retried up to max_retries times with jittered exponential backoff.
+    Timeouts are not retried: the request already waited the full timeout,
+    and repeating it would multiply the wait the circuit breaker is meant
+    to avoid. Placed above the admission layer, so every retry is admitted
+    like a new request.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        breaker: CircuitBreaker,
+        instance_name: str,
+        max_retries: int = 2,
+        backoff_base_seconds: float = 0.5,
+        max_backoff_seconds: float = 8.0
+    ):
+        self._transport = transport
+        self.breaker = breaker
+        self.instance_name = instance_name
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retryable = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.breaker.before_request(self.instance_name)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                if not retryable or isinstance(e, httpx.TimeoutException) or attempt >= self.max_retries:
+                    raise
+                reason = type(e).__name__
+            except BaseException:
+                # Cancellation says nothing about the instance
+                self.breaker.record_abandoned()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if (
+                    not retryable
+                    or response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                reason = f"HTTP {response.status_code}"
+                await response.aclose()
+
+            attempt += 1
+            self.breaker.stats['retries'] += 1
+            delay = backoff_delay(attempt, self.backoff_base_seconds, self.max_backoff_seconds)
+            logger.info(
+                f"{request.method} {request.url.path} on '{self.instance_name}' failed ({reason}), "
+                f"retrying in {delay:.1f}s (attempt {attempt}/{self.max_retries})"
+            )
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
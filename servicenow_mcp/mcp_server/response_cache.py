@@ -0,0 +1,104 @@
+"""In-process read-through cache for slow-changing ServiceNow tables."""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+
+CacheKey = Tuple[str, str, str, Tuple]
+
+
+class ResponseCache:
+    """
+    LRU cache of Table API responses with per-table time-to-live.
+
+    Only tables listed in ttl_seconds are cached. Entries are keyed by
+    instance, table, URL and request parameters (query, fields, limit, ...),
+    and writes invalidate every entry of the written table on that instance.
+    """
+
+    def __init__(self, ttl_seconds: Dict[str, float], max_entries: int = 256):
+        self.ttl_seconds = {table: ttl for table, ttl in ttl_seconds.items() if ttl and ttl > 0}
+        self.max_entries = max_entries
+        self._lock = Lock()
+        # key -> (expires_at, value)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict]]" = OrderedDict()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    def make_key(
+        self,
+        instance_name: str,
+        table: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Optional[CacheKey]:
+        """Build the cache key for a read, or None if the table is not cached."""
+        if table not in self.ttl_seconds:
+            return None
+        frozen_params = tuple(sorted((name, str(value)) for name, value in (params or {}).items()))
+        return (instance_name, table, url, frozen_params)
+
+    def get(self, key: Optional[CacheKey]) -> Optional[Dict]:
+        """Return the cached value for key if present and fresh."""
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def put(self, key: Optional[CacheKey], value: Dict):
+        """Store a value, evicting the least recently used entries beyond max_entries."""
+        if key is None:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds[key[1]]
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, instance_name: Optional[str] = None, table: Optional[str] = None):
+        """Drop entries for an instance and table; None matches every instance or table."""
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (instance_name is None or key[0] == instance_name)
+                and (table is None or key[1] == table)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.stats['invalidations'] += len(stale)
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters, hit rate and current size."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': round(self.stats['hits'] / lookups, 3) if lookups else None,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
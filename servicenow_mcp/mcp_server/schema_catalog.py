@@ -0,0 +1,388 @@
+"""Persistent per-instance catalog of table schemas with inheritance resolution."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from .bulk import count_records
+from .metrics import decode_json
+from .pagination import build_page_query
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+DICTIONARY_FIELDS = (
+    'sys_id,name,element,column_label,internal_type,mandatory,max_length,reference,sys_updated_on'
+)
+TABLE_FIELDS = 'sys_id,name,label,super_class.name,sys_updated_on'
+
+# Attributes returned for each field by get_table_schema
+FIELD_ATTRIBUTES = ('column_label', 'internal_type', 'mandatory', 'max_length', 'reference')
+
+PAGE_SIZE = 1000
+
+
+class SchemaCatalog:
+    """
+    Local copy of sys_db_object and sys_dictionary for the tables in use.
+
+    A table's schema includes the fields of every ancestor in its
+    super_class chain (incident -> task), with fields redefined on a child
+    overriding the parent. Catalogs are stored on disk, one JSON file per
+    instance, and refreshed incrementally: only rows whose sys_updated_on is
+    past the stored watermark are fetched again. Deleted fields leave no row
+    to fetch, so each refresh also compares the number of dictionary entries
+    with the catalog's and, when they differ, drops fields no longer listed.
+    """
+
+    def __init__(self, location: Optional[str] = None, refresh_interval_seconds: float = 3600):
+        if location is None:
+            project_root = Path(__file__).parent.parent.parent
+            location = project_root / "cache" / "schema"
+
+        self.location = Path(location)
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._catalogs: Dict[str, Dict] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # (instance, table) -> (monotonic expiry, problem to report) of failed lookups;
+        # table None marks an instance whose schema tables cannot be read at all
+        self._failed_lookups: Dict[Tuple[str, Optional[str]], Tuple[float, str]] = {}
+
+    def _path(self, instance_name: str) -> Path:
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in instance_name)
+        return self.location / f"{safe_name}.json"
+
+    def _load(self, instance_name: str) -> Dict:
+        """Return the in-memory catalog, loading it from disk on first use."""
+        catalog = self._catalogs.get(instance_name)
+        if catalog is not None:
+            return catalog
+
+        path = self._path(instance_name)
+        catalog = None
+        if path.exists():
+            try:
+                with open(path, 'r') as f:
+                    catalog = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                catalog = None
+
+        if not catalog or catalog.get('version') != CATALOG_VERSION:
+            catalog = {
+                'version': CATALOG_VERSION,
+                'tables': {},
+                'fields': {},
+                'watermarks': {},
+                'refreshed_at': 0
+            }
+
+        self._catalogs[instance_name] = catalog
+        return catalog
+
+    def _save(self, instance_name: str):
+        """Write the catalog to disk atomically."""
+        path = self._path(instance_name)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(self._catalogs[instance_name], f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except IOError as e:
+            logger.warning(f"Failed to save schema catalog for '{instance_name}': {e}")
+
+    def _get_lock(self, instance_name: str) -> asyncio.Lock:
+        lock = self._locks.get(instance_name)
+        if lock is None:
+            lock = self._locks[instance_name] = asyncio.Lock()
+        return lock
+
+    def record_failed_lookup(self, instance_name: str, table: Optional[str], problem: str = ''):
+        """
+        Remember that loading a schema failed, so callers can skip fetching it again.
+
+        A table is skipped for refresh_interval_seconds. With table None the
+        whole instance is skipped until forget_failures, for users without
+        read access to sys_db_object and sys_dictionary.
+        """
+        expires = float('inf') if table is None else time.monotonic() + self.refresh_interval_seconds
+        self._failed_lookups[(instance_name, table)] = (expires, problem)
+
+    def failed_lookup(self, instance_name: str, table: str) -> Optional[str]:
+        """Problem recorded for a recent failed lookup of the table ('' if none to report), else None."""
+        for key in ((instance_name, None), (instance_name, table)):
+            entry = self._failed_lookups.get(key)
+            if entry is None:
+                continue
+            if entry[0] > time.monotonic():
+                return entry[1]
+            del self._failed_lookups[key]
+        return None
+
+    def forget_failures(self, instance_name: str):
+        """Drop the failed lookups of an instance, e.g. after its configuration changed."""
+        for key in [key for key in self._failed_lookups if key[0] == instance_name]:
+            del self._failed_lookups[key]
+
+    def get_hierarchy(self, instance_name: str, table: str) -> List[str]:
+        """Return table followed by its known ancestors, nearest first."""
+        tables = self._load(instance_name)['tables']
+        chain = []
+        current = table
+        while current and current in tables and current not in chain:
+            chain.append(current)
+            current = tables[current].get('super_class')
+        return chain
+
+    def get_fields(self, instance_name: str, table: str) -> Optional[Dict[str, Dict]]:
+        """
+        Resolve a table's fields from the local catalog only.
+
+        Returns None if the table or one of its ancestors has not been
+        loaded yet.
+        """
+        catalog = self._load(instance_name)
+        chain = self.get_hierarchy(instance_name, table)
+        if not chain or self._chain_incomplete(catalog, chain):
+            return None
+
+        fields: Dict[str, Dict] = {}
+        # Walk from the root ancestor down so child definitions override parents
+        for defining_table in reversed(chain):
+            for element, definition in catalog['fields'].get(defining_table, {}).items():
+                fields[element] = {**definition, 'defined_on': defining_table}
+        return fields
+
+    @staticmethod
+    def _chain_incomplete(catalog: Dict, chain: List[str]) -> bool:
+        """Check whether any table in chain lacks fields or ends at an unloaded parent."""
+        if any(table not in catalog['fields'] for table in chain):
+            return True
+        return catalog['tables'][chain[-1]].get('super_class') is not None
+
+    async def get_table_schema(
+        self,
+        instance_name: str,
+        client: httpx.AsyncClient,
+        base_url: str,
+        table: str,
+        force_refresh: bool = False
+    ) -> Dict:
+        """
+        Return the full schema of a table, fetching only what is missing or changed.
+
+        Args:
+            instance_name: Instance the catalog belongs to
+            client: Authenticated client for the instance
+            base_url: Instance URL
+            table: Table name
+            force_refresh: Re-fetch the table chain instead of using the catalog
+
+        Returns:
+            Dict with the field list, the inheritance chain and catalog metadata
+        """
+        async with self._get_lock(instance_name):
+            catalog = self._load(instance_name)
+            changed = False
+
+            if force_refresh:
+                for known in self.get_hierarchy(instance_name, table):
+                    catalog['tables'].pop(known, None)
+                    catalog['fields'].pop(known, None)
+            elif time.time() - catalog['refreshed_at'] >= self.refresh_interval_seconds:
+                changed = await self._refresh(catalog, client, base_url)
+
+            changed = await self._load_chain(catalog, client, base_url, table) or changed
+            if changed:
+                self._save(instance_name)
+
+        fields = self.get_fields(instance_name, table)
+        if fields is None:
+            raise ValueError(f"Table '{table}' not found in sys_db_object")
+        self._failed_lookups.pop((instance_name, table), None)
+        self._failed_lookups.pop((instance_name, None), None)
+
+        return {
+            'result': [
+                {'element': element, **definition} for element, definition in fields.items()
+            ],
+            'table_hierarchy': self.get_hierarchy(instance_name, table),
+            'catalog_refreshed_at': catalog['refreshed_at']
+        }
+
+    async def _load_chain(
+        self,
+        catalog: Dict,
+        client: httpx.AsyncClient,
+        base_url: str,
+        table: str
+    ) -> bool:
+        """Fetch the table, its missing ancestors and their dictionary entries."""
+        changed = False
+        missing_fields = []
+
+        current = table
+        seen = set()
+        while current and current not in seen:
+            seen.add(current)
+            if current not in catalog['tables']:
+                rows = await self._fetch_all(
+                    client, f"{base_url}/api/now/table/sys_db_object", f"name={current}", TABLE_FIELDS
+                )
+                if not rows:
+                    break
+                self._merge_tables(catalog, rows, advance_watermark=False)
+                changed = True
+            if current not in catalog['fields']:
+                missing_fields.append(current)
+            current = catalog['tables'][current].get('super_class')
+
+        if missing_fields:
+            rows = await self._fetch_all(
+                client,
+                f"{base_url}/api/now/table/sys_dictionary",
+                f"nameIN{','.join(missing_fields)}^elementISNOTEMPTY",
+                DICTIONARY_FIELDS
+            )
+            for name in missing_fields:
+                catalog['fields'].setdefault(name, {})
+            self._merge_fields(catalog, rows, advance_watermark=False)
+            changed = True
+
+        if changed and not catalog['refreshed_at']:
+            catalog['refreshed_at'] = time.time()
+        return changed
+
+    async def _refresh(self, catalog: Dict, client: httpx.AsyncClient, base_url: str) -> bool:
+        """Fetch rows of known tables changed since the stored watermarks."""
+        known_tables = sorted(catalog['tables'])
+        if known_tables:
+            names = ','.join(known_tables)
+            watermarks = catalog['watermarks']
+
+            table_rows = await self._fetch_all(
+                client,
+                f"{base_url}/api/now/table/sys_db_object",
+                self._since(f"nameIN{names}", watermarks.get('sys_db_object')),
+                TABLE_FIELDS
+            )
+            self._merge_tables(catalog, table_rows)
+
+            field_tables = ','.join(sorted(catalog['fields']))
+            field_rows = []
+            removed = 0
+            if field_tables:
+                dictionary_url = f"{base_url}/api/now/table/sys_dictionary"
+                field_query = f"nameIN{field_tables}^elementISNOTEMPTY"
+                field_rows = await self._fetch_all(
+                    client,
+                    dictionary_url,
+                    self._since(field_query, watermarks.get('sys_dictionary')),
+                    DICTIONARY_FIELDS
+                )
+                self._merge_fields(catalog, field_rows)
+                removed = await self._remove_deleted_fields(catalog, client, dictionary_url, field_query)
+
+            logger.info(
+                f"Schema catalog refreshed: {len(table_rows)} table and "
+                f"{len(field_rows)} field change(s), {removed} field(s) removed"
+            )
+
+        catalog['refreshed_at'] = time.time()
+        return True
+
+    async def _remove_deleted_fields(
+        self,
+        catalog: Dict,
+        client: httpx.AsyncClient,
+        dictionary_url: str,
+        field_query: str
+    ) -> int:
+        """Drop catalog fields whose dictionary entry no longer exists on the instance."""
+        local_count = sum(len(fields) for fields in catalog['fields'].values())
+        if await count_records(client, dictionary_url, field_query) == local_count:
+            return 0
+
+        rows = await self._fetch_all(client, dictionary_url, field_query, 'sys_id,name,element')
+        remote = {(row['name'], row['element']) for row in rows}
+        removed = 0
+        for table, fields in catalog['fields'].items():
+            for element in [element for element in fields if (table, element) not in remote]:
+                del fields[element]
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _since(query: str, watermark: Optional[str]) -> str:
+        # >= because sys_updated_on has one-second resolution; re-reading
+        # rows at the watermark is harmless
+        return f"{query}^sys_updated_on>={watermark}" if watermark else query
+
+    @staticmethod
+    def _advance_watermark(catalog: Dict, source: str, rows: List[Dict], advance: bool):
+        """
+        Move the source's watermark to the newest row seen.
+
+        Rows of newly loaded tables only set a missing watermark: advancing
+        it past changes not yet fetched for other known tables would skip them.
+        """
+        if not advance and catalog['watermarks'].get(source):
+            return
+        updated = [row.get('sys_updated_on') for row in rows if row.get('sys_updated_on')]
+        if updated:
+            current = catalog['watermarks'].get(source) or ''
+            catalog['watermarks'][source] = max([current] + updated)
+
+    def _merge_tables(self, catalog: Dict, rows: List[Dict], advance_watermark: bool = True):
+        for row in rows:
+            catalog['tables'][row['name']] = {
+                'label': row.get('label'),
+                'super_class': row.get('super_class.name') or None
+            }
+        self._advance_watermark(catalog, 'sys_db_object', rows, advance_watermark)
+
+    def _merge_fields(self, catalog: Dict, rows: List[Dict], advance_watermark: bool = True):
+        for row in rows:
+            table_fields = catalog['fields'].setdefault(row['name'], {})
+            table_fields[row['element']] = {
+                attribute: row.get(attribute) for attribute in FIELD_ATTRIBUTES
+            }
+        self._advance_watermark(catalog, 'sys_dictionary', rows, advance_watermark)
+
+    @staticmethod
+    async def _fetch_all(
+        client: httpx.AsyncClient,
+        url: str,
+        query: str,
+        fields: str
+    ) -> List[Dict]:
+        """Fetch every row matching query, paging by sys_id."""
+        rows: List[Dict] = []
+        last_sys_id = None
+        while True:
+            params = {
+                'sysparm_query': build_page_query(
+                    query, 'sys_id', [last_sys_id] if last_sys_id else None
+                ),
+                'sysparm_fields': fields,
+                'sysparm_limit': PAGE_SIZE,
+                'sysparm_exclude_reference_link': 'true',
+                'sysparm_no_count': 'true'
+            }
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            page = decode_json(response).get('result', [])
+            # A short page may only be missing ACL-hidden rows; stop on an empty one
+            if not page:
+                return rows
+            rows.extend(page)
+            last_sys_id = page[-1]['sys_id']
+
@@ -0,0 +1,144 @@
+"""Encoding of tool results into the text returned to MCP clients."""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from .pagination import decode_cursor, next_page_cursor
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+
+OUTPUT_FORMATS = ('json', 'pretty', 'table')
+
+
+def dumps(obj: Any, pretty: bool = False, fast: bool = True) -> str:
+    """Serialize to JSON, compact unless pretty, using orjson when available."""
+    if fast and orjson is not None:
+        try:
+            option = orjson.OPT_INDENT_2 if pretty else 0
+            return orjson.dumps(obj, option=option).decode('utf-8')
+        except TypeError:
+            # orjson is stricter (e.g. non-string keys); fall back to the stdlib
+            pass
+
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+
+def to_table(rows: List[Dict]) -> Dict:
+    """Convert a list of records into field names plus one array per row."""
+    fields: Dict[str, None] = {}
+    for row in rows:
+        for field in row:
+            fields.setdefault(field, None)
+
+    names = list(fields)
+    return {
+        'fields': names,
+        'rows': [[row.get(field) for field in names] for row in rows]
+    }
+
+
+def _shape(result: Dict, rows: Optional[List[Dict]], output_format: str) -> Dict:
+    """Build the object to encode, replacing the record list by rows."""
+    if rows is None:
+        return result
+
+    shaped = dict(result)
+    if output_format == 'table':
+        del shaped['result']
+        shaped.update(to_table(rows))
+    else:
+        shaped['result'] = rows
+    return shaped
+
+
+def _resume_cursor(
+    result: Dict,
+    kept_rows: List[Dict],
+    previous_cursor: Optional[str]
+) -> Optional[str]:
+    """Build a cursor continuing right after the last row that fit, if the read was paginated."""
+    cursor = result.get('next_cursor') or previous_cursor
+    if not cursor:
+        return None
+
+    state = decode_cursor(cursor)
+    if not kept_rows:
+        return previous_cursor
+    return next_page_cursor(state['t'], state['q'], state['o'], kept_rows)
+
+
+def encode_result(
+    result: Any,
+    output_format: str = 'json',
+    max_bytes: int = 0,
+    fast: bool = True,
+    previous_cursor: Optional[str] = None
+) -> str:
+    """
+    Encode a tool result for the client.
+
+    Args:
+        result: Handler result, usually a ServiceNow {"result": ...} envelope
+        output_format: 'json' (compact), 'pretty' (indented) or 'table'
+            (field names once, each record as an array)
+        max_bytes: Byte budget for the encoded text; 0 disables it. Record lists
+            over budget are cut at a row boundary and marked as truncated.
+        fast: Use orjson when it is installed
+        previous_cursor: The cursor the call was made with, used to resume
+            a truncated paginated read
+
+    Returns:
+        The encoded text
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+        )
+
+    pretty = output_format == 'pretty'
+    rows = None
+    if isinstance(result, dict) and isinstance(result.get('result'), list):
+        rows = result['result']
+
+    text = dumps(_shape(result, rows, output_format), pretty=pretty, fast=fast)
+    if not max_bytes or rows is None or len(text.encode('utf-8')) <= max_bytes:
+        return text
+
+    def encode_prefix(count: int) -> str:
+        kept = rows[:count]
+        truncated = dict(result)
+        truncated['truncated'] = {
+            'rows_returned': count,
+            'rows_omitted': len(rows) - count,
+            'max_output_bytes': max_bytes
+        }
+        resume = _resume_cursor(result, kept, previous_cursor)
+        if resume:
+            truncated['next_cursor'] = resume
+            truncated['truncated']['hint'] = (
+                "Output was cut to fit the byte budget. Pass next_cursor as cursor "
+                "to continue with the omitted rows."
+            )
+        else:
+            truncated['truncated']['hint'] = (
+                f"Output was cut to fit the byte budget. Fetch the rest with "
+                f"paginate=true and limit={max(count, 1)}, or request fewer fields."
+            )
+        return dumps(_shape(truncated, kept, output_format), pretty=pretty, fast=fast)
+
+    # Largest row count whose encoding fits the budget
+    low, high = 0, len(rows) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if len(encode_prefix(middle).encode('utf-8')) <= max_bytes:
+            low = middle
+        else:
+            high = middle - 1
+
+    return encode_prefix(low)
@@ -1,21 +1,133 @@
 """ServiceNow MCP Server implementation."""
 
-import json
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
 from mcp.server import Server
 from mcp.types import Tool, TextContent
-import requests
+import httpx
 
 from ..config_manager import ConfigManager
 from ..session_cache import SessionCache
-from ..auth.servicenow_auth import ServiceNowAuth, AuthenticationError
+from ..auth.errors import AuthenticationError
+from .aggregates import STATS_PATH, build_stats_params, flatten_stats
+from .batch import (
+    BATCH_PATH,
+    OPERATION_METHODS,
+    build_batch_body,
+    decode_serviced_request,
+    is_clear_rejection,
+    operation_request,
+    operation_result,
+)
+from .bulk import count_records, iter_sys_ids, run_writes, summarize
+from .local_store import LocalStore, MirrorUnavailableError
+from .metrics import ServerMetrics, decode_json, phase
+from .pagination import PAGE_KEYS, build_page_query, decode_cursor, next_page_cursor
+from .response_cache import ResponseCache
+from .schema_catalog import SchemaCatalog
+from .serialization import OUTPUT_FORMATS, encode_result
+from .session_pool import SessionPool
+from .tracing import CallTracer
+from .validation import VALIDATION_MODES, check_fields, check_query
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
+logging.getLogger('httpx').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Tables written by tools that do not take a 'table' argument; used to invalidate cached reads
+WRITE_TOOL_TABLES = {
+    "create_record": None,
+    "update_record": None,
+    "delete_record": None,
+    "create_incident": "incident",
+    "update_incident": "incident",
+    "create_ui_action": "sys_ui_action",
+    "update_ui_action": "sys_ui_action",
+    "create_business_rule": "sys_script",
+    "bulk_create": None,
+    "bulk_update": None,
+    "bulk_delete_by_query": None,
+}
+
+# Tools not re-run after a 401/403: requests they sent before the rejection may have been applied
+NO_RETRY_TOOLS = frozenset(WRITE_TOOL_TABLES) | {"batch"}
+
+# Input schema properties shared by the bulk write tools
+BULK_PROPERTIES = {
+    "concurrency": {
+        "type": "number",
+        "description": "Maximum concurrent write requests (default from instance config)"
+    },
+    "dry_run": {
+        "type": "boolean",
+        "description": "Only count the records that would be written",
+        "default": False
+    }
+}
+
+# Input schema properties shared by the read tools
+READ_PROPERTIES = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Fields to return (sysparm_fields); defaults to the instance's configured list"
+    },
+    "display_value": {
+        "type": "string",
+        "description": "Return raw values (false), display values (true) or both (all)",
+        "enum": ["false", "true", "all"]
+    },
+    "exclude_reference_links": {
+        "type": "boolean",
+        "description": "Omit the link URLs on reference fields (default from instance config)"
+    }
+}
+
+LIST_READ_PROPERTIES = {
+    **READ_PROPERTIES,
+    "no_count": {
+        "type": "boolean",
+        "description": "Skip the total row count query on the instance (default from instance config)"
+    }
+}
+
+# Input schema properties controlling how list results are encoded
+OUTPUT_PROPERTIES = {
+    "output_format": {
+        "type": "string",
+        "description": "json (compact), pretty, or table (field names once, rows as arrays)",
+        "enum": list(OUTPUT_FORMATS)
+    },
+    "max_output_bytes": {
+        "type": "number",
+        "description": "Byte budget for the result; longer lists are truncated with a marker (0 = no limit)"
+    }
+}
+
+# Input schema properties shared by the list-style read tools
+PAGINATION_PROPERTIES = {
+    "paginate": {
+        "type": "boolean",
+        "description": "Return a next_cursor for fetching the following page (keyset pagination)",
+        "default": False
+    },
+    "order_by": {
+        "type": "string",
+        "description": "Sort key used for pagination",
+        "enum": ["sys_id", "sys_updated_on"],
+        "default": "sys_id"
+    },
+    "cursor": {
+        "type": "string",
+        "description": "next_cursor from a previous page; returns the page after it"
+    }
+}
+
 
 class ServiceNowMCPServer:
     """MCP Server for ServiceNow API operations."""
@@ -29,6 +141,44 @@ class ServiceNowMCPServer:
             cache_path=session_config.get('cache_location'),
             duration_hours=session_config.get('cache_duration_hours', 8)
         )
+        metrics_config = self.config_manager.get_metrics_config()
+        self.metrics = ServerMetrics(
+            textfile=metrics_config.get('textfile'),
+            textfile_interval_seconds=metrics_config.get('textfile_interval_seconds', 15)
+        )
+        self.session_pool = SessionPool(self.config_manager, self.session_cache, self.metrics)
+
+        trace_config = self.config_manager.get_trace_config()
+        self.tracer = CallTracer(
+            path=trace_config.get('file'),
+            sample_rate=float(trace_config.get('sample_rate', 1.0)),
+            profile_slowest=int(trace_config.get('profile_slowest', 0)),
+            profile_dir=trace_config.get('profile_dir')
+        )
+
+        cache_config = self.config_manager.get_response_cache_config()
+        self.response_cache = ResponseCache(
+            ttl_seconds=cache_config['ttl_seconds'] if cache_config['enabled'] else {},
+            max_entries=cache_config['max_entries']
+        )
+
+        catalog_config = self.config_manager.get_schema_catalog_config()
+        self.schema_catalog = SchemaCatalog(
+            location=catalog_config.get('location'),
+            refresh_interval_seconds=catalog_config.get('refresh_interval_seconds', 3600)
+        )
+
+        sync_config = self.config_manager.get_sync_config()
+        self.local_store = LocalStore(
+            location=sync_config.get('location'),
+            page_size=sync_config.get('page_size', 1000)
+        )
+
+        # Monotonic time of the last check of instances.yaml for changes
+        self._config_checked_at = time.monotonic()
+
+        # Tool definitions, built on the first list_tools request
+        self._tools: Optional[List[Tool]] = None
 
         # Register tools
         self._register_tools()
@@ -39,423 +189,683 @@ class ServiceNowMCPServer:
         @self.app.list_tools()
         async def list_tools() -> list[Tool]:
             """List available ServiceNow tools."""
-            return [
-                Tool(
-                    name="get_records",
-                    description="Get records from any ServiceNow table",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name from config"
-                            },
-                            "table": {
-                                "type": "string",
-                                "description": "Table name (e.g., incident, sys_user, cmdb_ci)"
-                            },
-                            "query": {
-                                "type": "string",
-                                "description": "Encoded query string (e.g., 'active=true^priority=1')"
-                            },
-                            "limit": {
-                                "type": "number",
-                                "description": "Maximum number of records to return",
-                                "default": 10
-                            }
+            # The catalog never changes, so its schemas are built once and reused
+            if self._tools is None:
+                self._tools = self._build_tool_catalog()
+            return self._tools
+
+        @self.app.call_tool()
+        async def call_tool(name: str, arguments: Any) -> list[TextContent]:
+            """Handle tool calls."""
+            instance_name = (arguments or {}).get('instance')
+            with self.metrics.track_call(name, instance_name) as call, self.tracer.trace_call(call):
+                try:
+                    result = await self._handle_tool_call(name, arguments)
+                    with phase('serialize'):
+                        text = self._serialize_result(result, arguments)
+                    return [TextContent(type="text", text=text)]
+                except Exception as e:
+                    call.error = type(e).__name__
+                    logger.error(f"Tool call error: {str(e)}")
+                    return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+    def _build_tool_catalog(self) -> List[Tool]:
+        """Build the tool definitions advertised by list_tools."""
+        return [
+            Tool(
+                name="get_records",
+                description="Get records from any ServiceNow table",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name from config"
                         },
-                        "required": ["instance", "table"]
-                    }
-                ),
-                Tool(
-                    name="get_record",
-                    description="Get a single record by sys_id",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "table": {
-                                "type": "string",
-                                "description": "Table name"
-                            },
-                            "sys_id": {
-                                "type": "string",
-                                "description": "Sys ID of the record"
-                            }
+                        "table": {
+                            "type": "string",
+                            "description": "Table name (e.g., incident, sys_user, cmdb_ci)"
                         },
-                        "required": ["instance", "table", "sys_id"]
-                    }
-                ),
-                Tool(
-                    name="create_record",
-                    description="Create a new record in any ServiceNow table",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "table": {
-                                "type": "string",
-                                "description": "Table name"
-                            },
-                            "data": {
-                                "type": "object",
-                                "description": "Record data as key-value pairs"
-                            }
+                        "query": {
+                            "type": "string",
+                            "description": "Encoded query string (e.g., 'active=true^priority=1')"
                         },
-                        "required": ["instance", "table", "data"]
-                    }
-                ),
-                Tool(
-                    name="update_record",
-                    description="Update an existing record",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "table": {
-                                "type": "string",
-                                "description": "Table name"
-                            },
-                            "sys_id": {
-                                "type": "string",
-                                "description": "Sys ID of the record to update"
-                            },
-                            "data": {
-                                "type": "object",
-                                "description": "Fields to update as key-value pairs"
-                            }
+                        "limit": {
+                            "type": "number",
+                            "description": "Maximum number of records to return",
+                            "default": 10
                         },
-                        "required": ["instance", "table", "sys_id", "data"]
-                    }
-                ),
-                Tool(
-                    name="delete_record",
-                    description="Delete a record from ServiceNow",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "table": {
-                                "type": "string",
-                                "description": "Table name"
-                            },
-                            "sys_id": {
-                                "type": "string",
-                                "description": "Sys ID of the record to delete"
-                            }
+                        "source": {
+                            "type": "string",
+                            "description": (
+                                "Where to read from: instance, mirror (local copy kept by "
+                                "sync_table), or auto (mirror when possible, else instance)"
+                            ),
+                            "enum": ["auto", "mirror", "instance"]
                         },
-                        "required": ["instance", "table", "sys_id"]
-                    }
-                ),
-                Tool(
-                    name="get_incidents",
-                    description="Get incident records with optional filters",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "query": {
-                                "type": "string",
-                                "description": "Encoded query (e.g., 'active=true^state=1')"
-                            },
-                            "limit": {
-                                "type": "number",
-                                "description": "Maximum number of incidents",
-                                "default": 10
-                            }
+                        "max_staleness": {
+                            "type": "number",
+                            "description": "Oldest acceptable mirror, in seconds since its last sync"
                         },
-                        "required": ["instance"]
-                    }
-                ),
-                Tool(
-                    name="create_incident",
-                    description="Create a new incident",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "short_description": {
-                                "type": "string",
-                                "description": "Brief description of the incident"
-                            },
-                            "description": {
-                                "type": "string",
-                                "description": "Detailed description"
-                            },
-                            "urgency": {
-                                "type": "string",
-                                "description": "Urgency level (1=High, 2=Medium, 3=Low)",
-                                "enum": ["1", "2", "3"]
-                            },
-                            "impact": {
-                                "type": "string",
-                                "description": "Impact level (1=High, 2=Medium, 3=Low)",
-                                "enum": ["1", "2", "3"]
-                            },
-                            "assignment_group": {
-                                "type": "string",
-                                "description": "Assignment group sys_id or name"
-                            }
+                        **LIST_READ_PROPERTIES,
+                        **PAGINATION_PROPERTIES,
+                        **OUTPUT_PROPERTIES
+                    },
+                    "required": ["instance", "table"]
+                }
+            ),
+            Tool(
+                name="get_record",
+                description="Get a single record by sys_id",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
                         },
-                        "required": ["instance", "short_description"]
-                    }
-                ),
-                Tool(
-                    name="update_incident",
-                    description="Update an existing incident",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "sys_id": {
-                                "type": "string",
-                                "description": "Incident sys_id"
-                            },
-                            "state": {
-                                "type": "string",
-                                "description": "State (1=New, 2=In Progress, 6=Resolved, 7=Closed)"
-                            },
-                            "assigned_to": {
-                                "type": "string",
-                                "description": "Assigned to user sys_id"
-                            },
-                            "assignment_group": {
-                                "type": "string",
-                                "description": "Assignment group"
-                            },
-                            "work_notes": {
-                                "type": "string",
-                                "description": "Work notes to add"
-                            },
-                            "close_notes": {
-                                "type": "string",
-                                "description": "Closure notes"
-                            }
+                        "table": {
+                            "type": "string",
+                            "description": "Table name"
                         },
-                        "required": ["instance", "sys_id"]
-                    }
-                ),
-                Tool(
-                    name="get_ui_actions",
-                    description="Get UI Actions from ServiceNow, optionally filtered by table",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "table": {
-                                "type": "string",
-                                "description": "Filter by table name (e.g., incident, change_request)"
-                            },
-                            "limit": {
-                                "type": "number",
-                                "description": "Maximum number of UI Actions to return",
-                                "default": 50
-                            }
+                        "sys_id": {
+                            "type": "string",
+                            "description": "Sys ID of the record"
                         },
-                        "required": ["instance"]
-                    }
+                        **READ_PROPERTIES
+                    },
+                    "required": ["instance", "table", "sys_id"]
+                }
+            ),
+            Tool(
+                name="get_aggregates",
+                description=(
+                    "Count, sum, average, min or max records on the instance with the "
+                    "Aggregate API, optionally grouped; returns one row per group"
                 ),
-                Tool(
-                    name="get_ui_action",
-                    description="Get a specific UI Action by sys_id",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "sys_id": {
-                                "type": "string",
-                                "description": "Sys ID of the UI Action"
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {"type": "string", "description": "ServiceNow instance name"},
+                        "table": {"type": "string", "description": "Table name"},
+                        "query": {"type": "string", "description": "Encoded query selecting the records"},
+                        "count": {
+                            "type": "boolean",
+                            "description": "Include the record count (default true when no other aggregate is requested)"
+                        },
+                        **{
+                            f"{aggregate}_fields": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": f"Fields to compute the {aggregate} of"
                             }
+                            for aggregate in ("sum", "avg", "min", "max")
+                        },
+                        "group_by": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Fields to group by"
+                        },
+                        "having": {
+                            "type": "string",
+                            "description": "Filter on an aggregate as aggregate^field^operator^value (e.g. count^priority^>^3)"
+                        },
+                        "order_by": {
+                            "type": "string",
+                            "description": "Sort groups (sysparm_order_by), e.g. priority or COUNT^DESC"
+                        },
+                        "display_value": {
+                            "type": "string",
+                            "description": "Group by raw values (false), display values (true) or both (all)",
+                            "enum": ["false", "true", "all"]
+                        },
+                        **OUTPUT_PROPERTIES
+                    },
+                    "required": ["instance", "table"]
+                }
+            ),
+            Tool(
+                name="create_record",
+                description="Create a new record in any ServiceNow table",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "table": {
+                            "type": "string",
+                            "description": "Table name"
+                        },
+                        "data": {
+                            "type": "object",
+                            "description": "Record data as key-value pairs"
+                        }
+                    },
+                    "required": ["instance", "table", "data"]
+                }
+            ),
+            Tool(
+                name="update_record",
+                description="Update an existing record",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "table": {
+                            "type": "string",
+                            "description": "Table name"
+                        },
+                        "sys_id": {
+                            "type": "string",
+                            "description": "Sys ID of the record to update"
+                        },
+                        "data": {
+                            "type": "object",
+                            "description": "Fields to update as key-value pairs"
+                        }
+                    },
+                    "required": ["instance", "table", "sys_id", "data"]
+                }
+            ),
+            Tool(
+                name="delete_record",
+                description="Delete a record from ServiceNow",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "table": {
+                            "type": "string",
+                            "description": "Table name"
+                        },
+                        "sys_id": {
+                            "type": "string",
+                            "description": "Sys ID of the record to delete"
+                        }
+                    },
+                    "required": ["instance", "table", "sys_id"]
+                }
+            ),
+            Tool(
+                name="get_incidents",
+                description="Get incident records with optional filters",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "query": {
+                            "type": "string",
+                            "description": "Encoded query (e.g., 'active=true^state=1')"
                         },
-                        "required": ["instance", "sys_id"]
-                    }
+                        "limit": {
+                            "type": "number",
+                            "description": "Maximum number of incidents",
+                            "default": 10
+                        },
+                        **LIST_READ_PROPERTIES,
+                        **PAGINATION_PROPERTIES,
+                        **OUTPUT_PROPERTIES
+                    },
+                    "required": ["instance"]
+                }
+            ),
+            Tool(
+                name="create_incident",
+                description="Create a new incident",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "short_description": {
+                            "type": "string",
+                            "description": "Brief description of the incident"
+                        },
+                        "description": {
+                            "type": "string",
+                            "description": "Detailed description"
+                        },
+                        "urgency": {
+                            "type": "string",
+                            "description": "Urgency level (1=High, 2=Medium, 3=Low)",
+                            "enum": ["1", "2", "3"]
+                        },
+                        "impact": {
+                            "type": "string",
+                            "description": "Impact level (1=High, 2=Medium, 3=Low)",
+                            "enum": ["1", "2", "3"]
+                        },
+                        "assignment_group": {
+                            "type": "string",
+                            "description": "Assignment group sys_id or name"
+                        }
+                    },
+                    "required": ["instance", "short_description"]
+                }
+            ),
+            Tool(
+                name="update_incident",
+                description="Update an existing incident",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "sys_id": {
+                            "type": "string",
+                            "description": "Incident sys_id"
+                        },
+                        "state": {
+                            "type": "string",
+                            "description": "State (1=New, 2=In Progress, 6=Resolved, 7=Closed)"
+                        },
+                        "assigned_to": {
+                            "type": "string",
+                            "description": "Assigned to user sys_id"
+                        },
+                        "assignment_group": {
+                            "type": "string",
+                            "description": "Assignment group"
+                        },
+                        "work_notes": {
+                            "type": "string",
+                            "description": "Work notes to add"
+                        },
+                        "close_notes": {
+                            "type": "string",
+                            "description": "Closure notes"
+                        }
+                    },
+                    "required": ["instance", "sys_id"]
+                }
+            ),
+            Tool(
+                name="get_ui_actions",
+                description="Get UI Actions from ServiceNow, optionally filtered by table",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "table": {
+                            "type": "string",
+                            "description": "Filter by table name (e.g., incident, change_request)"
+                        },
+                        "limit": {
+                            "type": "number",
+                            "description": "Maximum number of UI Actions to return",
+                            "default": 50
+                        },
+                        **LIST_READ_PROPERTIES,
+                        **PAGINATION_PROPERTIES,
+                        **OUTPUT_PROPERTIES
+                    },
+                    "required": ["instance"]
+                }
+            ),
+            Tool(
+                name="get_ui_action",
+                description="Get a specific UI Action by sys_id",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "sys_id": {
+                            "type": "string",
+                            "description": "Sys ID of the UI Action"
+                        },
+                        **READ_PROPERTIES
+                    },
+                    "required": ["instance", "sys_id"]
+                }
+            ),
+            Tool(
+                name="create_ui_action",
+                description="Create a new UI Action in ServiceNow",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {"type": "string", "description": "ServiceNow instance name"},
+                        "name": {"type": "string", "description": "Name of the UI Action"},
+                        "table": {"type": "string", "description": "Table the UI Action applies to"},
+                        "action_name": {"type": "string", "description": "Action name (used in scripting)"},
+                        "script": {"type": "string", "description": "Server-side script to execute"},
+                        "client_script_v2": {"type": "string", "description": "Client-side script (onClick)"},
+                        "condition": {"type": "string", "description": "Condition script for when to show the action"},
+                        "hint": {"type": "string", "description": "Tooltip/hint text"},
+                        "order": {"type": "number", "description": "Display order", "default": 100},
+                        "active": {"type": "boolean", "description": "Whether the UI Action is active", "default": True},
+                        "form_button": {"type": "boolean", "description": "Show as form button", "default": False},
+                        "form_link": {"type": "boolean", "description": "Show as form link", "default": False},
+                        "form_context_menu": {"type": "boolean", "description": "Show in form context menu", "default": False},
+                        "list_button": {"type": "boolean", "description": "Show as list button", "default": False},
+                        "list_link": {"type": "boolean", "description": "Show as list link", "default": False},
+                        "list_context_menu": {"type": "boolean", "description": "Show in list context menu", "default": False}
+                    },
+                    "required": ["instance", "name", "table"]
+                }
+            ),
+            Tool(
+                name="update_ui_action",
+                description="Update an existing UI Action",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "sys_id": {
+                            "type": "string",
+                            "description": "Sys ID of the UI Action to update"
+                        },
+                        "data": {
+                            "type": "object",
+                            "description": "Fields to update (name, script, condition, etc.)"
+                        }
+                    },
+                    "required": ["instance", "sys_id", "data"]
+                }
+            ),
+            Tool(
+                name="get_tables",
+                description="List available tables in ServiceNow",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "limit": {
+                            "type": "number",
+                            "description": "Maximum number of tables to return",
+                            "default": 100
+                        }
+                    },
+                    "required": ["instance"]
+                }
+            ),
+            Tool(
+                name="get_table_schema",
+                description="Get schema information for a specific table, including inherited fields",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "table": {
+                            "type": "string",
+                            "description": "Table name"
+                        },
+                        "refresh": {
+                            "type": "boolean",
+                            "description": "Re-fetch the table and its parents instead of using the local catalog",
+                            "default": False
+                        }
+                    },
+                    "required": ["instance", "table"]
+                }
+            ),
+            Tool(
+                name="sync_table",
+                description=(
+                    "Mirror a table into a local SQLite store; after the first run only "
+                    "rows changed since the last sync are fetched and deletes are detected"
                 ),
-                Tool(
-                    name="create_ui_action",
-                    description="Create a new UI Action in ServiceNow",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {"type": "string", "description": "ServiceNow instance name"},
-                            "name": {"type": "string", "description": "Name of the UI Action"},
-                            "table": {"type": "string", "description": "Table the UI Action applies to"},
-                            "action_name": {"type": "string", "description": "Action name (used in scripting)"},
-                            "script": {"type": "string", "description": "Server-side script to execute"},
-                            "client_script_v2": {"type": "string", "description": "Client-side script (onClick)"},
-                            "condition": {"type": "string", "description": "Condition script for when to show the action"},
-                            "hint": {"type": "string", "description": "Tooltip/hint text"},
-                            "order": {"type": "number", "description": "Display order", "default": 100},
-                            "active": {"type": "boolean", "description": "Whether the UI Action is active", "default": True},
-                            "form_button": {"type": "boolean", "description": "Show as form button", "default": False},
-                            "form_link": {"type": "boolean", "description": "Show as form link", "default": False},
-                            "form_context_menu": {"type": "boolean", "description": "Show in form context menu", "default": False},
-                            "list_button": {"type": "boolean", "description": "Show as list button", "default": False},
-                            "list_link": {"type": "boolean", "description": "Show as list link", "default": False},
-                            "list_context_menu": {"type": "boolean", "description": "Show in list context menu", "default": False}
-                        },
-                        "required": ["instance", "name", "table"]
-                    }
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {"type": "string", "description": "ServiceNow instance name"},
+                        "table": {"type": "string", "description": "Table name"},
+                        "fields": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Fields to mirror (default all); changing the list re-syncs the table"
+                        },
+                        "full": {
+                            "type": "boolean",
+                            "description": "Discard the mirror and download the table again",
+                            "default": False
+                        }
+                    },
+                    "required": ["instance", "table"]
+                }
+            ),
+            Tool(
+                name="get_business_rules",
+                description="Get Business Rules, optionally filtered by table",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "table": {
+                            "type": "string",
+                            "description": "Filter by table name"
+                        },
+                        "limit": {
+                            "type": "number",
+                            "description": "Maximum number to return",
+                            "default": 50
+                        },
+                        **LIST_READ_PROPERTIES,
+                        **PAGINATION_PROPERTIES,
+                        **OUTPUT_PROPERTIES
+                    },
+                    "required": ["instance"]
+                }
+            ),
+            Tool(
+                name="create_business_rule",
+                description="Create a new Business Rule",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {"type": "string", "description": "ServiceNow instance name"},
+                        "name": {"type": "string", "description": "Name of the Business Rule"},
+                        "collection": {"type": "string", "description": "Table name"},
+                        "script": {"type": "string", "description": "Script to execute"},
+                        "when": {
+                            "type": "string",
+                            "description": "When to run (before, after, async, display)",
+                            "enum": ["before", "after", "async", "display"]
+                        },
+                        "active": {"type": "boolean", "description": "Whether active", "default": True}
+                    },
+                    "required": ["instance", "name", "collection", "script"]
+                }
+            ),
+            Tool(
+                name="batch",
+                description=(
+                    "Run several get/create/update/delete operations on any tables "
+                    "in one round trip using the ServiceNow Batch API"
                 ),
-                Tool(
-                    name="update_ui_action",
-                    description="Update an existing UI Action",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "sys_id": {
-                                "type": "string",
-                                "description": "Sys ID of the UI Action to update"
-                            },
-                            "data": {
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {
+                            "type": "string",
+                            "description": "ServiceNow instance name"
+                        },
+                        "operations": {
+                            "type": "array",
+                            "description": "Operations to run; results are returned in the same order",
+                            "items": {
                                 "type": "object",
-                                "description": "Fields to update (name, script, condition, etc.)"
+                                "properties": {
+                                    "op": {"type": "string", "enum": list(OPERATION_METHODS)},
+                                    "table": {"type": "string", "description": "Table name"},
+                                    "sys_id": {"type": "string", "description": "Record sys_id (get one, update, delete)"},
+                                    "data": {"type": "object", "description": "Field values (create, update)"},
+                                    "query": {"type": "string", "description": "Encoded query (get without sys_id)"},
+                                    "limit": {"type": "number", "description": "Maximum records (get without sys_id)"},
+                                    "fields": {"type": "array", "items": {"type": "string"}, "description": "Fields to return (get)"}
+                                },
+                                "required": ["op", "table"]
                             }
                         },
-                        "required": ["instance", "sys_id", "data"]
-                    }
-                ),
-                Tool(
-                    name="get_tables",
-                    description="List available tables in ServiceNow",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "limit": {
-                                "type": "number",
-                                "description": "Maximum number of tables to return",
-                                "default": 100
-                            }
+                        "chunk_size": {
+                            "type": "number",
+                            "description": "Operations per Batch API request (default from instance config)"
                         },
-                        "required": ["instance"]
-                    }
-                ),
-                Tool(
-                    name="get_table_schema",
-                    description="Get schema information for a specific table",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "table": {
-                                "type": "string",
-                                "description": "Table name"
-                            }
+                        "fallback": {
+                            "type": "boolean",
+                            "description": "Run operations as concurrent individual requests if the Batch API fails or skips them"
+                        }
+                    },
+                    "required": ["instance", "operations"]
+                }
+            ),
+            Tool(
+                name="bulk_create",
+                description="Create many records in a table with bounded parallelism and a per-record report",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {"type": "string", "description": "ServiceNow instance name"},
+                        "table": {"type": "string", "description": "Table name"},
+                        "records": {
+                            "type": "array",
+                            "items": {"type": "object"},
+                            "description": "Record data objects to create"
                         },
-                        "required": ["instance", "table"]
-                    }
+                        **BULK_PROPERTIES
+                    },
+                    "required": ["instance", "table", "records"]
+                }
+            ),
+            Tool(
+                name="bulk_update",
+                description=(
+                    "Update many records, given as a list with sys_ids or selected by an "
+                    "encoded query, with bounded parallelism and a per-record report"
                 ),
-                Tool(
-                    name="get_business_rules",
-                    description="Get Business Rules, optionally filtered by table",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {
-                                "type": "string",
-                                "description": "ServiceNow instance name"
-                            },
-                            "table": {
-                                "type": "string",
-                                "description": "Filter by table name"
-                            },
-                            "limit": {
-                                "type": "number",
-                                "description": "Maximum number to return",
-                                "default": 50
-                            }
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {"type": "string", "description": "ServiceNow instance name"},
+                        "table": {"type": "string", "description": "Table name"},
+                        "records": {
+                            "type": "array",
+                            "items": {"type": "object"},
+                            "description": "Objects with a sys_id and the fields to update"
                         },
-                        "required": ["instance"]
-                    }
-                ),
-                Tool(
-                    name="create_business_rule",
-                    description="Create a new Business Rule",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "instance": {"type": "string", "description": "ServiceNow instance name"},
-                            "name": {"type": "string", "description": "Name of the Business Rule"},
-                            "collection": {"type": "string", "description": "Table name"},
-                            "script": {"type": "string", "description": "Script to execute"},
-                            "when": {
-                                "type": "string",
-                                "description": "When to run (before, after, async, display)",
-                                "enum": ["before", "after", "async", "display"]
-                            },
-                            "active": {"type": "boolean", "description": "Whether active", "default": True}
-                        },
-                        "required": ["instance", "name", "collection", "script"]
-                    }
-                )
-            ]
+                        "query": {"type": "string", "description": "Encoded query selecting records to update with data"},
+                        "data": {"type": "object", "description": "Fields to set on every record matched by query"},
+                        "max_records": {
+                            "type": "number",
+                            "description": "Refuse to run if the query matches more records (default from instance config)"
+                        },
+                        **BULK_PROPERTIES
+                    },
+                    "required": ["instance", "table"]
+                }
+            ),
+            Tool(
+                name="bulk_delete_by_query",
+                description="Delete all records matching an encoded query with bounded parallelism",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instance": {"type": "string", "description": "ServiceNow instance name"},
+                        "table": {"type": "string", "description": "Table name"},
+                        "query": {"type": "string", "description": "Encoded query selecting records to delete"},
+                        "max_records": {
+                            "type": "number",
+                            "description": "Refuse to run if the query matches more records (default from instance config)"
+                        },
+                        **BULK_PROPERTIES
+                    },
+                    "required": ["instance", "table", "query"]
+                }
+            ),
+            Tool(
+                name="get_server_metrics",
+                description="Get MCP server counters and latency metrics (per-tool and per-instance latency, upstream requests and bytes, errors, throttling, circuit breaker state, cache hit rates)",
+                inputSchema={
+                    "type": "object",
+                    "properties": {}
+                }
+            )
+        ]
 
-        @self.app.call_tool()
-        async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-            """Handle tool calls."""
-            try:
-                result = await self._handle_tool_call(name, arguments)
-                return [TextContent(type="text", text=json.dumps(result, indent=2))]
-            except Exception as e:
-                logger.error(f"Tool call error: {str(e)}")
-                return [TextContent(type="text", text=f"Error: {str(e)}")]
+    def _serialize_result(self, result: Any, arguments: Dict[str, Any]) -> str:
+        """Encode a tool result using the call's output options or the configured defaults."""
+        output_config = self.config_manager.get_output_config(arguments.get('instance'))
+        return encode_result(
+            result,
+            output_format=arguments.get('output_format', output_config['format']),
+            max_bytes=int(arguments.get('max_output_bytes', output_config['max_bytes'])),
+            fast=output_config['fast_encoder'],
+            previous_cursor=arguments.get('cursor')
+        )
 
-    def _get_authenticated_session(self, instance_name: str) -> requests.Session:
-        """Get or create an authenticated session for an instance."""
-        # Try to get cached session
-        cached_session = self.session_cache.get_session(instance_name)
+    async def _get_authenticated_session(
+        self,
+        instance_name: str,
+        force_verify: bool = False
+    ) -> httpx.AsyncClient:
+        """
+        Get the shared, authenticated HTTP client for an instance.
+
+        In optimistic validation mode a session that succeeded within
+        verify_interval_seconds is returned without a verification round
+        trip. Strict mode (or force_verify) verifies before every use.
+        """
+        # Try to get cached session; OAuth instances that can get tokens on their own start one
+        cached_session = (
+            self.session_cache.get_session(instance_name)
+            or self.session_pool.bootstrap_oauth_session(instance_name)
+        )
 
         if cached_session:
-            # Get instance config for creating session
-            instance_config = self.config_manager.get_instance_config(instance_name)
-            auth = ServiceNowAuth(
-                instance_url=instance_config['url'],
-                username=instance_config['username'],
-                password=instance_config.get('password', '')
-            )
+            # Reuse the pooled client so connections stay warm across calls
+            client = self.session_pool.get_client(instance_name, cached_session)
+
+            session_config = self.config_manager.get_session_config()
+            optimistic = session_config.get('validation', 'optimistic') == 'optimistic'
+            interval = session_config.get('verify_interval_seconds', 300)
+            if (
+                optimistic
+                and not force_verify
+                and self.session_pool.is_recently_verified(instance_name, interval)
+            ):
+                self.session_pool.stats['verifications_skipped'] += 1
+                return client
 
             # Verify session is still valid
-            if auth.verify_session(cached_session):
-                return auth.create_authenticated_session(cached_session)
+            self.session_pool.stats['verifications'] += 1
+            if await self.session_pool.verify(instance_name, client):
+                self.session_pool.mark_success(instance_name)
+                return client
             else:
-                # Session invalid, clear it
+                # Session invalid, clear it (this also drops the pooled client)
                 self.session_cache.invalidate_session(instance_name)
 
         # No valid cached session
@@ -464,165 +874,520 @@ class ServiceNowMCPServer:
             f"Please run: sn-connect --instance {instance_name}"
         )
 
+    def _reload_config_if_changed(self):
+        """
+        Apply edits to instances.yaml without a restart.
+
+        Only instances whose settings changed lose their pooled client,
+        admission state and cached reads; all other instances keep theirs.
+        """
+        reload_config = self.config_manager.get_reload_config()
+        if not reload_config['enabled']:
+            return
+        now = time.monotonic()
+        if now - self._config_checked_at < reload_config['check_interval_seconds']:
+            return
+        self._config_checked_at = now
+
+        for instance_name in self.config_manager.reload_if_changed():
+            self.session_pool.forget_instance(instance_name)
+            self.response_cache.invalidate(instance_name)
+            self.schema_catalog.forget_failures(instance_name)
+
     async def _handle_tool_call(self, name: str, arguments: Dict[str, Any]) -> Dict:
         """Handle individual tool calls."""
+        with phase('config'):
+            self._reload_config_if_changed()
+
+        if name == "get_server_metrics":
+            return self._get_server_metrics()
+
         instance_name = arguments.get('instance')
         if not instance_name:
             raise ValueError("Instance name is required")
 
-        # Get authenticated session
-        session = self._get_authenticated_session(instance_name)
-        instance_config = self.config_manager.get_instance_config(instance_name)
-        base_url = instance_config['url']
+        # Get authenticated client
+        with phase('session'):
+            client = await self._get_authenticated_session(instance_name)
+        with phase('config'):
+            base_url = self.config_manager.get_instance_config(instance_name)['url']
+
+        with phase('validate'):
+            warnings = await self._validate_call(name, client, base_url, arguments)
+
+        try:
+            # Handlers may modify their arguments, so each attempt gets a copy
+            with phase('dispatch'):
+                result = await self._dispatch_tool(name, client, base_url, dict(arguments))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in (401, 403):
+                raise
 
-        # Route to appropriate handler
+            # The session was rejected: verify it and retry the call once if that cannot repeat writes
+            logger.info(
+                f"Got HTTP {e.response.status_code} from '{instance_name}', re-verifying session"
+            )
+            with phase('session'):
+                client = await self._get_authenticated_session(instance_name, force_verify=True)
+            if name in NO_RETRY_TOOLS:
+                raise
+            self.session_pool.stats['auth_retries'] += 1
+            with phase('dispatch'):
+                result = await self._dispatch_tool(name, client, base_url, dict(arguments))
+        finally:
+            if name in WRITE_TOOL_TABLES:
+                # Even a failed write may have changed data, so drop cached reads either way
+                table = WRITE_TOOL_TABLES[name] or arguments.get('table')
+                self.response_cache.invalidate(instance_name, table)
+
+        self.session_pool.mark_success(instance_name)
+        if warnings and isinstance(result, dict):
+            result['validation_warnings'] = warnings
+        return result
+
+    @staticmethod
+    def _validation_targets(name: str, args: Dict) -> List[Tuple[str, str, List[str]]]:
+        """List the (table, encoded query, field names) a tool call will send."""
+        def as_list(fields) -> List[str]:
+            if isinstance(fields, str):
+                fields = fields.split(',')
+            return [field.strip() for field in fields or [] if field.strip()]
+
+        table = args.get('table')
+        if name in ("get_records", "get_record", "get_incidents", "sync_table"):
+            table = 'incident' if name == "get_incidents" else table
+            return [(table, args.get('query', ''), as_list(args.get('fields')))]
+        if name == "get_aggregates":
+            names = as_list(args.get('group_by'))
+            for aggregate in ('sum', 'avg', 'min', 'max'):
+                names += as_list(args.get(f'{aggregate}_fields'))
+            return [(table, args.get('query', ''), names)]
+        if name in ("create_record", "update_record"):
+            return [(table, '', list(args.get('data') or {}))]
+        if name in ("create_incident", "update_incident"):
+            return [('incident', '', [key for key in args if key not in ('instance', 'sys_id')])]
+        if name in ("bulk_create", "bulk_update", "bulk_delete_by_query"):
+            names = list(args.get('data') or {})
+            for record in args.get('records') or []:
+                names += [key for key in record if key != 'sys_id']
+            return [(table, args.get('query', ''), names)]
+        if name == "batch":
+            return [
+                (operation.get('table'), operation.get('query', ''), list(operation.get('data') or {}))
+                for operation in args.get('operations') or []
+                if isinstance(operation, dict) and operation.get('table')
+            ]
+        return []
+
+    async def _validate_call(
+        self,
+        name: str,
+        client: httpx.AsyncClient,
+        base_url: str,
+        args: Dict
+    ) -> List[str]:
+        """
+        Check queries and field names against the local schema catalog before any request.
+
+        Returns the problems found in 'warn' mode; raises ValueError with them
+        in 'strict' mode. Tables missing from the catalog are not checked, or
+        loaded first if fetch_missing_schemas is set. A table that does not
+        exist is not looked up again for the catalog refresh interval, and
+        after a 403 no schemas are fetched for the instance; other failures
+        are retried on the next call.
+        """
+        config = self.config_manager.get_validation_config(args['instance'])
+        mode = config['mode']
+        if mode not in VALIDATION_MODES:
+            raise ValueError(
+                f"Unknown validation mode '{mode}'. Use one of: {', '.join(VALIDATION_MODES)}"
+            )
+        targets = self._validation_targets(name, args)
+        if mode == 'off' or not targets:
+            return []
+
+        instance_name = args['instance']
+
+        def lookup(table: str) -> Optional[Dict[str, Dict]]:
+            return self.schema_catalog.get_fields(instance_name, table)
+
+        problems: List[str] = []
+        for table, query, names in targets:
+            if not query and not names:
+                continue
+            if lookup(table) is None and config['fetch_missing_schemas']:
+                # Failed lookups are remembered so every call does not pay for them again
+                failed = self.schema_catalog.failed_lookup(instance_name, table)
+                if failed:
+                    problems.append(failed)
+                    continue
+                if failed is None:
+                    try:
+                        await self.schema_catalog.get_table_schema(instance_name, client, base_url, table)
+                    except ValueError:
+                        problem = f"Unknown table '{table}'"
+                        self.schema_catalog.record_failed_lookup(instance_name, table, problem)
+                        problems.append(problem)
+                        continue
+                    except httpx.HTTPError as e:
+                        status_code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                        if status_code == 403:
+                            logger.info(
+                                f"Cannot read the schema tables on '{instance_name}'; "
+                                f"skipping schema fetches for validation"
+                            )
+                            self.schema_catalog.record_failed_lookup(instance_name, None)
+                        elif status_code == 404:
+                            self.schema_catalog.record_failed_lookup(instance_name, table)
+                        else:
+                            # Expired sessions and transient errors are retried on the next call
+                            logger.debug(f"Could not load schema of '{table}' for validation: {e}")
+            problems += check_query(table, query, lookup) + check_fields(table, names, lookup)
+
+        if problems and mode == 'strict':
+            raise ValueError("Validation failed: " + "; ".join(problems))
+        for problem in problems:
+            logger.warning(f"{name} on '{instance_name}': {problem}")
+        return problems
+
+    async def _dispatch_tool(
+        self,
+        name: str,
+        client: httpx.AsyncClient,
+        base_url: str,
+        arguments: Dict[str, Any]
+    ) -> Dict:
+        """Route a tool call to its handler."""
         if name == "get_records":
-            return self._get_records(session, base_url, arguments)
+            return await self._get_records(client, base_url, arguments)
         elif name == "get_record":
-            return self._get_record(session, base_url, arguments)
+            return await self._get_record(client, base_url, arguments)
+        elif name == "get_aggregates":
+            return await self._get_aggregates(client, base_url, arguments)
         elif name == "create_record":
-            return self._create_record(session, base_url, arguments)
+            return await self._create_record(client, base_url, arguments)
         elif name == "update_record":
-            return self._update_record(session, base_url, arguments)
+            return await self._update_record(client, base_url, arguments)
         elif name == "delete_record":
-            return self._delete_record(session, base_url, arguments)
+            return await self._delete_record(client, base_url, arguments)
         elif name == "get_incidents":
-            return self._get_incidents(session, base_url, arguments)
+            return await self._get_incidents(client, base_url, arguments)
         elif name == "create_incident":
-            return self._create_incident(session, base_url, arguments)
+            return await self._create_incident(client, base_url, arguments)
         elif name == "update_incident":
-            return self._update_incident(session, base_url, arguments)
+            return await self._update_incident(client, base_url, arguments)
         elif name == "get_ui_actions":
-            return self._get_ui_actions(session, base_url, arguments)
+            return await self._get_ui_actions(client, base_url, arguments)
         elif name == "get_ui_action":
-            return self._get_ui_action(session, base_url, arguments)
+            return await self._get_ui_action(client, base_url, arguments)
         elif name == "create_ui_action":
-            return self._create_ui_action(session, base_url, arguments)
+            return await self._create_ui_action(client, base_url, arguments)
         elif name == "update_ui_action":
-            return self._update_ui_action(session, base_url, arguments)
+            return await self._update_ui_action(client, base_url, arguments)
         elif name == "get_tables":
-            return self._get_tables(session, base_url, arguments)
+            return await self._get_tables(client, base_url, arguments)
         elif name == "get_table_schema":
-            return self._get_table_schema(session, base_url, arguments)
+            return await self._get_table_schema(client, base_url, arguments)
+        elif name == "sync_table":
+            return await self._sync_table(client, base_url, arguments)
         elif name == "get_business_rules":
-            return self._get_business_rules(session, base_url, arguments)
+            return await self._get_business_rules(client, base_url, arguments)
         elif name == "create_business_rule":
-            return self._create_business_rule(session, base_url, arguments)
+            return await self._create_business_rule(client, base_url, arguments)
+        elif name == "batch":
+            return await self._batch(client, base_url, arguments)
+        elif name == "bulk_create":
+            return await self._bulk_create(client, base_url, arguments)
+        elif name == "bulk_update":
+            return await self._bulk_update(client, base_url, arguments)
+        elif name == "bulk_delete_by_query":
+            return await self._bulk_delete_by_query(client, base_url, arguments)
         else:
             raise ValueError(f"Unknown tool: {name}")
 
-    def _get_records(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
-        """Get records from a table."""
-        table = args['table']
-        url = f"{base_url}/api/now/table/{table}"
+    def _get_server_metrics(self) -> Dict:
+        """Get server-side counters."""
+        session_config = self.config_manager.get_session_config()
+        return {
+            "sessions": {
+                "validation": session_config.get('validation', 'optimistic'),
+                "verify_interval_seconds": session_config.get('verify_interval_seconds', 300),
+                **self.session_pool.stats
+            },
+            "admission": self.session_pool.get_admission_stats(),
+            "circuit": self.session_pool.get_circuit_stats(),
+            "response_cache": self.response_cache.get_stats(),
+            "config": {
+                "instances": len(self.config_manager.list_instances()),
+                "reloads": self.config_manager.reloads
+            },
+            **self.metrics.snapshot()
+        }
 
-        params = {'sysparm_limit': args.get('limit', 10)}
-        if args.get('query'):
-            params['sysparm_query'] = args['query']
+    async def _read_table(
+        self,
+        client: httpx.AsyncClient,
+        instance_name: str,
+        table: str,
+        url: str,
+        params: Dict
+    ) -> Dict:
+        """GET from the Table API, served from the response cache for cacheable tables."""
+        cache_key = self.response_cache.make_key(instance_name, table, url, params)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return {**cached, 'cached': True}
 
-        response = session.get(url, params=params)
+        response = await client.get(url, params=params)
         response.raise_for_status()
-        return response.json()
+        result = decode_json(response)
+        result['response_bytes'] = len(response.content)
+
+        self.response_cache.put(cache_key, result)
+        # Callers add keys such as next_cursor, so hand out a copy of the cached dict
+        return dict(result)
+
+    def _read_params(self, table: str, args: Dict, list_query: bool = False) -> Dict:
+        """Build the sysparm projection options for a read from args and instance defaults."""
+        defaults = self.config_manager.get_read_config(args['instance'])
+
+        params = {}
+        fields = args.get('fields') or (defaults.get('fields') or {}).get(table)
+        if fields:
+            if isinstance(fields, str):
+                fields = fields.split(',')
+            params['sysparm_fields'] = ','.join(field.strip() for field in fields)
+
+        display_value = args.get('display_value', defaults['display_value'])
+        params['sysparm_display_value'] = str(display_value).lower()
+
+        exclude_links = args.get('exclude_reference_links', defaults['exclude_reference_links'])
+        params['sysparm_exclude_reference_link'] = str(bool(exclude_links)).lower()
+
+        if list_query and args.get('no_count', defaults['no_count']):
+            params['sysparm_no_count'] = 'true'
+
+        return params
+
+    async def _query_table(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        table: str,
+        query: str,
+        args: Dict,
+        default_limit: int
+    ) -> Dict:
+        """Query a table, optionally one keyset-paginated page at a time."""
+        url = f"{base_url}/api/now/table/{table}"
+        limit = int(args.get('limit', default_limit))
+        cursor = args.get('cursor')
+        paginate = bool(args.get('paginate')) or bool(cursor)
+
+        params = {'sysparm_limit': limit, **self._read_params(table, args, list_query=True)}
 
-    def _get_record(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+        if paginate:
+            query, order_by, last_values = self._resolve_page(table, query, args)
+            params['sysparm_query'] = build_page_query(query, order_by, last_values)
+
+            if order_by == 'sys_updated_on' and params['sysparm_display_value'] == 'true':
+                raise ValueError(
+                    "Paginating by sys_updated_on needs raw values; use display_value 'false' or 'all'"
+                )
+            # The page keys must be in the response to build the next cursor
+            if 'sysparm_fields' in params:
+                fields = params['sysparm_fields'].split(',')
+                fields += [key for key in PAGE_KEYS[order_by] if key not in fields]
+                params['sysparm_fields'] = ','.join(fields)
+        elif query:
+            params['sysparm_query'] = query
+
+        result = await self._read_table(client, args['instance'], table, url, params)
+
+        if paginate:
+            result['next_cursor'] = next_page_cursor(table, query, order_by, result.get('result', []))
+        return result
+
+    @staticmethod
+    def _resolve_page(table: str, query: str, args: Dict) -> Tuple[str, str, Optional[List[str]]]:
+        """Return the query, sort key and last key values for a paginated read."""
+        cursor = args.get('cursor')
+        if not cursor:
+            return query, args.get('order_by', 'sys_id'), None
+
+        state = decode_cursor(cursor)
+        if state['t'] != table:
+            raise ValueError(f"Cursor belongs to table '{state['t']}', not '{table}'")
+        if query and query != state['q']:
+            raise ValueError("Cursor was issued for a different query")
+        return state['q'], state['o'], state['k']
+
+    async def _get_records(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
+        """Get records from a table, from the local mirror when allowed and fresh enough."""
+        table = args['table']
+        query = args.get('query', '')
+        read_config = self.config_manager.get_read_config(args['instance'])
+        source = args.get('source', read_config['source'])
+        if source == 'instance':
+            return await self._query_table(client, base_url, table, query, args, default_limit=10)
+
+        try:
+            return self._read_mirror(table, query, args, read_config, default_limit=10)
+        except MirrorUnavailableError as e:
+            if source == 'mirror':
+                raise ValueError(str(e))
+            fallback_reason = str(e)
+
+        result = await self._query_table(client, base_url, table, query, args, default_limit=10)
+        result['source'] = 'instance'
+        result['mirror_fallback'] = fallback_reason
+        return result
+
+    def _read_mirror(
+        self,
+        table: str,
+        query: str,
+        args: Dict,
+        read_config: Dict,
+        default_limit: int
+    ) -> Dict:
+        """Serve a get_records call from the local mirror."""
+        params = self._read_params(table, args)
+        if params['sysparm_display_value'] != 'false':
+            raise MirrorUnavailableError("Mirrors hold raw values only; use display_value 'false'")
+
+        fields = params['sysparm_fields'].split(',') if 'sysparm_fields' in params else None
+        limit = int(args.get('limit', default_limit))
+        max_staleness = float(args.get('max_staleness', read_config['max_staleness_seconds']))
+        paginate = bool(args.get('paginate')) or bool(args.get('cursor'))
+
+        if not paginate:
+            return self.local_store.read(args['instance'], table, query, fields, limit, max_staleness)
+
+        query, order_by, last_values = self._resolve_page(table, query, args)
+        if 'ORDERBY' in query:
+            raise ValueError("Paginated queries cannot contain ORDERBY; use order_by instead")
+        page_keys = list(PAGE_KEYS[order_by])
+        if fields:
+            fields += [key for key in page_keys if key not in fields]
+
+        result = self.local_store.read(
+            args['instance'], table, query, fields, limit, max_staleness,
+            page_keys=page_keys, after=last_values
+        )
+        # The mirror applies no ACLs, so a short page really is the last one
+        rows = result['result']
+        result['next_cursor'] = (
+            next_page_cursor(table, query, order_by, rows) if len(rows) >= limit else None
+        )
+        return result
+
+    async def _get_record(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Get a single record by sys_id."""
         table = args['table']
         sys_id = args['sys_id']
         url = f"{base_url}/api/now/table/{table}/{sys_id}"
 
-        response = session.get(url)
-        response.raise_for_status()
-        return response.json()
+        params = self._read_params(table, args)
+        return await self._read_table(client, args['instance'], table, url, params)
+
+    async def _get_aggregates(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
+        """Compute aggregates on the instance instead of downloading the records."""
+        table = args['table']
+        url = f"{base_url}{STATS_PATH}/{table}"
+        response = await self._read_table(
+            client, args['instance'], table, url, build_stats_params(args)
+        )
+        return {
+            'result': flatten_stats(response.get('result')),
+            'response_bytes': response['response_bytes'],
+            **({'cached': True} if response.get('cached') else {})
+        }
 
-    def _create_record(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _create_record(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Create a new record."""
         table = args['table']
         data = args['data']
         url = f"{base_url}/api/now/table/{table}"
 
-        response = session.post(url, json=data)
+        response = await client.post(url, json=data)
         response.raise_for_status()
-        return response.json()
+        return decode_json(response)
 
-    def _update_record(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _update_record(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Update an existing record."""
         table = args['table']
         sys_id = args['sys_id']
         data = args['data']
         url = f"{base_url}/api/now/table/{table}/{sys_id}"
 
-        response = session.put(url, json=data)
+        response = await client.put(url, json=data)
         response.raise_for_status()
-        return response.json()
+        return decode_json(response)
 
-    def _delete_record(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _delete_record(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Delete a record."""
         table = args['table']
         sys_id = args['sys_id']
         url = f"{base_url}/api/now/table/{table}/{sys_id}"
 
-        response = session.delete(url)
+        response = await client.delete(url)
         response.raise_for_status()
         return {"success": True, "message": "Record deleted"}
 
-    def _get_incidents(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _get_incidents(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Get incidents."""
         args['table'] = 'incident'
-        return self._get_records(session, base_url, args)
+        return await self._get_records(client, base_url, args)
 
-    def _create_incident(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _create_incident(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Create an incident."""
         data = {k: v for k, v in args.items() if k != 'instance'}
         args_copy = {'table': 'incident', 'data': data}
-        return self._create_record(session, base_url, args_copy)
+        return await self._create_record(client, base_url, args_copy)
 
-    def _update_incident(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _update_incident(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Update an incident."""
         sys_id = args.pop('sys_id')
         data = {k: v for k, v in args.items() if k != 'instance'}
         args_copy = {'table': 'incident', 'sys_id': sys_id, 'data': data}
-        return self._update_record(session, base_url, args_copy)
+        return await self._update_record(client, base_url, args_copy)
 
-    def _get_ui_actions(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _get_ui_actions(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Get UI Actions."""
-        url = f"{base_url}/api/now/table/sys_ui_action"
-        params = {'sysparm_limit': args.get('limit', 50)}
-        if args.get('table'):
-            params['sysparm_query'] = f"table={args['table']}"
-
-        response = session.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        query = f"table={args['table']}" if args.get('table') else ''
+        return await self._query_table(
+            client, base_url, 'sys_ui_action', query, args, default_limit=50
+        )
 
-    def _get_ui_action(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _get_ui_action(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Get a specific UI Action."""
         sys_id = args['sys_id']
         url = f"{base_url}/api/now/table/sys_ui_action/{sys_id}"
 
-        response = session.get(url)
-        response.raise_for_status()
-        return response.json()
+        params = self._read_params('sys_ui_action', args)
+        return await self._read_table(client, args['instance'], 'sys_ui_action', url, params)
 
-    def _create_ui_action(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _create_ui_action(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Create a UI Action."""
         data = {k: v for k, v in args.items() if k != 'instance'}
         url = f"{base_url}/api/now/table/sys_ui_action"
 
-        response = session.post(url, json=data)
+        response = await client.post(url, json=data)
         response.raise_for_status()
-        return response.json()
+        return decode_json(response)
 
-    def _update_ui_action(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _update_ui_action(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Update a UI Action."""
         sys_id = args['sys_id']
         data = args['data']
         url = f"{base_url}/api/now/table/sys_ui_action/{sys_id}"
 
-        response = session.put(url, json=data)
+        response = await client.put(url, json=data)
         response.raise_for_status()
-        return response.json()
+        return decode_json(response)
 
-    def _get_tables(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _get_tables(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Get list of tables."""
         url = f"{base_url}/api/now/table/sys_db_object"
         params = {
@@ -630,50 +1395,325 @@ class ServiceNowMCPServer:
             'sysparm_fields': 'name,label,super_class'
         }
 
-        response = session.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        return await self._read_table(client, args['instance'], 'sys_db_object', url, params)
 
-    def _get_table_schema(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
-        """Get table schema."""
-        table = args['table']
-        url = f"{base_url}/api/now/table/sys_dictionary"
-        params = {
-            'sysparm_query': f"name={table}",
-            'sysparm_fields': 'element,column_label,internal_type,mandatory,max_length,reference'
-        }
+    async def _get_table_schema(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
+        """Get table schema, including fields inherited from parent tables."""
+        return await self.schema_catalog.get_table_schema(
+            args['instance'],
+            client,
+            base_url,
+            args['table'],
+            force_refresh=bool(args.get('refresh', False))
+        )
 
-        response = session.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+    async def _sync_table(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
+        """Bring the local mirror of a table up to date."""
+        return await self.local_store.sync_table(
+            args['instance'],
+            client,
+            base_url,
+            args['table'],
+            fields=args.get('fields'),
+            full=bool(args.get('full', False))
+        )
 
-    def _get_business_rules(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _get_business_rules(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Get Business Rules."""
-        url = f"{base_url}/api/now/table/sys_script"
-        params = {'sysparm_limit': args.get('limit', 50)}
-        if args.get('table'):
-            params['sysparm_query'] = f"collection={args['table']}"
-
-        response = session.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        query = f"collection={args['table']}" if args.get('table') else ''
+        return await self._query_table(
+            client, base_url, 'sys_script', query, args, default_limit=50
+        )
 
-    def _create_business_rule(self, session: requests.Session, base_url: str, args: Dict) -> Dict:
+    async def _create_business_rule(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
         """Create a Business Rule."""
         data = {k: v for k, v in args.items() if k != 'instance'}
         url = f"{base_url}/api/now/table/sys_script"
 
-        response = session.post(url, json=data)
+        response = await client.post(url, json=data)
+        response.raise_for_status()
+        return decode_json(response)
+
+    async def _batch(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
+        """Run heterogeneous table operations through the Batch API."""
+        instance_name = args['instance']
+        operations = args.get('operations') or []
+        if not operations:
+            raise ValueError("operations must contain at least one operation")
+
+        batch_config = self.config_manager.get_batch_config(instance_name)
+        chunk_size = max(1, int(args.get('chunk_size', batch_config['chunk_size'])))
+        fallback = args.get('fallback', batch_config['fallback'])
+
+        requests = []
+        for index, operation in enumerate(operations):
+            read_params = None
+            if operation.get('op') == 'get':
+                read_params = self._read_params(
+                    operation.get('table'), {**operation, 'instance': instance_name}
+                )
+            requests.append({'id': str(index), **operation_request(operation, read_params)})
+
+        results: List[Optional[Dict]] = [None] * len(requests)
+        chunks = [requests[i:i + chunk_size] for i in range(0, len(requests), chunk_size)]
+        unserviced = []
+        try:
+            outcomes = await asyncio.gather(
+                *[self._send_batch_chunk(client, base_url, chunk) for chunk in chunks],
+                return_exceptions=True
+            )
+
+            # Chunks rejected with 401 ran nothing: re-verify the session and resend only
+            # those, since the other chunks' writes have already been applied
+            rejected = [
+                index for index, outcome in enumerate(outcomes)
+                if isinstance(outcome, httpx.HTTPStatusError) and outcome.response.status_code == 401
+            ]
+            if rejected:
+                logger.info(f"Batch API returned 401 for {len(rejected)} chunk(s), re-verifying session")
+                try:
+                    with phase('session'):
+                        client = await self._get_authenticated_session(instance_name, force_verify=True)
+                    self.session_pool.stats['auth_retries'] += 1
+                    resent = await asyncio.gather(
+                        *[self._send_batch_chunk(client, base_url, chunks[index]) for index in rejected],
+                        return_exceptions=True
+                    )
+                except AuthenticationError as e:
+                    resent = [e] * len(rejected)
+                for index, outcome in zip(rejected, resent):
+                    outcomes[index] = outcome
+
+            for chunk, outcome in zip(chunks, outcomes):
+                if isinstance(outcome, BaseException):
+                    # Failed chunks are reported per operation rather than raised: a raised
+                    # 401/403 would make _handle_tool_call repeat the chunks that succeeded
+                    if not fallback or isinstance(outcome, AuthenticationError):
+                        for request in chunk:
+                            results[int(request['id'])] = operation_result(None, None, error=str(outcome))
+                        continue
+                    if is_clear_rejection(outcome):
+                        logger.warning(f"Batch API request failed, falling back: {outcome}")
+                        unserviced.extend(chunk)
+                        continue
+                    # The instance may have run part of the chunk; only reads are safe to resend
+                    logger.warning(f"Batch API request outcome unknown, resending reads only: {outcome}")
+                    for request in chunk:
+                        if request['method'] == 'GET':
+                            unserviced.append(request)
+                        else:
+                            results[int(request['id'])] = operation_result(
+                                None, None,
+                                error=f"Outcome unknown, the operation may have been applied: {outcome}"
+                            )
+                    continue
+                for request in chunk:
+                    if request['id'] in outcome:
+                        results[int(request['id'])] = outcome[request['id']]
+                    else:
+                        unserviced.append(request)
+
+            if unserviced and fallback:
+                individual = await asyncio.gather(
+                    *[self._send_operation(client, base_url, request) for request in unserviced]
+                )
+                for request, result in zip(unserviced, individual):
+                    results[int(request['id'])] = result
+            else:
+                for request in unserviced:
+                    results[int(request['id'])] = operation_result(
+                        None, None, error="Not serviced by the Batch API"
+                    )
+        finally:
+            written = {op.get('table') for op in operations if op.get('op') != 'get'}
+            for table in written:
+                self.response_cache.invalidate(instance_name, table)
+
+        succeeded = sum(1 for result in results if result['success'])
+        return {
+            'result': [
+                {'id': index, 'op': operation['op'], 'table': operation['table'], **result}
+                for index, (operation, result) in enumerate(zip(operations, results))
+            ],
+            'summary': {
+                'operations': len(operations),
+                'succeeded': succeeded,
+                'failed': len(operations) - succeeded,
+                'batch_requests': len(chunks),
+                'individual_requests': len(unserviced) if fallback else 0
+            }
+        }
+
+    async def _send_batch_chunk(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        requests: List[Dict]
+    ) -> Dict[str, Dict]:
+        """Send one Batch API request and return results keyed by operation id."""
+        body = build_batch_body(uuid.uuid4().hex, requests)
+        response = await client.post(f"{base_url}{BATCH_PATH}", json=body)
         response.raise_for_status()
-        return response.json()
+
+        serviced = decode_json(response).get('serviced_requests', [])
+        return {entry['id']: decode_serviced_request(entry) for entry in serviced}
+
+    async def _send_operation(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        request: Dict
+    ) -> Dict:
+        """Send one operation as an individual Table API request."""
+        try:
+            response = await client.request(
+                request['method'], f"{base_url}{request['url']}", json=request['body']
+            )
+        except httpx.HTTPError as e:
+            return operation_result(None, None, error=str(e))
+
+        try:
+            body = decode_json(response) if response.content else None
+        except ValueError:
+            body = response.text
+        return operation_result(response.status_code, body)
+
+    def _get_progress_reporter(self):
+        """Return a callback sending MCP progress notifications, if the client asked for them."""
+        try:
+            context = self.app.request_context
+        except LookupError:
+            return None
+
+        token = getattr(context.meta, 'progressToken', None) if context.meta else None
+        if token is None:
+            return None
+
+        async def report(completed: int, total: int):
+            try:
+                await context.session.send_progress_notification(token, completed, total)
+            except Exception as e:
+                logger.debug(f"Could not send progress notification: {e}")
+
+        return report
+
+    def _bulk_options(self, args: Dict) -> Dict:
+        """Resolve concurrency, max_records and page_size from args and instance config."""
+        bulk_config = self.config_manager.get_bulk_config(args['instance'])
+        return {
+            'concurrency': int(args.get('concurrency', bulk_config['concurrency'])),
+            'max_records': int(args.get('max_records', bulk_config['max_records'])),
+            'page_size': int(bulk_config['page_size'])
+        }
+
+    async def _bulk_by_query(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        args: Dict,
+        method: str,
+        body: Optional[Dict] = None
+    ) -> Dict:
+        """Apply one write to every record matching args['query'], page by page."""
+        table_url = f"{base_url}/api/now/table/{args['table']}"
+        query = args['query']
+        options = self._bulk_options(args)
+
+        matched = await count_records(client, table_url, query)
+        if args.get('dry_run'):
+            return summarize([], dry_run=True, matched=matched)
+        if matched > options['max_records']:
+            raise ValueError(
+                f"Query matches {matched} records, more than max_records "
+                f"({options['max_records']}). Narrow the query or raise max_records."
+            )
+
+        progress = self._get_progress_reporter()
+        outcomes: List[Dict] = []
+        async for sys_ids in iter_sys_ids(client, table_url, query, options['page_size']):
+            writes = [
+                {'key': sys_id, 'method': method, 'url': f"{table_url}/{sys_id}", 'body': body}
+                for sys_id in sys_ids
+            ]
+            outcomes += await run_writes(
+                client, writes, options['concurrency'], progress,
+                total=matched, completed=len(outcomes)
+            )
+            if len(outcomes) >= options['max_records']:
+                break
+
+        return summarize(outcomes, matched=matched)
+
+    async def _bulk_create(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
+        """Create many records."""
+        records = args.get('records') or []
+        if not records:
+            raise ValueError("records must contain at least one record")
+        if args.get('dry_run'):
+            return summarize([], dry_run=True, matched=len(records))
+
+        table_url = f"{base_url}/api/now/table/{args['table']}"
+        writes = [
+            {'key': index, 'method': 'POST', 'url': table_url, 'body': record}
+            for index, record in enumerate(records)
+        ]
+        outcomes = await run_writes(
+            client, writes, self._bulk_options(args)['concurrency'], self._get_progress_reporter()
+        )
+        return summarize(outcomes)
+
+    async def _bulk_update(self, client: httpx.AsyncClient, base_url: str, args: Dict) -> Dict:
+        """Update many records, listed explicitly or selected by query."""
+        records = args.get('records')
+        if not records:
+            if not args.get('query') or not isinstance(args.get('data'), dict):
+                raise ValueError("Provide either records, or a query together with data")
+            return await self._bulk_by_query(client, base_url, args, 'PUT', args['data'])
+
+        missing = [index for index, record in enumerate(records) if not record.get('sys_id')]
+        if missing:
+            raise ValueError(f"Records at positions {missing} have no sys_id")
+        if args.get('dry_run'):
+            return summarize([], dry_run=True, matched=len(records))
+
+        table_url = f"{base_url}/api/now/table/{args['table']}"
+        writes = [
+            {
+                'key': record['sys_id'],
+                'method': 'PUT',
+                'url': f"{table_url}/{record['sys_id']}",
+                'body': {field: value for field, value in record.items() if field != 'sys_id'}
+            }
+            for record in records
+        ]
+        outcomes = await run_writes(
+            client, writes, self._bulk_options(args)['concurrency'], self._get_progress_reporter()
+        )
+        return summarize(outcomes)
+
+    async def _bulk_delete_by_query(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        args: Dict
+    ) -> Dict:
+        """Delete every record matching a query."""
+        if not args.get('query'):
+            raise ValueError("A non-empty query is required for bulk deletes")
+        return await self._bulk_by_query(client, base_url, args, 'DELETE')
 
     async def run(self):
         """Run the MCP server."""
         from mcp.server.stdio import stdio_server
 
-        async with stdio_server() as (read_stream, write_stream):
-            await self.app.run(
-                read_stream,
-                write_stream,
-                self.app.create_initialization_options()
-            )
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.app.run(
+                    read_stream,
+                    write_stream,
+                    self.app.create_initialization_options()
+                )
+        finally:
+            await self.session_pool.close_all()
+            self.local_store.close_all()
+            self.metrics.maybe_write_textfile(force=True)
@@ -0,0 +1,269 @@
+"""Per-instance pool of long-lived, authenticated HTTP clients."""
+
+import asyncio
+import logging
+import time
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from ..auth.oauth import OAuthTokenAuth, new_oauth_session
+from ..config_manager import ConfigManager
+from ..session_cache import SessionCache
+from .coalescing import CoalescingTransport
+from .metrics import MetricsTransport, ServerMetrics
+from .rate_limiter import AdmissionController, AdmissionTransport
+from .resilience import CircuitBreaker, ResilienceTransport
+
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """
+    Keeps one shared httpx.AsyncClient per ServiceNow instance.
+
+    Clients are reused across tool calls so TCP and TLS connections stay
+    warm, and concurrent tool calls for the same instance share the
+    client's connection pool. A client is only rebuilt after the
+    SessionCache invalidates the instance or caches a different
+    authenticated session for it. Tokens another process renewed within
+    the same login are handed to the existing client instead.
+
+    The pool also remembers when each instance last had a successful call, so
+    callers can skip re-verifying a session that was proven valid recently.
+    """
+
+    def __init__(
+        self,
+        config_manager: ConfigManager,
+        session_cache: SessionCache,
+        metrics: Optional[ServerMetrics] = None
+    ):
+        self.config_manager = config_manager
+        self.session_cache = session_cache
+        self.metrics = metrics
+        self._lock = Lock()
+        # instance name -> (authenticated_at of the cached session, client)
+        self._clients: Dict[str, Tuple[Optional[str], httpx.AsyncClient]] = {}
+        # instance name -> monotonic time of the last verified or successful call
+        self._last_success: Dict[str, float] = {}
+        # instance name -> admission controller; kept across client rebuilds so
+        # the learned concurrency window survives re-authentication
+        self._admission: Dict[str, AdmissionController] = {}
+        # instance name -> circuit breaker; kept across client rebuilds so an
+        # unreachable instance keeps failing fast after re-authentication
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.stats = {
+            'verifications': 0,
+            'verifications_skipped': 0,
+            'auth_retries': 0,
+            'token_refreshes': 0
+        }
+
+        session_cache.add_invalidation_listener(self.discard)
+
+    def _create_client(self, instance_name: str, session_data: Dict) -> httpx.AsyncClient:
+        """Build an authenticated client from cached session data."""
+        http_config = self.config_manager.get_http_config(instance_name)
+        max_connections = http_config['pool_maxsize']
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections if http_config['keep_alive'] else 0,
+            keepalive_expiry=http_config['keepalive_expiry']
+        )
+
+        transport = httpx.AsyncHTTPTransport(limits=limits)
+        if self.metrics is not None:
+            transport = MetricsTransport(transport, self.metrics, instance_name)
+
+        rate_limit_config = self.config_manager.get_rate_limit_config(instance_name)
+        transport = AdmissionTransport(
+            transport,
+            self.get_admission_controller(instance_name),
+            max_retries=rate_limit_config['max_retries']
+        )
+
+        resilience_config = self.config_manager.get_resilience_config(instance_name)
+        transport = ResilienceTransport(
+            transport,
+            self.get_circuit_breaker(instance_name),
+            instance_name,
+            max_retries=resilience_config['max_retries'],
+            backoff_base_seconds=resilience_config['backoff_base_seconds'],
+            max_backoff_seconds=resilience_config['max_backoff_seconds']
+        )
+        if http_config['coalesce_reads']:
+            transport = CoalescingTransport(transport, self.metrics, instance_name)
+
+        if session_data.get('auth_mode') == 'oauth':
+            auth = self._create_oauth_auth(instance_name, session_data)
+        else:
+            auth = tuple(session_data['auth']) if 'auth' in session_data else None
+        return httpx.AsyncClient(
+            auth=auth,
+            cookies=session_data.get('cookies', {}),
+            headers={'Accept': 'application/json'},
+            transport=transport,
+            timeout=http_config['timeout']
+        )
+
+    def _create_oauth_auth(self, instance_name: str, session_data: Dict) -> OAuthTokenAuth:
+        """Bearer token auth that stores renewed tokens back into the session cache."""
+        instance_config = self.config_manager.get_instance_config(instance_name)
+
+        def on_token(renewed: Dict):
+            self.stats['token_refreshes'] += 1
+            self.session_cache.update_session(instance_name, renewed)
+
+        return OAuthTokenAuth(
+            session_data,
+            self.config_manager.get_oauth_config(instance_name),
+            username=instance_config.get('username'),
+            password=instance_config.get('password'),
+            on_token=on_token
+        )
+
+    def bootstrap_oauth_session(self, instance_name: str) -> Optional[Dict]:
+        """
+        Start a token-less OAuth session for instances that can obtain tokens unattended.
+
+        Applies to the client_credentials grant, and to the password grant
+        when the password is configured. Returns None for other instances.
+        """
+        if self.config_manager.get_auth_mode(instance_name) != 'oauth':
+            return None
+        instance_config = self.config_manager.get_instance_config(instance_name)
+        grant_type = self.config_manager.get_oauth_config(instance_name)['grant_type']
+        if grant_type == 'password' and not instance_config.get('password'):
+            return None
+
+        session_data = new_oauth_session(instance_config['url'].rstrip('/'))
+        self.session_cache.save_session(instance_name, session_data)
+        return session_data
+
+    def get_admission_controller(self, instance_name: str) -> AdmissionController:
+        """Return the instance's admission controller, creating it if needed."""
+        controller = self._admission.get(instance_name)
+        if controller is None:
+            rate_limit_config = self.config_manager.get_rate_limit_config(instance_name)
+            controller = AdmissionController(
+                requests_per_second=rate_limit_config['requests_per_second'],
+                burst=rate_limit_config['burst'],
+                initial_concurrency=rate_limit_config['initial_concurrency'],
+                min_concurrency=rate_limit_config['min_concurrency'],
+                max_concurrency=rate_limit_config['max_concurrency']
+            )
+            self._admission[instance_name] = controller
+        return controller
+
+    def get_admission_stats(self) -> Dict[str, Dict]:
+        """Admission window and throttling counters per instance."""
+        return {name: controller.get_stats() for name, controller in self._admission.items()}
+
+    def get_circuit_breaker(self, instance_name: str) -> CircuitBreaker:
+        """Return the instance's circuit breaker, creating it if needed."""
+        breaker = self._breakers.get(instance_name)
+        if breaker is None:
+            resilience_config = self.config_manager.get_resilience_config(instance_name)
+            breaker = CircuitBreaker(
+                failure_threshold=resilience_config['failure_threshold'],
+                cooldown_seconds=resilience_config['cooldown_seconds']
+            )
+            self._breakers[instance_name] = breaker
+        return breaker
+
+    def get_circuit_stats(self) -> Dict[str, Dict]:
+        """Circuit state and retry counters per instance."""
+        return {name: breaker.get_stats() for name, breaker in self._breakers.items()}
+
+    def get_client(self, instance_name: str, session_data: Dict) -> httpx.AsyncClient:
+        """Return the pooled client for an instance, creating it if needed."""
+        authenticated_at = session_data.get('authenticated_at')
+
+        with self._lock:
+            entry = self._clients.get(instance_name)
+            if entry is not None and entry[0] == authenticated_at:
+                if isinstance(entry[1].auth, OAuthTokenAuth):
+                    entry[1].auth.adopt(session_data)
+                return entry[1]
+
+            client = self._create_client(instance_name, session_data)
+            self._clients[instance_name] = (authenticated_at, client)
+
+        if entry is not None:
+            self._close_later(entry[1])
+        logger.debug(f"Created pooled client for instance '{instance_name}'")
+        return client
+
+    async def verify(self, instance_name: str, client: httpx.AsyncClient) -> bool:
+        """
+        Verify the instance's session with a minimal API call.
+
+        Raises httpx.TransportError (including CircuitOpenError) when the
+        instance cannot be reached, so callers do not discard the session.
+        """
+        instance_config = self.config_manager.get_instance_config(instance_name)
+        test_url = f"{instance_config['url'].rstrip('/')}/api/now/table/sys_user"
+        params = {'sysparm_limit': 1, 'sysparm_fields': 'sys_id'}
+
+        try:
+            response = await client.get(test_url, params=params, timeout=10)
+            return response.status_code == 200
+        except httpx.TransportError:
+            # The instance is unreachable, which says nothing about the session; keep it
+            raise
+        except httpx.HTTPError:
+            return False
+
+    def mark_success(self, instance_name: str):
+        """Record that the instance's session just served a successful call."""
+        with self._lock:
+            self._last_success[instance_name] = time.monotonic()
+
+    def is_recently_verified(self, instance_name: str, interval_seconds: float) -> bool:
+        """Check whether the session succeeded within the last interval_seconds."""
+        with self._lock:
+            last_success = self._last_success.get(instance_name)
+        return last_success is not None and time.monotonic() - last_success < interval_seconds
+
+    def discard(self, instance_name: Optional[str] = None):
+        """Drop the pooled client for an instance, or all when None."""
+        with self._lock:
+            if instance_name is None:
+                entries = list(self._clients.values())
+                self._clients.clear()
+                self._last_success.clear()
+            else:
+                entry = self._clients.pop(instance_name, None)
+                self._last_success.pop(instance_name, None)
+                entries = [entry] if entry is not None else []
+
+        for _, client in entries:
+            self._close_later(client)
+
+    def forget_instance(self, instance_name: str):
+        """Drop the client, admission and circuit state of an instance whose configuration changed."""
+        self.discard(instance_name)
+        with self._lock:
+            self._admission.pop(instance_name, None)
+            self._breakers.pop(instance_name, None)
+
+    def _close_later(self, client: httpx.AsyncClient):
+        """Schedule closing a retired client on the running event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside the event loop there is nothing to schedule the close on
+            return
+        loop.create_task(client.aclose())
+
+    async def close_all(self):
+        """Close every pooled client."""
+        with self._lock:
+            entries = list(self._clients.values())
+            self._clients.clear()
+
+        for _, client in entries:
+            await client.aclose()
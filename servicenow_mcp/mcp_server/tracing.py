@@ -0,0 +1,133 @@
+"""Opt-in JSONL trace of tool calls with a per-phase time breakdown."""
+
+import cProfile
+import heapq
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+from typing import Iterator, List, Optional, Tuple
+
+from .metrics import CallStats
+
+
+logger = logging.getLogger(__name__)
+
+
+class CallTracer:
+    """
+    Writes one JSON line per sampled tool call.
+
+    Each record lists the milliseconds spent per phase: config lookup,
+    session acquisition and verification, validation, waiting for an
+    identical read in flight for another call, admission wait,
+    connect/TLS, server wait (time to first byte), body download, JSON
+    decode, result serialization, and dispatch (the tool handler as a
+    whole, which contains the network and decode phases). Phases of
+    concurrent upstream requests are summed, so they can exceed the
+    call's duration.
+
+    With profile_slowest set, sampled calls are also run under cProfile
+    and the profiles of the slowest calls seen so far are kept in
+    profile_dir. cProfile covers the whole event loop thread, so calls
+    running at the same time appear in each other's profiles; only one
+    call is profiled at a time.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sample_rate: float = 1.0,
+        profile_slowest: int = 0,
+        profile_dir: Optional[str] = None
+    ):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.profile_slowest = profile_slowest
+        self.profile_dir = profile_dir or os.path.join('cache', 'profiles')
+        self._lock = Lock()
+        self._profiling = False
+        # (duration, profile path) of the kept profiles, fastest first
+        self._slowest: List[Tuple[float, str]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @contextmanager
+    def trace_call(self, call: CallStats) -> Iterator[None]:
+        """Trace the tool call if it is sampled."""
+        if not self.enabled or random.random() >= self.sample_rate:
+            yield
+            return
+
+        call.requests = []
+        profiler = None
+        if self.profile_slowest > 0 and not self._profiling:
+            self._profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - call.started
+            profile_path = None
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+                profile_path = self._keep_profile(profiler, call, duration)
+            self._write(call, duration, profile_path)
+
+    def _keep_profile(self, profiler: cProfile.Profile, call: CallStats, duration: float) -> Optional[str]:
+        """Dump the profile if the call is among the slowest; drop the one it displaces."""
+        if len(self._slowest) >= self.profile_slowest and duration <= self._slowest[0][0]:
+            return None
+
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{call.tool}-{call.instance or 'none'}")
+        path = os.path.join(
+            self.profile_dir,
+            f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{name}-{int(duration * 1000)}ms.prof"
+        )
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError as e:
+            logger.warning(f"Failed to write profile: {e}")
+            return None
+
+        heapq.heappush(self._slowest, (duration, path))
+        if len(self._slowest) > self.profile_slowest:
+            _, displaced = heapq.heappop(self._slowest)
+            try:
+                os.unlink(displaced)
+            except OSError:
+                pass
+        return path
+
+    def _write(self, call: CallStats, duration: float, profile_path: Optional[str]):
+        record = {
+            'time': datetime.now().isoformat(),
+            'tool': call.tool,
+            'instance': call.instance,
+            'duration_ms': round(duration * 1000, 3),
+            'error': call.error,
+            'phases_ms': {name: round(seconds * 1000, 3) for name, seconds in call.phases.items()},
+            'upstream': call.upstream,
+            'requests': call.requests
+        }
+        if profile_path:
+            record['profile'] = profile_path
+
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.write(line)
+        except OSError as e:
+            logger.warning(f"Failed to write trace record: {e}")
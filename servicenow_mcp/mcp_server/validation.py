@@ -0,0 +1,59 @@
+"""Checks of encoded queries and field names against locally known dictionary fields."""
+
+import difflib
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .encoded_query import parse, referenced_fields
+
+
+# Resolves a table name to its fields from the local schema catalog, or None if unknown
+FieldLookup = Callable[[str], Optional[Dict[str, Dict]]]
+
+VALIDATION_MODES = ('off', 'warn', 'strict')
+
+
+def check_field(table: str, name: str, lookup: FieldLookup) -> Optional[str]:
+    """
+    Check one field name, following dot-walks through reference fields.
+
+    Returns:
+        A problem description, or None if the field exists or cannot be
+        checked because a referenced table is not in the catalog
+    """
+    current_table = table
+    current_fields = lookup(table)
+    parts = name.split('.')
+    for index, part in enumerate(parts):
+        if current_fields is None:
+            return None
+        if part not in current_fields:
+            problem = f"Unknown field '{part}' on table '{current_table}'"
+            suggestions = difflib.get_close_matches(part, list(current_fields), n=3)
+            if suggestions:
+                problem += f" (did you mean {', '.join(suggestions)}?)"
+            return problem
+        if index == len(parts) - 1:
+            return None
+
+        reference = current_fields[part].get('reference')
+        if not reference:
+            return f"Field '{part}' on table '{current_table}' is not a reference and cannot be dot-walked"
+        current_table = reference
+        current_fields = lookup(reference)
+    return None
+
+
+def check_fields(table: str, names: Iterable[str], lookup: FieldLookup) -> List[str]:
+    """Check field names such as payload keys or sysparm_fields entries."""
+    problems = [check_field(table, name, lookup) for name in dict.fromkeys(names)]
+    return [problem for problem in problems if problem]
+
+
+def check_query(table: str, query: str, lookup: FieldLookup) -> List[str]:
+    """Check that every term of an encoded query parses and names a known field."""
+    if not query:
+        return []
+    problems: List[str] = []
+    parsed = parse(query, errors=problems)
+    problems = [f"{problem} in query" for problem in problems]
+    return problems + check_fields(table, referenced_fields(parsed), lookup)
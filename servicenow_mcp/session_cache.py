@@ -2,14 +2,34 @@
 
 import json
 import os
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict
-from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from threading import RLock
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 
 class SessionCache:
-    """Manages cached ServiceNow sessions with expiration."""
+    """
+    Manages cached ServiceNow sessions with expiration.
+
+    The cache file is shared by every MCP server process and sn-connect.
+    Writes take an exclusive lock on a sidecar lock file, merge this
+    process's changes into the current file contents and replace the file
+    atomically, so concurrent writers do not lose each other's sessions.
+    Reads only reload the file after another process replaced or modified it.
+    Entries another process only updated with update_session() (renewed
+    OAuth tokens, same login) are picked up without notifying listeners.
+    Expired sessions are dropped in memory and pruned on the next write, and
+    changes made inside batch() are written once.
+    """
 
     def __init__(self, cache_path: Optional[str] = None, duration_hours: int = 8):
         if cache_path is None:
@@ -17,13 +37,32 @@ class SessionCache:
             cache_path = project_root / "cache" / "sessions.json"
 
         self.cache_path = Path(cache_path)
+        self.lock_path = self.cache_path.with_name(self.cache_path.name + '.lock')
         self.duration_hours = duration_hours
-        self._lock = Lock()
+        self._lock = RLock()
+        self._invalidation_listeners: List[Callable[[Optional[str]], None]] = []
+
+        # Changes not yet written: instance -> entry, or None for a removal
+        self._pending: Dict[str, Optional[Dict]] = {}
+        self._pending_clear = False
+        self._batch_depth = 0
 
         # Ensure cache directory exists
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
 
-        self._cache = self._load_cache()
+        # Identity of the file version in memory; () forces the first load
+        self._stamp: Optional[Tuple[int, ...]] = ()
+        self._cache: Dict = {}
+        self._reload()
+
+    def _file_stamp(self) -> Optional[Tuple[int, ...]]:
+        """Inode, modification time and size of the file; None if it does not exist."""
+        try:
+            stat = os.stat(self.cache_path)
+        except OSError:
+            return None
+        # Atomic replaces create a new inode, so writes within one mtime tick are still seen
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
     def _load_cache(self) -> Dict:
         """Load cache from disk."""
@@ -36,60 +75,208 @@ class SessionCache:
         except (json.JSONDecodeError, IOError):
             return {}
 
-    def _save_cache(self):
-        """Save cache to disk."""
+    def _reload(self) -> Set[str]:
+        """
+        Re-read the file if another process changed it.
+
+        Returns:
+            Instances whose entry was added, replaced or removed by the reload;
+            entries whose session data changed within the same login are not included
+        """
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return set()
+
+        previous = self._cache
+        self._cache = self._load_cache()
+        self._stamp = stamp
+        # Changes of this process not yet written stay visible
+        if self._pending_clear:
+            self._cache = {}
+        self._cache.update({name: entry for name, entry in self._pending.items() if entry})
+        for name, entry in self._pending.items():
+            if entry is None:
+                self._cache.pop(name, None)
+
+        return {
+            name for name in set(previous) | set(self._cache)
+            if not _same_login(previous.get(name), self._cache.get(name))
+        }
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive cross-process lock on the cache file."""
+        with open(self.lock_path, 'a+') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _save_cache(self) -> Set[str]:
+        """
+        Write pending changes to disk.
+
+        Returns:
+            Instances changed on disk by other processes since the last read
+        """
+        if not self._pending and not self._pending_clear:
+            return set()
+
         try:
-            with open(self.cache_path, 'w') as f:
-                json.dump(self._cache, f, indent=2)
-        except IOError as e:
+            with self._file_lock():
+                changed = self._reload()
+                now = datetime.now()
+                self._cache = {
+                    name: entry for name, entry in self._cache.items()
+                    if datetime.fromisoformat(entry['expires_at']) > now
+                }
+
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=str(self.cache_path.parent), prefix=self.cache_path.name, suffix='.tmp'
+                )
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(self._cache, f, separators=(',', ':'))
+                    os.replace(tmp_path, self.cache_path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+                self._stamp = self._file_stamp()
+        except (IOError, OSError) as e:
             print(f"Warning: Failed to save session cache: {e}")
+            return set()
 
-    def get_session(self, instance_name: str) -> Optional[Dict]:
-        """Get cached session for instance if valid."""
+        changed -= set(self._pending)
+        self._pending = {}
+        self._pending_clear = False
+        return changed
+
+    def _commit(self) -> Set[str]:
+        """Write now, unless inside batch()."""
+        if self._batch_depth:
+            return set()
+        return self._save_cache()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Coalesce the changes made inside the block into a single write."""
         with self._lock:
-            if instance_name not in self._cache:
-                return None
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                changed = self._commit()
+            self._notify_all(changed)
 
-            session_data = self._cache[instance_name]
-            expires_at = datetime.fromisoformat(session_data['expires_at'])
+    def add_invalidation_listener(self, callback: Callable[[Optional[str]], None]):
+        """
+        Register a callback fired when a cached session stops being valid.
 
-            if datetime.now() >= expires_at:
-                # Session expired
-                del self._cache[instance_name]
-                self._save_cache()
-                return None
+        The callback receives the instance name, or None when all sessions
+        were cleared.
+        """
+        self._invalidation_listeners.append(callback)
+
+    def _notify_invalidated(self, instance_name: Optional[str]):
+        """Notify listeners that a session was expired, replaced or removed."""
+        for callback in self._invalidation_listeners:
+            callback(instance_name)
+
+    def _notify_all(self, instance_names: Set[str]):
+        for instance_name in sorted(instance_names):
+            self._notify_invalidated(instance_name)
+
+    def get_session(self, instance_name: str) -> Optional[Dict]:
+        """Get cached session for instance if valid."""
+        with self._lock:
+            changed = self._reload()
+            session_data = self._cache.get(instance_name)
+            if session_data is not None:
+                expires_at = datetime.fromisoformat(session_data['expires_at'])
+                if datetime.now() < expires_at:
+                    session = session_data['session']
+                else:
+                    # Session expired; it is pruned from the file on the next write
+                    del self._cache[instance_name]
+                    changed.add(instance_name)
+                    session = None
+            else:
+                session = None
 
-            return session_data['session']
+        self._notify_all(changed)
+        return session
 
     def save_session(self, instance_name: str, session: Dict):
         """Save session to cache with expiration."""
         with self._lock:
             expires_at = datetime.now() + timedelta(hours=self.duration_hours)
 
-            self._cache[instance_name] = {
+            entry = {
                 'session': session,
                 'expires_at': expires_at.isoformat(),
                 'created_at': datetime.now().isoformat()
             }
+            self._cache[instance_name] = entry
+            self._pending[instance_name] = entry
 
-            self._save_cache()
+            changed = self._commit() | {instance_name}
+
+        self._notify_all(changed)
+
+    def update_session(self, instance_name: str, session: Dict):
+        """
+        Replace the data of a cached session without changing its expiry.
+
+        Used for renewed OAuth tokens: the login is unchanged, so listeners
+        in this process are not notified.
+        """
+        with self._lock:
+            changed = self._reload()
+            entry = self._cache.get(instance_name)
+            if entry is not None:
+                entry = {**entry, 'session': session}
+                self._cache[instance_name] = entry
+                self._pending[instance_name] = entry
+                changed |= self._commit()
+
+        self._notify_all(changed)
 
     def invalidate_session(self, instance_name: str):
         """Remove session from cache."""
         with self._lock:
+            changed = self._reload()
             if instance_name in self._cache:
                 del self._cache[instance_name]
-                self._save_cache()
+                self._pending[instance_name] = None
+                changed |= self._commit() | {instance_name}
+
+        self._notify_all(changed)
 
     def clear_all(self):
         """Clear all cached sessions."""
         with self._lock:
             self._cache = {}
-            self._save_cache()
+            self._pending = {}
+            self._pending_clear = True
+            self._commit()
+
+        self._notify_invalidated(None)
 
     def list_cached_sessions(self) -> Dict[str, Dict]:
         """List all cached sessions with their expiration times."""
         with self._lock:
+            changed = self._reload()
             result = {}
             now = datetime.now()
 
@@ -101,4 +288,15 @@ class SessionCache:
                     'created_at': data['created_at']
                 }
 
-            return result
+        self._notify_all(changed)
+        return result
+
+
+def _same_login(previous: Optional[Dict], current: Optional[Dict]) -> bool:
+    """Check whether two cache entries hold the same login, possibly with renewed tokens."""
+    if previous is None or current is None:
+        return previous is current
+    return (
+        previous['expires_at'] == current['expires_at']
+        and previous['session'].get('authenticated_at') == current['session'].get('authenticated_at')
+    )
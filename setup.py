@@ -30,10 +30,14 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "requests>=2.31.0",
+        "httpx>=0.24.0",
         "PyYAML>=6.0.1",
         "mcp>=0.9.0",
     ],
     extras_require={
+        "fast": [
+            "orjson>=3.8.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-asyncio>=0.21.0",
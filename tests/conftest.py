@@ -0,0 +1,31 @@
+"""Shared fixtures."""
+
+import pytest
+
+BASE_CONFIG = """\
+instances:
+  dev:
+    url: https://dev.service-now.com
+    username: admin
+    password: admin
+session:
+  cache_location: {tmp}/sessions.json
+schema_catalog:
+  location: {tmp}/schema
+sync:
+  location: {tmp}/mirror
+"""
+
+
+@pytest.fixture
+def make_server(tmp_path, monkeypatch):
+    """Build a ServiceNowMCPServer from the base config plus extra YAML, with state under tmp_path."""
+    from servicenow_mcp.mcp_server.server import ServiceNowMCPServer
+
+    def make(extra: str = ''):
+        config_path = tmp_path / 'instances.yaml'
+        config_path.write_text(BASE_CONFIG.format(tmp=tmp_path) + extra)
+        monkeypatch.setenv('SERVICENOW_MCP_CONFIG', str(config_path))
+        return ServiceNowMCPServer()
+
+    return make
@@ -0,0 +1,46 @@
+"""Tests for Aggregate API request building and result flattening."""
+
+import pytest
+
+from servicenow_mcp.mcp_server.aggregates import build_stats_params, flatten_stats
+
+
+@pytest.mark.parametrize('group_by', ['state', ['state'], 'state, priority', ['state', 'priority']])
+def test_group_by_accepts_string_or_list(group_by):
+    params = build_stats_params({'group_by': group_by})
+
+    expected = 'state' if 'priority' not in group_by else 'state,priority'
+    assert params['sysparm_group_by'] == expected
+
+
+@pytest.mark.parametrize('fields', ['impact', ['impact'], 'impact,urgency'])
+def test_aggregate_fields_accept_string_or_list(fields):
+    params = build_stats_params({'avg_fields': fields})
+
+    assert params['sysparm_avg_fields'] == ('impact,urgency' if 'urgency' in fields else 'impact')
+    # An explicit aggregate turns off the default count
+    assert 'sysparm_count' not in params
+
+
+def test_count_by_default():
+    assert build_stats_params({'query': 'active=true'}) == {
+        'sysparm_query': 'active=true', 'sysparm_count': 'true'
+    }
+
+
+def test_empty_group_by_is_left_out():
+    assert 'sysparm_group_by' not in build_stats_params({'group_by': ''})
+
+
+def test_flatten_grouped_result():
+    result = [{
+        'groupby_fields': [{'field': 'state', 'value': '1', 'display_value': 'New'}],
+        'stats': {'count': '3', 'avg': {'impact': '1.5'}}
+    }]
+
+    assert flatten_stats(result) == [{'state': 'New', 'count': 3, 'avg.impact': 1.5}]
+
+
+def test_flatten_ungrouped_result():
+    assert flatten_stats({'stats': {'count': '42'}}) == [{'count': 42}]
+    assert flatten_stats(None) == []
@@ -0,0 +1,59 @@
+"""Tests for re-running tool calls after the session is rejected."""
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def server(make_server, monkeypatch):
+    server = make_server("validation:\n  mode: 'off'\n")
+    verifications = []
+
+    async def get_session(instance_name, force_verify=False):
+        verifications.append(force_verify)
+        return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    monkeypatch.setattr(server, '_get_authenticated_session', get_session)
+    server.verifications = verifications
+    return server
+
+
+def rejecting_dispatch(server, monkeypatch, status_code):
+    calls = []
+
+    async def dispatch(name, client, base_url, arguments):
+        calls.append(name)
+        if len(calls) == 1:
+            request = httpx.Request('GET', base_url)
+            raise httpx.HTTPStatusError(
+                'rejected', request=request, response=httpx.Response(status_code, request=request)
+            )
+        return {'result': []}
+
+    monkeypatch.setattr(server, '_dispatch_tool', dispatch)
+    return calls
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('status_code', [401, 403])
+async def test_read_tools_are_retried_once(server, monkeypatch, status_code):
+    calls = rejecting_dispatch(server, monkeypatch, status_code)
+
+    result = await server._handle_tool_call('get_records', {'instance': 'dev', 'table': 'incident'})
+
+    assert result == {'result': []}
+    assert calls == ['get_records', 'get_records']
+    assert server.verifications == [False, True]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('name', ['create_record', 'bulk_update', 'bulk_delete_by_query', 'batch'])
+async def test_write_tools_are_not_rerun(server, monkeypatch, name):
+    calls = rejecting_dispatch(server, monkeypatch, 401)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await server._handle_tool_call(name, {'instance': 'dev', 'table': 'incident'})
+
+    assert calls == [name]
+    # The session is still re-verified, so a dead one is dropped
+    assert server.verifications == [False, True]
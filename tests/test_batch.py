@@ -0,0 +1,227 @@
+"""Tests for the batch tool and its Batch API translation."""
+
+import base64
+import json
+
+import httpx
+import pytest
+
+from servicenow_mcp.mcp_server.batch import (
+    BATCH_PATH,
+    build_batch_body,
+    decode_serviced_request,
+    is_clear_rejection,
+    operation_request,
+)
+from servicenow_mcp.mcp_server.resilience import CircuitOpenError
+
+BASE_URL = 'https://dev.service-now.com'
+
+
+def encode(body):
+    return base64.b64encode(json.dumps(body).encode('utf-8')).decode('ascii')
+
+
+def status_error(status_code):
+    request = httpx.Request('POST', BASE_URL + BATCH_PATH)
+    return httpx.HTTPStatusError(
+        'failed', request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+class TestOperationRequest:
+    def test_get_list_with_query_and_projection(self):
+        request = operation_request(
+            {'op': 'get', 'table': 'incident', 'query': 'active=true', 'limit': 5},
+            {'sysparm_fields': 'number'}
+        )
+
+        assert request['method'] == 'GET'
+        assert request['url'] == (
+            '/api/now/table/incident?sysparm_fields=number&sysparm_limit=5&sysparm_query=active%3Dtrue'
+        )
+        assert request['body'] is None
+
+    def test_create_posts_to_the_table(self):
+        request = operation_request({'op': 'create', 'table': 'incident', 'data': {'short_description': 'x'}})
+
+        assert request == {'method': 'POST', 'url': '/api/now/table/incident', 'body': {'short_description': 'x'}}
+
+    def test_update_and_delete_address_the_record(self):
+        update = operation_request({'op': 'update', 'table': 'incident', 'sys_id': 'a1', 'data': {}})
+        delete = operation_request({'op': 'delete', 'table': 'incident', 'sys_id': 'a1'})
+
+        assert (update['method'], update['url']) == ('PUT', '/api/now/table/incident/a1')
+        assert (delete['method'], delete['url'], delete['body']) == ('DELETE', '/api/now/table/incident/a1', None)
+
+    @pytest.mark.parametrize('operation', [
+        {'op': 'merge', 'table': 'incident'},
+        {'op': 'get'},
+        {'op': 'delete', 'table': 'incident'},
+        {'op': 'update', 'table': 'incident', 'sys_id': 'a1'},
+        {'op': 'create', 'table': 'incident', 'data': 'x'},
+    ])
+    def test_invalid_operations_are_rejected(self, operation):
+        with pytest.raises(ValueError):
+            operation_request(operation)
+
+
+def test_batch_body_encodes_request_bodies():
+    body = build_batch_body('b1', [
+        {'id': '0', 'method': 'GET', 'url': '/api/now/table/incident', 'body': None},
+        {'id': '1', 'method': 'POST', 'url': '/api/now/table/incident', 'body': {'a': 'b'}},
+    ])
+
+    assert body['batch_request_id'] == 'b1'
+    read, write = body['rest_requests']
+    assert 'body' not in read
+    assert json.loads(base64.b64decode(write['body'])) == {'a': 'b'}
+    assert write['exclude_response_headers'] is True
+
+
+class TestDecodeServicedRequest:
+    def test_success_unwraps_result(self):
+        result = decode_serviced_request({'status_code': 201, 'body': encode({'result': {'sys_id': 'a1'}})})
+
+        assert result == {'status_code': 201, 'success': True, 'result': {'sys_id': 'a1'}}
+
+    def test_failure_reports_instance_message(self):
+        result = decode_serviced_request(
+            {'status_code': 403, 'body': encode({'error': {'message': 'Insufficient rights'}})}
+        )
+
+        assert result == {'status_code': 403, 'success': False, 'error': 'Insufficient rights'}
+
+    def test_non_json_body_is_kept_as_text(self):
+        result = decode_serviced_request(
+            {'status_code': 200, 'body': base64.b64encode(b'plain').decode('ascii')}
+        )
+
+        assert result == {'status_code': 200, 'success': True, 'result': 'plain'}
+
+
+class TestIsClearRejection:
+    @pytest.mark.parametrize('error', [
+        httpx.ConnectError('refused'),
+        httpx.ConnectTimeout('slow'),
+        CircuitOpenError('open'),
+        status_error(400),
+        status_error(404),
+    ])
+    def test_nothing_ran(self, error):
+        assert is_clear_rejection(error)
+
+    @pytest.mark.parametrize('error', [
+        httpx.ReadTimeout('slow'),
+        httpx.RemoteProtocolError('dropped'),
+        status_error(500),
+        status_error(502),
+        ValueError('bad json'),
+    ])
+    def test_outcome_unknown(self, error):
+        assert not is_clear_rejection(error)
+
+
+class BatchInstance:
+    """Mock instance whose Batch API endpoint fails with a given error or status."""
+
+    def __init__(self, batch_error=None, batch_status=None):
+        self.batch_error = batch_error
+        self.batch_status = batch_status
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append((request.method, request.url.path))
+        if request.url.path == BATCH_PATH:
+            if self.batch_error is not None:
+                raise self.batch_error(request)
+            if self.batch_status is not None:
+                return httpx.Response(self.batch_status)
+            body = json.loads(request.content)
+            return httpx.Response(200, json={'serviced_requests': [
+                {'id': rest['id'], 'status_code': 200, 'body': encode({'result': {'via': 'batch'}})}
+                for rest in body['rest_requests']
+            ]})
+        return httpx.Response(200, json={'result': {'via': request.method}})
+
+    def individual(self):
+        return [request for request in self.requests if request[1] != BATCH_PATH]
+
+
+OPERATIONS = [
+    {'op': 'get', 'table': 'incident', 'sys_id': 'a1'},
+    {'op': 'update', 'table': 'incident', 'sys_id': 'a1', 'data': {'state': '2'}},
+]
+
+
+async def run_batch(make_server, instance, **args):
+    server = make_server()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(instance)) as client:
+        return await server._batch(client, BASE_URL, {'instance': 'dev', 'operations': OPERATIONS, **args})
+
+
+@pytest.mark.asyncio
+async def test_operations_are_serviced_by_the_batch_api(make_server):
+    instance = BatchInstance()
+
+    result = await run_batch(make_server, instance)
+
+    assert [entry['result'] for entry in result['result']] == [{'via': 'batch'}, {'via': 'batch'}]
+    assert result['summary']['batch_requests'] == 1
+    assert instance.individual() == []
+
+
+@pytest.mark.asyncio
+async def test_clear_rejection_falls_back_to_individual_requests(make_server):
+    instance = BatchInstance(batch_status=400)
+
+    result = await run_batch(make_server, instance)
+
+    assert result['summary']['succeeded'] == 2
+    assert result['summary']['individual_requests'] == 2
+    assert sorted(instance.individual()) == [
+        ('GET', '/api/now/table/incident/a1'), ('PUT', '/api/now/table/incident/a1')
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unknown_outcome_resends_reads_only(make_server):
+    instance = BatchInstance(batch_error=lambda request: httpx.ReadTimeout('slow', request=request))
+
+    result = await run_batch(make_server, instance)
+
+    read, write = result['result']
+    assert read['success'] is True
+    assert write['success'] is False
+    assert 'may have been applied' in write['error']
+    assert instance.individual() == [('GET', '/api/now/table/incident/a1')]
+
+
+@pytest.mark.asyncio
+async def test_no_fallback_reports_failures(make_server):
+    instance = BatchInstance(batch_status=400)
+
+    result = await run_batch(make_server, instance, fallback=False)
+
+    assert result['summary']['failed'] == 2
+    assert instance.individual() == []
+
+
+@pytest.mark.asyncio
+async def test_rejected_chunk_resent_after_reverification(make_server):
+    server = make_server()
+    instance = BatchInstance(batch_status=401)
+    verified = BatchInstance()
+    verifications = []
+
+    async def get_session(instance_name, force_verify=False):
+        verifications.append(force_verify)
+        return httpx.AsyncClient(transport=httpx.MockTransport(verified))
+
+    server._get_authenticated_session = get_session
+    async with httpx.AsyncClient(transport=httpx.MockTransport(instance)) as client:
+        result = await server._batch(client, BASE_URL, {'instance': 'dev', 'operations': OPERATIONS})
+
+    assert verifications == [True]
+    assert result['summary']['succeeded'] == 2
+    assert verified.requests == [('POST', BATCH_PATH)]
@@ -0,0 +1,120 @@
+"""Tests for the bulk write helpers."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from servicenow_mcp.mcp_server.bulk import count_records, iter_sys_ids, run_writes, summarize
+
+TABLE_URL = 'https://dev.service-now.com/api/now/table/incident'
+
+
+def make_client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_count_records_reads_the_total_header():
+    seen = []
+
+    def handler(request):
+        seen.append(dict(request.url.params))
+        return httpx.Response(200, headers={'X-Total-Count': '42'}, json={'result': []})
+
+    async with make_client(handler) as client:
+        assert await count_records(client, TABLE_URL, 'active=true') == 42
+
+    assert seen == [{'sysparm_fields': 'sys_id', 'sysparm_limit': '1', 'sysparm_query': 'active=true'}]
+
+
+@pytest.mark.asyncio
+async def test_iter_sys_ids_continues_past_short_pages():
+    # Page size 3, but ACLs hide records: pages come back short before the end
+    pages = [['a', 'b'], ['c'], ['d', 'e', 'f'], []]
+    queries = []
+
+    def handler(request):
+        queries.append(request.url.params['sysparm_query'])
+        return httpx.Response(200, json={'result': [{'sys_id': sys_id} for sys_id in pages[len(queries) - 1]]})
+
+    async with make_client(handler) as client:
+        batches = [batch async for batch in iter_sys_ids(client, TABLE_URL, 'active=true', page_size=3)]
+
+    assert batches == [['a', 'b'], ['c'], ['d', 'e', 'f']]
+    assert queries == [
+        'active=true^ORDERBYsys_id',
+        'active=true^sys_id>b^ORDERBYsys_id',
+        'active=true^sys_id>c^ORDERBYsys_id',
+        'active=true^sys_id>f^ORDERBYsys_id',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_sys_ids_raises_on_error():
+    async with make_client(lambda request: httpx.Response(403)) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            async for _ in iter_sys_ids(client, TABLE_URL, ''):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_run_writes_limits_requests_in_flight():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={'result': {'sys_id': request.url.path.rsplit('/', 1)[-1]}})
+
+    writes = [
+        {'method': 'PATCH', 'url': f"{TABLE_URL}/{index}", 'body': {}, 'key': str(index)}
+        for index in range(10)
+    ]
+    async with make_client(handler) as client:
+        outcomes = await run_writes(client, writes, concurrency=3)
+
+    assert peak == 3
+    assert [outcome['sys_id'] for outcome in outcomes] == [str(index) for index in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_run_writes_reports_partial_failures_in_order():
+    def handler(request):
+        sys_id = request.url.path.rsplit('/', 1)[-1]
+        if sys_id == 'b':
+            return httpx.Response(403, json={'error': {'message': 'ACL'}})
+        if sys_id == 'c':
+            raise httpx.ConnectError('refused', request=request)
+        return httpx.Response(204)
+
+    writes = [{'method': 'DELETE', 'url': f"{TABLE_URL}/{key}", 'key': key} for key in 'abcd']
+    async with make_client(handler) as client:
+        outcomes = await run_writes(client, writes, concurrency=2)
+
+    assert [outcome['success'] for outcome in outcomes] == [True, False, False, True]
+    assert outcomes[1] == {'key': 'b', 'status_code': 403, 'success': False, 'error': 'ACL'}
+    assert outcomes[2]['status_code'] is None
+
+    result = summarize(outcomes)
+    assert result['summary'] == {'requested': 4, 'succeeded': 2, 'failed': 2, 'dry_run': False}
+    assert result['succeeded'] == ['a', 'd']
+    assert [failure['key'] for failure in result['failures']] == ['b', 'c']
+
+
+@pytest.mark.asyncio
+async def test_run_writes_reports_progress_across_calls():
+    reports = []
+
+    async def progress(completed, total):
+        reports.append((completed, total))
+
+    writes = [{'method': 'DELETE', 'url': f"{TABLE_URL}/{index}", 'key': str(index)} for index in range(2)]
+    async with make_client(lambda request: httpx.Response(204)) as client:
+        await run_writes(client, writes, concurrency=1, progress=progress, total=4, completed=2)
+
+    assert reports == [(3, 4), (4, 4)]
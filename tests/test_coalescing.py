@@ -0,0 +1,153 @@
+"""Tests for single-flight sharing of identical in-flight GET requests."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from servicenow_mcp.mcp_server.coalescing import CoalescingTransport
+from servicenow_mcp.mcp_server.metrics import ServerMetrics
+
+URL = '/api/now/table/incident?sysparm_limit=1'
+
+
+class GatedUpstream:
+    """Upstream handler holding every request until released, counting what it receives."""
+
+    def __init__(self):
+        self.requests = []
+        self.release = asyncio.Event()
+        self.error = None
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return httpx.Response(200, json={'result': [{'n': len(self.requests)}]})
+
+
+def make_client(upstream, metrics=None):
+    transport = CoalescingTransport(httpx.MockTransport(upstream), metrics, 'dev')
+    return httpx.AsyncClient(transport=transport, base_url='https://dev.service-now.com')
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_share_one_request():
+    upstream = GatedUpstream()
+    metrics = ServerMetrics()
+
+    async with make_client(upstream, metrics) as client:
+        tasks = [asyncio.ensure_future(client.get(URL)) for _ in range(3)]
+        await settle()
+        upstream.release.set()
+        responses = await asyncio.gather(*tasks)
+
+    assert len(upstream.requests) == 1
+    assert [response.json() for response in responses] == [{'result': [{'n': 1}]}] * 3
+    assert metrics.snapshot()['instances']['dev']['upstream']['coalesced'] == 2
+
+
+@pytest.mark.asyncio
+async def test_different_urls_are_not_shared():
+    upstream = GatedUpstream()
+
+    async with make_client(upstream) as client:
+        tasks = [
+            asyncio.ensure_future(client.get(URL)),
+            asyncio.ensure_future(client.get(URL + '&sysparm_offset=1')),
+        ]
+        await settle()
+        upstream.release.set()
+        await asyncio.gather(*tasks)
+
+    assert len(upstream.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_sequential_gets_are_not_shared():
+    upstream = GatedUpstream()
+    upstream.release.set()
+
+    async with make_client(upstream) as client:
+        await client.get(URL)
+        await client.get(URL)
+
+    assert len(upstream.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_writes_are_never_shared():
+    upstream = GatedUpstream()
+
+    async with make_client(upstream) as client:
+        tasks = [asyncio.ensure_future(client.post(URL, json={})) for _ in range(2)]
+        await settle()
+        upstream.release.set()
+        await asyncio.gather(*tasks)
+
+    assert len(upstream.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_after_a_completed_write_does_not_join_an_earlier_read():
+    reads = asyncio.Event()
+    requests = []
+
+    async def upstream(request):
+        requests.append(request.method)
+        if request.method == 'GET' and len(requests) == 1:
+            await reads.wait()
+        return httpx.Response(200, json={'result': len(requests)})
+
+    async with make_client(upstream) as client:
+        before = asyncio.ensure_future(client.get(URL))
+        await settle()
+        await client.patch(URL, json={'state': '2'})
+        after = asyncio.ensure_future(client.get(URL))
+        await settle()
+        reads.set()
+        await asyncio.gather(before, after)
+
+    assert requests == ['GET', 'PATCH', 'GET']
+    assert after.result().json() == {'result': 3}
+
+
+@pytest.mark.asyncio
+async def test_error_is_raised_for_every_waiter():
+    upstream = GatedUpstream()
+
+    async with make_client(upstream) as client:
+        tasks = [asyncio.ensure_future(client.get(URL)) for _ in range(2)]
+        await settle()
+        upstream.error = httpx.ConnectError('refused', request=upstream.requests[0])
+        upstream.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert len(upstream.requests) == 1
+    assert all(isinstance(result, httpx.ConnectError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_lets_a_follower_send_its_own():
+    upstream = GatedUpstream()
+
+    async with make_client(upstream) as client:
+        leader = asyncio.ensure_future(client.get(URL))
+        await settle()
+        follower = asyncio.ensure_future(client.get(URL))
+        await settle()
+
+        leader.cancel()
+        await settle()
+        upstream.release.set()
+        response = await follower
+
+    assert leader.cancelled()
+    assert len(upstream.requests) == 2
+    assert response.status_code == 200
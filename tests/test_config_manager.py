@@ -0,0 +1,83 @@
+"""Tests for the config snapshot and reloads."""
+
+import os
+
+from servicenow_mcp.config_manager import ConfigManager
+
+CONFIG = """\
+instances:
+  dev:
+    url: https://dev.service-now.com
+    username: admin
+"""
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_snapshot_next_to_config(tmp_path):
+    config_path = write(tmp_path / 'instances.yaml', CONFIG)
+
+    manager = ConfigManager(config_path)
+
+    assert manager.snapshot_path == tmp_path / '.instances.yaml.snapshot.json'
+    assert manager.snapshot_path.exists()
+    assert ConfigManager(config_path).config == manager.config
+
+
+def test_configs_do_not_share_a_snapshot(tmp_path):
+    first = write(tmp_path / 'first.yaml', CONFIG)
+    second = write(tmp_path / 'second.yaml', CONFIG.replace('dev', 'prod'))
+
+    ConfigManager(first)
+    ConfigManager(second)
+
+    assert ConfigManager(first).list_instances() == ['dev']
+    assert ConfigManager(second).list_instances() == ['prod']
+
+
+def test_snapshot_is_used_while_file_is_unchanged(tmp_path):
+    config_path = write(tmp_path / 'instances.yaml', CONFIG)
+    manager = ConfigManager(config_path)
+    # Same size and mtime, different contents: only the snapshot can produce the old instance
+    stat = os.stat(config_path)
+    write(tmp_path / 'instances.yaml', CONFIG.replace('dev', 'qa_'))
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert ConfigManager(config_path).list_instances() == manager.list_instances() == ['dev']
+
+
+def test_config_with_secrets_is_not_snapshotted(tmp_path):
+    password = write(tmp_path / 'password.yaml', CONFIG + "    password: hunter2\n")
+    secret = write(
+        tmp_path / 'secret.yaml',
+        CONFIG + "    auth: oauth\n    oauth:\n      client_id: abc\n      client_secret: s3cret\n"
+    )
+
+    for config_path in (password, secret):
+        manager = ConfigManager(config_path)
+        assert not manager.snapshot_path.exists()
+
+    assert ConfigManager(password).get_instance_config('dev')['password'] == 'hunter2'
+    assert ConfigManager(secret).get_oauth_config('dev')['client_secret'] == 's3cret'
+
+
+def test_empty_secret_does_not_prevent_snapshot(tmp_path):
+    config_path = write(tmp_path / 'instances.yaml', CONFIG + "    password:\n")
+
+    assert ConfigManager(config_path).snapshot_path.exists()
+
+
+def test_reload_if_changed(tmp_path):
+    config_path = write(tmp_path / 'instances.yaml', CONFIG)
+    manager = ConfigManager(config_path)
+
+    assert manager.reload_if_changed() == set()
+
+    write(tmp_path / 'instances.yaml', CONFIG + "  prod:\n    url: https://prod.service-now.com\n")
+    os.utime(config_path, ns=(0, os.stat(config_path).st_mtime_ns + 10 ** 9))
+
+    assert manager.reload_if_changed() == {'prod'}
+    assert manager.list_instances() == ['dev', 'prod']
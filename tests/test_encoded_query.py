@@ -0,0 +1,210 @@
+"""Tests for encoded query parsing and translation to SQLite."""
+
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from servicenow_mcp.mcp_server.encoded_query import UnsupportedQueryError, parse, translate
+
+COLUMNS = ['number', 'priority', 'state', 'short_description', 'opened_at']
+
+# A Sunday, on the last day of a month following a leap-year February
+NOW = datetime(2024, 3, 31, 15, 30, 10)
+
+
+def select(query, rows):
+    """Run a translated query against an in-memory table and return the matching numbers."""
+    conn = sqlite3.connect(':memory:')
+    conn.execute(f"CREATE TABLE t ({', '.join(COLUMNS)})")
+    conn.executemany(
+        f"INSERT INTO t VALUES ({', '.join('?' for _ in COLUMNS)})",
+        [[row.get(column) for column in COLUMNS] for row in rows]
+    )
+    where, params, order_terms = translate(query, COLUMNS, now=NOW)
+    sql = f"SELECT number FROM t WHERE {where}"
+    if order_terms:
+        sql += f" ORDER BY {', '.join(order_terms)}"
+    return [row[0] for row in conn.execute(sql, params)]
+
+
+class TestParse:
+    def test_or_binds_to_previous_condition(self):
+        parsed = parse('priority=1^ORpriority=2^state=3')
+
+        clauses = parsed['groups'][0]
+        assert [[c['value'] for c in clause] for clause in clauses] == [['1', '2'], ['3']]
+
+    def test_nq_starts_a_new_group(self):
+        parsed = parse('priority=1^NQstate=2^ORstate=3')
+
+        assert len(parsed['groups']) == 2
+        assert [c['value'] for c in parsed['groups'][1][0]] == ['2', '3']
+
+    def test_leading_or_starts_a_clause(self):
+        parsed = parse('ORpriority=1^state=2')
+
+        assert [len(clause) for clause in parsed['groups'][0]] == [1, 1]
+
+    def test_double_caret_is_a_literal_caret(self):
+        parsed = parse('short_description=a^^b^state=1')
+
+        conditions = [clause[0] for clause in parsed['groups'][0]]
+        assert conditions[0]['value'] == 'a^b'
+        assert conditions[1] == {'field': 'state', 'operator': '=', 'value': '1'}
+
+    def test_order_by(self):
+        parsed = parse('state=1^ORDERBYDESCopened_at^ORDERBYnumber')
+
+        assert parsed['order_by'] == [('opened_at', True), ('number', False)]
+
+    def test_longest_operator_wins(self):
+        parsed = parse('short_descriptionNOT LIKEfoo^priority>=2')
+
+        operators = [clause[0]['operator'] for clause in parsed['groups'][0]]
+        assert operators == ['NOT LIKE', '>=']
+
+    def test_unparseable_term_raises(self):
+        with pytest.raises(UnsupportedQueryError):
+            parse('Priority=1')
+
+    def test_unparseable_term_collected(self):
+        errors = []
+        parsed = parse('Priority=1^state=2', errors)
+
+        assert len(errors) == 1
+        assert parsed['groups'][0] == [[{'field': 'state', 'operator': '=', 'value': '2'}]]
+
+
+class TestTranslate:
+    def test_or_and_nq_precedence(self):
+        where, params, _ = translate('priority=1^ORpriority=2^state=3^NQnumber=X', COLUMNS, now=NOW)
+
+        assert where == (
+            '(("priority" = ? COLLATE NOCASE OR "priority" = ? COLLATE NOCASE) '
+            'AND "state" = ? COLLATE NOCASE) OR ("number" = ? COLLATE NOCASE)'
+        )
+        assert params == ['1', '2', '3', 'X']
+
+    def test_or_and_nq_precedence_against_rows(self):
+        rows = [
+            {'number': 'A', 'priority': '1', 'state': '3'},
+            {'number': 'B', 'priority': '2', 'state': '3'},
+            {'number': 'C', 'priority': '2', 'state': '1'},
+            {'number': 'D', 'priority': '4', 'state': '1'},
+        ]
+
+        assert select('priority=1^ORpriority=2^state=3^NQnumber=D^ORDERBYnumber', rows) == ['A', 'B', 'D']
+
+    def test_empty_query_matches_everything(self):
+        assert translate('', COLUMNS, now=NOW) == ('1', [], [])
+
+    def test_escaped_caret_is_a_parameter(self):
+        rows = [{'number': 'A', 'short_description': 'x^y'}, {'number': 'B', 'short_description': 'x'}]
+
+        assert select('short_description=x^^y', rows) == ['A']
+
+    def test_in_values_are_parameters(self):
+        where, params, _ = translate("numberIN1,2') OR 1=1 --", COLUMNS, now=NOW)
+
+        assert where == '"number" COLLATE NOCASE IN (?, ?)'
+        assert params == ['1', "2') OR 1=1 --"]
+
+    def test_equality_and_in_ignore_case(self):
+        rows = [
+            {'number': 'A', 'state': 'Closed'},
+            {'number': 'B', 'state': 'closed'},
+            {'number': 'C', 'state': 'Open'},
+        ]
+
+        assert select('state=CLOSED^ORDERBYnumber', rows) == ['A', 'B']
+        assert select('state!=closed^ORDERBYnumber', rows) == ['C']
+        assert select('stateINopen,CLOSED^ORDERBYnumber', rows) == ['A', 'B', 'C']
+        assert select('stateNOT INOPEN^ORDERBYnumber', rows) == ['A', 'B']
+
+    def test_default_now_is_utc(self):
+        before = datetime.now(timezone.utc).strftime('%Y-%m-%d %H')
+        _, params, _ = translate('opened_atRELATIVEGE@hour@ago@0', COLUMNS)
+        after = datetime.now(timezone.utc).strftime('%Y-%m-%d %H')
+
+        assert params[0][:13] in (before, after)
+
+    def test_not_in_matches_empty_values(self):
+        rows = [{'number': 'A', 'state': '1'}, {'number': 'B', 'state': '2'}, {'number': 'C'}]
+
+        assert select('stateNOT IN1,3^ORDERBYnumber', rows) == ['B', 'C']
+
+    def test_like_escapes_wildcards(self):
+        rows = [
+            {'number': 'A', 'short_description': '50%_off'},
+            {'number': 'B', 'short_description': '50 percent off'},
+            {'number': 'C', 'short_description': 'path\\to'},
+            {'number': 'D', 'short_description': 'pathXto'},
+        ]
+
+        assert select('short_descriptionLIKE50%_', rows) == ['A']
+        assert select('short_descriptionLIKEh\\t', rows) == ['C']
+
+    def test_startswith_and_endswith(self):
+        rows = [{'number': 'A', 'short_description': 'disk full'}, {'number': 'B', 'short_description': 'full disk'}]
+
+        assert select('short_descriptionSTARTSWITHdisk', rows) == ['A']
+        assert select('short_descriptionENDSWITHdisk', rows) == ['B']
+
+    def test_numeric_comparison(self):
+        rows = [{'number': 'A', 'priority': '10'}, {'number': 'B', 'priority': '9'}]
+
+        assert select('priority>9', rows) == ['A']
+
+    def test_order_terms(self):
+        _, _, order_terms = translate('ORDERBYDESCopened_at^ORDERBYnumber', COLUMNS, now=NOW)
+
+        assert order_terms == ['"opened_at" DESC', '"number" ASC']
+
+    def test_missing_column(self):
+        with pytest.raises(UnsupportedQueryError, match='assigned_to'):
+            translate('assigned_to=abc', COLUMNS, now=NOW)
+
+    def test_unsupported_operator(self):
+        with pytest.raises(UnsupportedQueryError):
+            translate('stateCHANGESTO3', COLUMNS, now=NOW)
+
+
+class TestDateHelpers:
+    @pytest.mark.parametrize('value, expected', [
+        ('javascript:gs.beginningOfToday()', '2024-03-31 00:00:00'),
+        ('javascript:gs.endOfYesterday()', '2024-03-30 23:59:59'),
+        ('javascript:gs.beginningOfThisWeek()', '2024-03-25 00:00:00'),
+        ('javascript:gs.endOfLastWeek()', '2024-03-24 23:59:59'),
+        ('javascript:gs.beginningOfLastMonth()', '2024-02-01 00:00:00'),
+        ('javascript:gs.endOfLastMonth()', '2024-02-29 23:59:59'),
+        ('javascript:gs.beginningOfNextYear()', '2025-01-01 00:00:00'),
+        ('javascript:gs.daysAgoStart(2)', '2024-03-29 00:00:00'),
+        ('javascript:gs.hoursAgoEnd(1)', '2024-03-31 14:59:59'),
+        ('javascript:gs.minutesAgo(30)', '2024-03-31 15:00:10'),
+        ('javascript:gs.monthsAgo(1)', '2024-02-29 15:30:10'),
+        ("javascript:gs.dateGenerate('2024-02-01','end')", '2024-02-01 23:59:59'),
+    ])
+    def test_script_values(self, value, expected):
+        _, params, _ = translate(f'opened_at>={value}', COLUMNS, now=NOW)
+
+        assert params == [expected]
+
+    def test_on_range(self):
+        where, params, _ = translate(
+            'opened_atONToday@javascript:gs.beginningOfToday()@javascript:gs.endOfToday()',
+            COLUMNS, now=NOW
+        )
+
+        assert where == '"opened_at" BETWEEN ? AND ?'
+        assert params == ['2024-03-31 00:00:00', '2024-03-31 23:59:59']
+
+    def test_relative(self):
+        where, params, _ = translate('opened_atRELATIVEGE@day@ago@7', COLUMNS, now=NOW)
+
+        assert where == '"opened_at" >= ?'
+        assert params == ['2024-03-24 15:30:10']
+
+    def test_unknown_script(self):
+        with pytest.raises(UnsupportedQueryError):
+            translate('opened_at>=javascript:gs.getUserID()', COLUMNS, now=NOW)
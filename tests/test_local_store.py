@@ -0,0 +1,166 @@
+"""Tests for the SQLite table mirrors and their delta sync."""
+
+import time
+
+import httpx
+import pytest
+
+from benchmarks.mock_servicenow import _sort_key, compile_query
+from servicenow_mcp.mcp_server.local_store import LocalStore, MirrorUnavailableError
+
+BASE_URL = 'https://dev.service-now.com'
+COLUMNS = ['sys_id', 'sys_updated_on', 'number', 'state']
+
+
+class Instance:
+    """Table API serving one table from a list of rows, recording each query."""
+
+    def __init__(self, rows, hidden=()):
+        self.rows = rows
+        # sys_ids an ACL hides from reads but not from the total count
+        self.hidden = set(hidden)
+        self.queries = []
+
+    def __call__(self, request):
+        params = request.url.params
+        query = params.get('sysparm_query', '')
+        self.queries.append(query)
+        matches, order_by = compile_query(query, COLUMNS)
+        rows = [row for row in self.rows if matches(row)]
+        for field, descending in reversed(order_by):
+            rows.sort(key=lambda row: _sort_key(row.get(field)), reverse=descending)
+        total = len(rows)
+
+        rows = rows[:int(params.get('sysparm_limit', 10000))]
+        rows = [row for row in rows if row['sys_id'] not in self.hidden]
+        if params.get('sysparm_fields'):
+            fields = params['sysparm_fields'].split(',')
+            rows = [{field: row.get(field) for field in fields} for row in rows]
+        return httpx.Response(200, headers={'X-Total-Count': str(total)}, json={'result': rows})
+
+    def update(self, sys_id, **values):
+        for row in self.rows:
+            if row['sys_id'] == sys_id:
+                row.update(values)
+
+
+def record(index, updated_on='2024-01-01 00:00:00', state='1'):
+    return {'sys_id': f"id{index:03d}", 'sys_updated_on': updated_on, 'number': f"INC{index:03d}", 'state': state}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalStore(str(tmp_path), page_size=2)
+    yield store
+    store.close_all()
+
+
+async def sync(store, instance, **kwargs):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(instance)) as client:
+        return await store.sync_table('dev', client, BASE_URL, 'incident', **kwargs)
+
+
+def numbers(store, query=''):
+    rows = store.read('dev', 'incident', query, ['number'], 100, 60, page_keys=['number'])['result']
+    return [row['number'] for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_first_sync_downloads_every_page(store):
+    instance = Instance([record(index) for index in range(5)])
+
+    result = await sync(store, instance)
+
+    assert result['mode'] == 'full'
+    assert (result['fetched'], result['rows'], result['deleted']) == (5, 5, 0)
+    assert result['watermark'] == '2024-01-01 00:00:00'
+    assert numbers(store) == [f"INC{index:03d}" for index in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_delta_sync_fetches_from_the_watermark(store):
+    instance = Instance([record(0, '2024-01-01 00:00:00'), record(1, '2024-01-02 00:00:00')])
+    await sync(store, instance)
+    instance.update('id000', sys_updated_on='2024-01-03 00:00:00', state='7')
+    instance.queries.clear()
+
+    result = await sync(store, instance)
+
+    assert result['mode'] == 'delta'
+    assert result['watermark'] == '2024-01-03 00:00:00'
+    assert instance.queries[0] == 'sys_updated_on>=2024-01-02 00:00:00^ORDERBYsys_updated_on^ORDERBYsys_id'
+    # The row at the old watermark is fetched again; the changed row is picked up
+    assert result['fetched'] == 2
+    assert numbers(store, 'state=7') == ['INC000']
+
+
+@pytest.mark.asyncio
+async def test_rows_sharing_a_timestamp_span_pages(store):
+    instance = Instance([record(index) for index in range(5)])
+
+    await sync(store, instance)
+
+    # Keyset pages continue within the same second instead of skipping to the next one
+    assert 'sys_updated_on=2024-01-01 00:00:00^sys_id>id001' in instance.queries[1]
+    assert store.get_state('dev', 'incident')['row_count'] == 5
+
+
+@pytest.mark.asyncio
+async def test_deleted_rows_are_removed_when_counts_differ(store):
+    instance = Instance([record(index) for index in range(4)])
+    await sync(store, instance)
+    del instance.rows[1]
+
+    result = await sync(store, instance)
+
+    assert result['deleted'] == 1
+    assert numbers(store) == ['INC000', 'INC002', 'INC003']
+
+
+@pytest.mark.asyncio
+async def test_sys_ids_are_not_scanned_when_counts_match(store):
+    instance = Instance([record(index) for index in range(3)])
+    await sync(store, instance)
+    instance.queries.clear()
+
+    result = await sync(store, instance)
+
+    assert result['deleted'] == 0
+    assert not any('ORDERBYsys_id' in query and 'sys_updated_on' not in query for query in instance.queries)
+
+
+@pytest.mark.asyncio
+async def test_delete_scan_continues_past_short_pages(store):
+    instance = Instance([record(index) for index in range(6)])
+    await sync(store, instance)
+    del instance.rows[5]
+    # An ACL-shortened page must not end the scan and delete the rows after it
+    instance.hidden = {'id001'}
+
+    result = await sync(store, instance)
+
+    assert result['deleted'] == 2
+    assert numbers(store) == ['INC000', 'INC002', 'INC003', 'INC004']
+
+
+@pytest.mark.asyncio
+async def test_changing_fields_resyncs_from_scratch(store):
+    instance = Instance([record(index) for index in range(2)])
+    await sync(store, instance, fields=['number'])
+
+    result = await sync(store, instance, fields=['number', 'state'])
+
+    assert result['mode'] == 'full'
+    assert store.get_state('dev', 'incident')['fields'] == ['sys_id', 'sys_updated_on', 'number', 'state']
+
+
+@pytest.mark.asyncio
+async def test_stale_or_missing_mirror_is_unavailable(store):
+    with pytest.raises(MirrorUnavailableError):
+        numbers(store)
+
+    await sync(store, Instance([record(0)]))
+    store._connect('dev').execute("UPDATE _sync_state SET synced_at = ?", (time.time() - 120,))
+
+    with pytest.raises(MirrorUnavailableError):
+        numbers(store)
@@ -0,0 +1,101 @@
+"""Tests for the mock ServiceNow instance used by the benchmarks."""
+
+import sqlite3
+
+import httpx
+import pytest
+
+from benchmarks.mock_servicenow import MockInstance, serve
+from servicenow_mcp.mcp_server.encoded_query import translate
+
+
+@pytest.fixture(scope='module')
+def instance():
+    return MockInstance(records=200)
+
+
+@pytest.fixture(scope='module')
+def base_url(instance):
+    server = serve(instance)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def numbers(instance, query):
+    return [row['number'] for row in instance.query('incident', query)]
+
+
+def test_misspelled_field_is_ignored(base_url):
+    response = httpx.get(
+        f"{base_url}/api/now/table/incident",
+        params={'sysparm_query': 'prioritty=1', 'sysparm_fields': 'number,priority', 'sysparm_limit': 5},
+        auth=('admin', 'admin')
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()['result']) == 5
+    assert response.headers['X-Total-Count'] == '200'
+
+
+def test_or_binds_tighter_than_and(instance):
+    rows = instance.query('incident', 'priority=1^ORpriority=2^state=3')
+
+    assert rows
+    assert all(row['priority'] in ('1', '2') and row['state'] == '3' for row in rows)
+
+
+def test_nq_unions_branches(instance):
+    expected = set(numbers(instance, 'priority=1')) | set(numbers(instance, 'state=7'))
+
+    assert set(numbers(instance, 'priority=1^NQstate=7')) == expected
+
+
+def test_matching_ignores_case(instance):
+    assert numbers(instance, 'category=NETWORK') == numbers(instance, 'category=network')
+    assert numbers(instance, 'short_descriptionLIKEMONITORING') == numbers(instance, '')
+
+
+def test_numeric_and_descending_order(instance):
+    rows = instance.query('incident', 'priority>=4^ORDERBYDESCpriority^ORDERBYnumber')
+
+    keys = [(-int(row['priority']), row['number']) for row in rows]
+    assert keys == sorted(keys)
+    assert {row['priority'] for row in rows} == {'4', '5'}
+
+
+def test_default_order_is_sys_id(instance):
+    rows = instance.query('incident', 'active=true')
+
+    assert [row['sys_id'] for row in rows] == sorted(row['sys_id'] for row in rows)
+
+
+def test_stats_group_by(instance):
+    groups = instance.stats('incident', {'sysparm_count': 'true', 'sysparm_group_by': 'priority'})
+
+    counts = {group['groupby_fields'][0]['value']: int(group['stats']['count']) for group in groups}
+    assert sum(counts.values()) == 200
+    assert counts['1'] == len(numbers(instance, 'priority=1'))
+
+
+@pytest.mark.parametrize('query', [
+    'priority=1^ORpriority=2^state=3^NQcategory=network',
+    'stateNOT IN1,2^active=true',
+    'short_descriptionLIKE1^priority<3',
+    'impact!=2^ORDERBYnumber',
+    'categorySTARTSWITHsoft^ORcategoryENDSWITHware',
+])
+def test_agrees_with_the_server_translator(instance, query):
+    # The mock is an independent implementation, so agreement checks both
+    columns = instance.columns['incident']
+    conn = sqlite3.connect(':memory:')
+    quoted = [f'"{column}"' for column in columns]
+    conn.execute(f"CREATE TABLE t ({', '.join(quoted)})")
+    rows = instance.query('incident', '')
+    conn.executemany(
+        f"INSERT INTO t VALUES ({', '.join('?' for _ in columns)})",
+        [[row.get(column) for column in columns] for row in rows]
+    )
+    where, params, _ = translate(query, columns)
+
+    translated = sorted(number for (number,) in conn.execute(f'SELECT number FROM t WHERE {where}', params))
+    assert sorted(numbers(instance, query)) == translated
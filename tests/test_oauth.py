@@ -0,0 +1,191 @@
+"""Tests for OAuth bearer token authentication and token sharing between processes."""
+
+import asyncio
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+from servicenow_mcp.auth.oauth import OAuthTokenAuth, new_oauth_session, session_from_token
+from servicenow_mcp.session_cache import SessionCache
+
+URL = 'https://dev.service-now.com'
+OAUTH_CONFIG = {'client_id': 'id', 'client_secret': 'secret', 'grant_type': 'password',
+                'refresh_margin_seconds': 60}
+
+
+class FakeInstance:
+    """Token endpoint and API accepting only the tokens it issued last."""
+
+    def __init__(self, reject_refresh=False):
+        self.reject_refresh = reject_refresh
+        self.grants = []
+        self.valid_token = None
+        self.api_calls = 0
+
+    def handler(self, request):
+        if request.url.path == '/oauth_token.do':
+            form = dict(httpx.QueryParams(request.content.decode()))
+            self.grants.append(form['grant_type'])
+            if form['grant_type'] == 'refresh_token' and self.reject_refresh:
+                return httpx.Response(401, json={'error': 'invalid_grant'})
+            self.valid_token = f"token{len(self.grants)}"
+            return httpx.Response(200, json={
+                'access_token': self.valid_token, 'refresh_token': f"refresh{len(self.grants)}",
+                'token_type': 'Bearer', 'expires_in': 1800
+            })
+        self.api_calls += 1
+        if request.headers.get('Authorization') != f"Bearer {self.valid_token}":
+            return httpx.Response(401)
+        return httpx.Response(200, json={'result': []})
+
+
+def client_for(instance, session_data, tokens=None, password='pw'):
+    auth = OAuthTokenAuth(
+        session_data, OAUTH_CONFIG, username='admin', password=password,
+        on_token=tokens.append if tokens is not None else None
+    )
+    return httpx.AsyncClient(auth=auth, transport=httpx.MockTransport(instance.handler))
+
+
+def session_with_token(token, expires_in=1800, refresh_token='refresh0'):
+    return session_from_token(
+        {'access_token': token, 'refresh_token': refresh_token, 'expires_in': expires_in},
+        URL, previous=new_oauth_session(URL)
+    )
+
+
+@pytest.mark.asyncio
+async def test_first_request_obtains_a_token():
+    instance = FakeInstance()
+    tokens = []
+    async with client_for(instance, new_oauth_session(URL), tokens) as client:
+        response = await client.get(f"{URL}/api/now/table/incident")
+
+    assert response.status_code == 200
+    assert instance.grants == ['password']
+    assert [token['access_token'] for token in tokens] == ['token1']
+
+
+@pytest.mark.asyncio
+async def test_token_near_expiry_is_refreshed_first():
+    instance = FakeInstance()
+    session = session_with_token('old', expires_in=30)
+    async with client_for(instance, session) as client:
+        response = await client.get(f"{URL}/api/now/table/incident")
+
+    assert response.status_code == 200
+    assert instance.grants == ['refresh_token']
+    assert instance.api_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_token_is_renewed_once_and_request_resent():
+    instance = FakeInstance()
+    instance.valid_token = 'current'
+    async with client_for(instance, session_with_token('revoked')) as client:
+        response = await client.get(f"{URL}/api/now/table/incident")
+
+    assert response.status_code == 200
+    assert instance.grants == ['refresh_token']
+    assert instance.api_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_refresh_token_falls_back_to_grant():
+    instance = FakeInstance(reject_refresh=True)
+    async with client_for(instance, session_with_token('old', expires_in=0)) as client:
+        response = await client.get(f"{URL}/api/now/table/incident")
+
+    assert response.status_code == 200
+    assert instance.grants == ['refresh_token', 'password']
+
+
+@pytest.mark.asyncio
+async def test_no_usable_grant_returns_the_401():
+    instance = FakeInstance(reject_refresh=True)
+    instance.valid_token = 'current'
+    async with client_for(instance, session_with_token('revoked'), password=None) as client:
+        response = await client.get(f"{URL}/api/now/table/incident")
+
+    assert response.status_code == 401
+    assert instance.grants == ['refresh_token']
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_renewal():
+    instance = FakeInstance()
+    async with client_for(instance, new_oauth_session(URL)) as client:
+        responses = await asyncio.gather(*(client.get(f"{URL}/api/now/table/incident") for _ in range(5)))
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert instance.grants == ['password']
+
+
+def test_adopt_keeps_the_longer_lived_token():
+    auth = OAuthTokenAuth(session_with_token('mine', expires_in=600), OAUTH_CONFIG)
+
+    auth.adopt(session_with_token('older', expires_in=300))
+    assert auth.session_data['access_token'] == 'mine'
+
+    auth.adopt(session_with_token('newer', expires_in=1800))
+    assert auth.session_data['access_token'] == 'newer'
+
+
+def test_refresh_in_another_process_does_not_invalidate(tmp_path):
+    path = str(tmp_path / 'sessions.json')
+    here = SessionCache(cache_path=path)
+    other = SessionCache(cache_path=path)
+    session = session_with_token('first')
+    here.save_session('dev', session)
+    invalidated = []
+    here.add_invalidation_listener(invalidated.append)
+
+    renewed = session_from_token({'access_token': 'second', 'expires_in': 1800}, URL, previous=session)
+    other.get_session('dev')
+    other.update_session('dev', renewed)
+
+    assert here.get_session('dev')['access_token'] == 'second'
+    assert invalidated == []
+
+    # A new login is still an invalidation
+    time.sleep(0.01)
+    other.save_session('dev', session_with_token('third'))
+    here.get_session('dev')
+    assert invalidated == ['dev']
+
+
+def test_pool_keeps_client_and_adopts_renewed_token(tmp_path):
+    from servicenow_mcp.config_manager import ConfigManager
+    from servicenow_mcp.mcp_server.session_pool import SessionPool
+
+    config_path = tmp_path / 'instances.yaml'
+    config_path.write_text(
+        f"instances:\n  dev:\n    url: {URL}\n    username: admin\n    auth: oauth\n"
+        f"    oauth:\n      client_id: id\n"
+    )
+    cache = SessionCache(cache_path=str(tmp_path / 'sessions.json'))
+    pool = SessionPool(ConfigManager(str(config_path)), cache)
+    session = session_with_token('first')
+    cache.save_session('dev', session)
+    client = pool.get_client('dev', cache.get_session('dev'))
+    pool.mark_success('dev')
+
+    renewed = session_from_token({'access_token': 'second', 'expires_in': 3600}, URL, previous=session)
+    SessionCache(cache_path=str(tmp_path / 'sessions.json')).update_session('dev', renewed)
+
+    assert pool.get_client('dev', cache.get_session('dev')) is client
+    assert client.auth.session_data['access_token'] == 'second'
+    assert pool.is_recently_verified('dev', 300)
+
+
+def test_auth_package_imports_without_http_clients():
+    code = (
+        "import sys, servicenow_mcp.auth as auth; "
+        "assert not {'httpx', 'requests'} & set(sys.modules); "
+        "assert auth.OAuthTokenAuth.__name__ == 'OAuthTokenAuth'"
+    )
+
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,104 @@
+"""Tests for keyset pagination cursors."""
+
+import pytest
+
+from servicenow_mcp.mcp_server.pagination import (
+    build_page_query,
+    decode_cursor,
+    encode_cursor,
+    next_page_cursor,
+)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('incident', 'active=true', 'sys_updated_on', ['2024-01-01 00:00:00', 'abc'])
+
+    state = decode_cursor(cursor)
+
+    assert state['t'] == 'incident'
+    assert state['q'] == 'active=true'
+    assert state['o'] == 'sys_updated_on'
+    assert state['k'] == ['2024-01-01 00:00:00', 'abc']
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor('incident', 'short_descriptionLIKE??>>', 'sys_id', ['~~~'])
+
+    assert '=' not in cursor
+    assert all(c.isalnum() or c in '-_' for c in cursor)
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor', encode_cursor('incident', '', 'number', ['1'])])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_first_page_query():
+    assert build_page_query('active=true', 'sys_id') == 'active=true^ORDERBYsys_id'
+    assert build_page_query('', 'sys_updated_on') == 'ORDERBYsys_updated_on^ORDERBYsys_id'
+
+
+def test_next_page_query_by_sys_id():
+    assert build_page_query('active=true', 'sys_id', ['abc']) == 'active=true^sys_id>abc^ORDERBYsys_id'
+
+
+def test_next_page_query_by_compound_key():
+    query = build_page_query('active=true', 'sys_updated_on', ['2024-01-01 00:00:00', 'abc'])
+
+    assert query == (
+        'active=true^sys_updated_on>2024-01-01 00:00:00'
+        '^NQactive=true^sys_updated_on=2024-01-01 00:00:00^sys_id>abc'
+        '^ORDERBYsys_updated_on^ORDERBYsys_id'
+    )
+
+
+@pytest.mark.parametrize('query, order_by', [
+    ('active=true^ORDERBYnumber', 'sys_id'),
+    ('active=true', 'number'),
+])
+def test_rejected_page_queries(query, order_by):
+    with pytest.raises(ValueError):
+        build_page_query(query, order_by)
+
+
+def test_compound_key_rejects_nq():
+    with pytest.raises(ValueError):
+        build_page_query('a=1^NQb=2', 'sys_updated_on', ['2024-01-01 00:00:00', 'abc'])
+
+
+def test_next_page_cursor_resumes_after_last_record():
+    records = [
+        {'sys_id': 'a', 'sys_updated_on': '2024-01-01 00:00:00'},
+        {'sys_id': 'b', 'sys_updated_on': '2024-01-02 00:00:00'},
+    ]
+
+    cursor = next_page_cursor('incident', 'active=true', 'sys_updated_on', records)
+    state = decode_cursor(cursor)
+
+    assert state['k'] == ['2024-01-02 00:00:00', 'b']
+    assert build_page_query(state['q'], state['o'], state['k']).startswith(
+        'active=true^sys_updated_on>2024-01-02 00:00:00'
+    )
+
+
+def test_next_page_cursor_reads_display_value_pairs():
+    records = [{'sys_id': {'value': 'abc', 'display_value': 'abc'}}]
+
+    cursor = next_page_cursor('incident', '', 'sys_id', records)
+
+    assert decode_cursor(cursor)['k'] == ['abc']
+
+
+def test_short_page_still_has_a_cursor():
+    # ACLs can hide rows after the limit is applied, so only an empty page is the last
+    assert next_page_cursor('incident', '', 'sys_id', [{'sys_id': 'a'}]) is not None
+
+
+def test_empty_page_has_no_cursor():
+    assert next_page_cursor('incident', '', 'sys_id', []) is None
+
+
+def test_missing_page_key():
+    with pytest.raises(ValueError, match='sys_updated_on'):
+        next_page_cursor('incident', '', 'sys_updated_on', [{'sys_id': 'a'}])
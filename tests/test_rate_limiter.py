@@ -0,0 +1,157 @@
+"""Tests for per-instance admission control."""
+
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from servicenow_mcp.mcp_server.rate_limiter import (
+    AdmissionController,
+    AdmissionTransport,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=50, burst=3)
+
+    started = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+    burst_seconds = time.monotonic() - started
+    await bucket.acquire()
+    paced_seconds = time.monotonic() - started
+
+    assert burst_seconds < 0.01
+    assert paced_seconds >= 0.015
+
+
+@pytest.mark.asyncio
+async def test_bucket_without_rate_never_waits():
+    bucket = TokenBucket(rate=0, burst=1)
+
+    await asyncio.wait_for(asyncio.gather(*(bucket.acquire() for _ in range(100))), 0.1)
+
+
+@pytest.mark.asyncio
+async def test_window_grows_additively_on_success():
+    controller = AdmissionController(requests_per_second=0, initial_concurrency=2, max_concurrency=3)
+
+    # 2 -> 2.5 -> 2.9 -> 3.24: about one more slot per window's worth of successes
+    for _ in range(2):
+        await controller.acquire()
+        await controller.release(200)
+    assert controller.window == 2
+    await controller.acquire()
+    await controller.release(200)
+    assert controller.window == 3
+
+    for _ in range(10):
+        await controller.acquire()
+        await controller.release(200)
+    assert controller.window == 3
+
+
+@pytest.mark.asyncio
+async def test_window_halves_once_per_interval_on_throttling():
+    controller = AdmissionController(
+        requests_per_second=0, initial_concurrency=8, min_concurrency=1, decrease_interval_seconds=60
+    )
+
+    for _ in range(3):
+        await controller.acquire()
+        await controller.release(429)
+
+    assert controller.window == 4
+    assert controller.get_stats()['throttled'] == 3
+
+
+@pytest.mark.asyncio
+async def test_window_limits_requests_in_flight():
+    controller = AdmissionController(requests_per_second=0, initial_concurrency=1)
+    await controller.acquire()
+
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await controller.release(200)
+    await asyncio.wait_for(waiter, 1)
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_new_requests():
+    controller = AdmissionController(requests_per_second=0)
+    await controller.acquire()
+    await controller.release(429, retry_after=0.05)
+
+    started = time.monotonic()
+    await controller.acquire()
+
+    assert time.monotonic() - started >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_cancelled_token_wait_releases_the_slot():
+    controller = AdmissionController(requests_per_second=1, burst=1, initial_concurrency=2)
+    await controller.acquire()
+
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert controller.get_stats()['in_flight'] == 1
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('3', 3.0),
+    ('1.5', 1.5),
+    ('-4', 0.0),
+    ('', None),
+    (None, None),
+    ('soon', None),
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert 25 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+
+async def send(method, statuses):
+    """Send one request through AdmissionTransport; the instance answers statuses in turn."""
+    answers = iter(statuses)
+    sent = []
+
+    def handler(request):
+        sent.append(request.method)
+        return httpx.Response(next(answers), headers={'Retry-After': '0'})
+
+    transport = AdmissionTransport(
+        httpx.MockTransport(handler), AdmissionController(requests_per_second=0), max_retries=3
+    )
+    response = await transport.handle_async_request(httpx.Request(method, 'https://dev.service-now.com/x'))
+    return response.status_code, len(sent)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('method, statuses, expected', [
+    ('GET', [429, 503, 200], (200, 3)),
+    ('POST', [429, 201], (201, 2)),
+    ('POST', [503, 201], (503, 1)),
+    ('PATCH', [503], (503, 1)),
+    ('GET', [429, 429, 429, 429, 200], (429, 4)),
+])
+async def test_transport_retries(method, statuses, expected):
+    assert await send(method, statuses) == expected
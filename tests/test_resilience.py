@@ -0,0 +1,240 @@
+"""Tests for read retries and the per-instance circuit breaker."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from servicenow_mcp.mcp_server import resilience
+from servicenow_mcp.mcp_server.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilienceTransport,
+    backoff_delay,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, 'backoff_delay', lambda attempt, base, cap: 0)
+
+
+def make_transport(handler, breaker=None, max_retries=2):
+    return ResilienceTransport(
+        httpx.MockTransport(handler), breaker or CircuitBreaker(), 'dev', max_retries=max_retries
+    )
+
+
+async def send(transport, method='GET'):
+    async with httpx.AsyncClient(transport=transport, base_url='https://dev.service-now.com') as client:
+        return await client.request(method, '/api/now/table/incident')
+
+
+def open_breaker(cooldown_seconds=30):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=cooldown_seconds)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_backoff_delay_is_capped():
+    assert 0 <= backoff_delay(10, base_seconds=0.5, max_seconds=2) <= 2
+
+
+class TestCircuitBreaker:
+    def test_opens_at_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.before_request('dev')
+
+        breaker.record_failure()
+
+        assert breaker.state == 'open'
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request('dev')
+        assert breaker.get_stats()['rejected'] == 1
+
+    def test_success_resets_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == 'closed'
+
+    def test_half_open_admits_a_single_probe(self):
+        breaker = open_breaker(cooldown_seconds=0)
+
+        breaker.before_request('dev')
+
+        assert breaker.state == 'half_open'
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request('dev')
+        assert breaker.get_stats()['probes'] == 1
+
+    def test_successful_probe_closes(self):
+        breaker = open_breaker(cooldown_seconds=0)
+        breaker.before_request('dev')
+
+        breaker.record_success()
+
+        assert breaker.state == 'closed'
+        breaker.before_request('dev')
+        breaker.before_request('dev')
+
+    def test_failed_probe_reopens_for_another_cooldown(self):
+        breaker = open_breaker(cooldown_seconds=0)
+        breaker.before_request('dev')
+        breaker.cooldown_seconds = 30
+
+        breaker.record_failure()
+
+        assert breaker.state == 'open'
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request('dev')
+        assert breaker.get_stats()['opened'] == 2
+
+    def test_abandoned_probe_frees_the_slot(self):
+        breaker = open_breaker(cooldown_seconds=0)
+        breaker.before_request('dev')
+
+        breaker.record_abandoned()
+
+        breaker.before_request('dev')
+        assert breaker.state == 'half_open'
+
+    def test_stays_open_during_cooldown(self):
+        breaker = open_breaker(cooldown_seconds=30)
+        breaker._opened_at = time.monotonic() - 29
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request('dev')
+        assert breaker.state == 'open'
+
+
+class TestResilienceTransport:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('status', [502, 504])
+    async def test_get_retried_on_gateway_errors(self, status):
+        statuses = [status, 200]
+
+        def handler(request):
+            return httpx.Response(statuses.pop(0))
+
+        breaker = CircuitBreaker()
+        response = await send(make_transport(handler, breaker))
+
+        assert response.status_code == 200
+        assert breaker.get_stats()['retries'] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_retried_on_connect_error(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError('refused', request=request)
+            return httpx.Response(200)
+
+        response = await send(make_transport(handler))
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_stop_at_max_retries(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+
+        response = await send(make_transport(handler, max_retries=2))
+
+        assert response.status_code == 502
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_post_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+
+        response = await send(make_transport(handler), method='POST')
+
+        assert response.status_code == 502
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout('slow', request=request)
+
+        with pytest.raises(httpx.ReadTimeout):
+            await send(make_transport(handler))
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_server_error_without_retry_status_returned(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500)
+
+        response = await send(make_transport(handler))
+
+        assert response.status_code == 500
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_rejects_without_sending(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200)
+
+        with pytest.raises(CircuitOpenError):
+            await send(make_transport(handler, open_breaker()))
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_failures_open_the_circuit(self):
+        def handler(request):
+            raise httpx.ConnectError('refused', request=request)
+
+        breaker = CircuitBreaker(failure_threshold=2)
+        transport = make_transport(handler, breaker, max_retries=5)
+
+        with pytest.raises(CircuitOpenError):
+            await send(transport)
+        assert breaker.state == 'open'
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_the_slot(self):
+        started = asyncio.Event()
+
+        async def slow(request):
+            started.set()
+            await asyncio.sleep(10)
+            return httpx.Response(200)
+
+        breaker = open_breaker(cooldown_seconds=0)
+        transport = make_transport(slow, breaker)
+        task = asyncio.ensure_future(send(transport))
+        await started.wait()
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        breaker.before_request('dev')
+        assert breaker.state == 'half_open'
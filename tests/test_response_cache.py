@@ -0,0 +1,106 @@
+"""Tests for the read-through cache of slow-changing tables."""
+
+import pytest
+
+from servicenow_mcp.mcp_server import response_cache
+from servicenow_mcp.mcp_server.response_cache import ResponseCache
+
+URL = 'https://dev.service-now.com/api/now/table/sys_properties'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, 'monotonic', clock)
+    return clock
+
+
+def key(cache, table='sys_properties', instance='dev', **params):
+    return cache.make_key(instance, table, URL, params)
+
+
+def test_only_configured_tables_are_cached():
+    cache = ResponseCache({'sys_properties': 60, 'incident': 0})
+
+    assert key(cache, 'incident') is None
+    assert key(cache, 'sys_user') is None
+    cache.put(None, {'result': []})
+    assert cache.get(None) is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_key_ignores_parameter_order():
+    cache = ResponseCache({'sys_properties': 60})
+
+    first = cache.make_key('dev', 'sys_properties', URL, {'sysparm_limit': 10, 'sysparm_query': 'a=b'})
+    second = cache.make_key('dev', 'sys_properties', URL, {'sysparm_query': 'a=b', 'sysparm_limit': '10'})
+
+    assert first == second
+    assert first != key(cache, sysparm_query='a=c', sysparm_limit=10)
+
+
+def test_entries_expire_after_their_table_ttl(clock):
+    cache = ResponseCache({'sys_properties': 60, 'sys_choice': 600})
+    cache.put(key(cache), {'result': 'properties'})
+    cache.put(key(cache, 'sys_choice'), {'result': 'choices'})
+
+    clock.now += 59
+    assert cache.get(key(cache)) == {'result': 'properties'}
+
+    clock.now += 1
+    assert cache.get(key(cache)) is None
+    assert cache.get(key(cache, 'sys_choice')) == {'result': 'choices'}
+    assert cache.get_stats()['expirations'] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache({'sys_properties': 60}, max_entries=2)
+    first, second, third = (key(cache, sysparm_query=f"name={name}") for name in 'abc')
+    cache.put(first, {'result': 1})
+    cache.put(second, {'result': 2})
+
+    cache.get(first)
+    cache.put(third, {'result': 3})
+
+    assert cache.get(second) is None
+    assert cache.get(first) == {'result': 1}
+    assert cache.get(third) == {'result': 3}
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_invalidate_drops_only_the_written_table_on_that_instance(clock):
+    cache = ResponseCache({'sys_properties': 60, 'sys_choice': 60})
+    cache.put(key(cache), {'result': 1})
+    cache.put(key(cache, instance='prod'), {'result': 2})
+    cache.put(key(cache, 'sys_choice'), {'result': 3})
+
+    cache.invalidate('dev', 'sys_properties')
+
+    assert cache.get(key(cache)) is None
+    assert cache.get(key(cache, instance='prod')) == {'result': 2}
+    assert cache.get(key(cache, 'sys_choice')) == {'result': 3}
+
+    cache.invalidate()
+    assert cache.get_stats()['entries'] == 0
+    assert cache.get_stats()['invalidations'] == 3
+
+
+def test_stats_report_hit_rate(clock):
+    cache = ResponseCache({'sys_properties': 60})
+    assert cache.get_stats()['hit_rate'] is None
+
+    cache.get(key(cache))
+    cache.put(key(cache), {'result': []})
+    cache.get(key(cache))
+    cache.get(key(cache))
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (2, 1, 0.667)
@@ -0,0 +1,123 @@
+"""Tests for the schema catalog and its incremental refresh."""
+
+import httpx
+import pytest
+
+from benchmarks.mock_servicenow import _sort_key, compile_query
+from servicenow_mcp.mcp_server.schema_catalog import SchemaCatalog
+
+BASE_URL = 'https://dev.service-now.com'
+COLUMNS = {
+    'sys_db_object': ['sys_id', 'name', 'label', 'super_class.name', 'sys_updated_on'],
+    'sys_dictionary': [
+        'sys_id', 'name', 'element', 'column_label', 'internal_type', 'mandatory', 'max_length',
+        'reference', 'sys_updated_on'
+    ],
+}
+
+
+class Instance:
+    """Table API serving sys_db_object and sys_dictionary from lists of rows."""
+
+    def __init__(self):
+        self.rows = {
+            'sys_db_object': [
+                {'sys_id': 't1', 'name': 'task', 'label': 'Task', 'super_class.name': '',
+                 'sys_updated_on': '2024-01-01 00:00:00'},
+                {'sys_id': 't2', 'name': 'incident', 'label': 'Incident', 'super_class.name': 'task',
+                 'sys_updated_on': '2024-01-01 00:00:00'},
+            ],
+            'sys_dictionary': [
+                field('d1', 'task', 'number'),
+                field('d2', 'task', 'short_description'),
+                field('d3', 'incident', 'severity'),
+                field('d4', 'incident', 'u_legacy'),
+            ],
+        }
+        self.requests = []
+
+    def __call__(self, request):
+        table = request.url.path.rsplit('/', 1)[-1]
+        params = request.url.params
+        self.requests.append((table, params.get('sysparm_fields')))
+        matches, order_by = compile_query(params.get('sysparm_query', ''), COLUMNS[table])
+        rows = [row for row in self.rows[table] if matches(row)]
+        for name, descending in reversed(order_by):
+            rows.sort(key=lambda row: _sort_key(row.get(name)), reverse=descending)
+        total = len(rows)
+        rows = rows[:int(params.get('sysparm_limit', 10000))]
+        fields = params['sysparm_fields'].split(',')
+        rows = [{name: row.get(name) for name in fields} for row in rows]
+        return httpx.Response(200, headers={'X-Total-Count': str(total)}, json={'result': rows})
+
+
+def field(sys_id, table, element, updated_on='2024-01-01 00:00:00', **attributes):
+    return {'sys_id': sys_id, 'name': table, 'element': element, 'sys_updated_on': updated_on, **attributes}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return SchemaCatalog(str(tmp_path), refresh_interval_seconds=0)
+
+
+async def elements(catalog, instance, table='incident'):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(instance)) as client:
+        schema = await catalog.get_table_schema('dev', client, BASE_URL, table)
+    return sorted(entry['element'] for entry in schema['result'])
+
+
+@pytest.mark.asyncio
+async def test_schema_includes_inherited_fields(catalog):
+    instance = Instance()
+
+    assert await elements(catalog, instance) == ['number', 'severity', 'short_description', 'u_legacy']
+
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_changed_and_added_fields(catalog):
+    instance = Instance()
+    await elements(catalog, instance)
+    instance.rows['sys_dictionary'][2]['column_label'] = 'Impact'
+    instance.rows['sys_dictionary'][2]['sys_updated_on'] = '2024-01-02 00:00:00'
+    instance.rows['sys_dictionary'].append(field('d5', 'incident', 'u_new', '2024-01-02 00:00:00'))
+
+    assert await elements(catalog, instance) == [
+        'number', 'severity', 'short_description', 'u_legacy', 'u_new'
+    ]
+    assert catalog.get_fields('dev', 'incident')['severity']['column_label'] == 'Impact'
+
+
+@pytest.mark.asyncio
+async def test_refresh_removes_deleted_fields(catalog, tmp_path):
+    instance = Instance()
+    await elements(catalog, instance)
+    del instance.rows['sys_dictionary'][3]
+    del instance.rows['sys_dictionary'][1]
+
+    assert await elements(catalog, instance) == ['number', 'severity']
+
+    # The removal is saved, not only applied in memory
+    reloaded = SchemaCatalog(str(tmp_path), refresh_interval_seconds=3600)
+    assert sorted(reloaded.get_fields('dev', 'incident')) == ['number', 'severity']
+
+
+@pytest.mark.asyncio
+async def test_removal_is_detected_alongside_an_addition(catalog):
+    instance = Instance()
+    await elements(catalog, instance)
+    del instance.rows['sys_dictionary'][3]
+    instance.rows['sys_dictionary'].append(field('d5', 'incident', 'u_new', '2024-01-02 00:00:00'))
+
+    assert await elements(catalog, instance) == ['number', 'severity', 'short_description', 'u_new']
+
+
+@pytest.mark.asyncio
+async def test_dictionary_is_not_scanned_when_counts_match(catalog):
+    instance = Instance()
+    await elements(catalog, instance)
+    instance.requests.clear()
+
+    await elements(catalog, instance)
+
+    assert ('sys_dictionary', 'sys_id,name,element') not in instance.requests
+    assert ('sys_dictionary', 'sys_id') in instance.requests
@@ -0,0 +1,74 @@
+"""Tests for encoding tool results within a byte budget."""
+
+import json
+
+import pytest
+
+from servicenow_mcp.mcp_server.pagination import decode_cursor, encode_cursor
+from servicenow_mcp.mcp_server.serialization import encode_result
+
+
+def records(count):
+    return [{'sys_id': f'{i:04d}', 'short_description': 'x' * 50} for i in range(count)]
+
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_result_within_budget_is_unchanged(fast):
+    result = {'result': records(3)}
+
+    text = encode_result(result, max_bytes=10000, fast=fast)
+
+    assert json.loads(text) == result
+
+
+def test_truncates_at_row_boundary():
+    result = {'result': records(100)}
+
+    text = encode_result(result, max_bytes=2000)
+    encoded = json.loads(text)
+
+    assert len(text.encode('utf-8')) <= 2000
+    kept = encoded['truncated']['rows_returned']
+    assert 0 < kept < 100
+    assert encoded['result'] == records(100)[:kept]
+    assert encoded['truncated']['rows_omitted'] == 100 - kept
+    assert encoded['truncated']['max_output_bytes'] == 2000
+
+
+def test_unpaginated_truncation_hints_at_pagination():
+    encoded = json.loads(encode_result({'result': records(100)}, max_bytes=2000))
+
+    assert 'next_cursor' not in encoded
+    assert 'paginate=true' in encoded['truncated']['hint']
+
+
+def test_paginated_truncation_resumes_after_last_kept_row():
+    cursor = encode_cursor('incident', 'active=true', 'sys_id', ['9999'])
+    result = {'result': records(100), 'next_cursor': cursor}
+
+    encoded = json.loads(encode_result(result, max_bytes=2000))
+    state = decode_cursor(encoded['next_cursor'])
+
+    last_kept = encoded['result'][-1]['sys_id']
+    assert state['k'] == [last_kept]
+    assert state['t'] == 'incident'
+    assert state['q'] == 'active=true'
+
+
+def test_table_format_truncation():
+    encoded = json.loads(encode_result({'result': records(100)}, output_format='table', max_bytes=2000))
+
+    assert encoded['fields'] == ['sys_id', 'short_description']
+    assert len(encoded['rows']) == encoded['truncated']['rows_returned']
+    assert 'result' not in encoded
+
+
+def test_non_list_results_are_not_truncated():
+    result = {'result': {'short_description': 'x' * 5000}}
+
+    assert json.loads(encode_result(result, max_bytes=100)) == result
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        encode_result({'result': []}, output_format='xml')
@@ -0,0 +1,169 @@
+"""Tests for the shared session cache file."""
+
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from servicenow_mcp.session_cache import SessionCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'sessions.json')
+
+
+def read_file(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def expire(path, instance_name):
+    """Move an instance's expiry into the past, as another process would have written it."""
+    data = read_file(path)
+    data[instance_name]['expires_at'] = (datetime.now() - timedelta(minutes=1)).isoformat()
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def test_save_and_get(cache_path):
+    cache = SessionCache(cache_path=cache_path)
+
+    cache.save_session('dev', {'token': 'a'})
+
+    assert cache.get_session('dev') == {'token': 'a'}
+    assert SessionCache(cache_path=cache_path).get_session('dev') == {'token': 'a'}
+
+
+def test_writers_merge_instead_of_overwriting(cache_path):
+    first = SessionCache(cache_path=cache_path)
+    second = SessionCache(cache_path=cache_path)
+
+    first.save_session('dev', {'token': 'a'})
+    second.save_session('prod', {'token': 'b'})
+
+    assert set(read_file(cache_path)) == {'dev', 'prod'}
+    assert first.get_session('prod') == {'token': 'b'}
+
+
+def test_invalidation_is_merged(cache_path):
+    first = SessionCache(cache_path=cache_path)
+    second = SessionCache(cache_path=cache_path)
+    first.save_session('dev', {'token': 'a'})
+    first.save_session('prod', {'token': 'b'})
+
+    second.invalidate_session('dev')
+
+    assert first.get_session('dev') is None
+    assert first.get_session('prod') == {'token': 'b'}
+
+
+def test_concurrent_writers_keep_every_session(cache_path):
+    caches = [SessionCache(cache_path=cache_path) for _ in range(8)]
+
+    def save(index):
+        for round_number in range(10):
+            caches[index].save_session(f'instance{index}', {'round': round_number})
+
+    threads = [threading.Thread(target=save, args=(index,)) for index in range(len(caches))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    data = read_file(cache_path)
+    assert {name: entry['session'] for name, entry in data.items()} == {
+        f'instance{index}': {'round': 9} for index in range(len(caches))
+    }
+
+
+def test_batch_writes_once(cache_path, monkeypatch):
+    cache = SessionCache(cache_path=cache_path)
+    writes = []
+    save_cache = cache._save_cache
+    monkeypatch.setattr(cache, '_save_cache', lambda: writes.append(1) or save_cache())
+
+    with cache.batch():
+        cache.save_session('dev', {'token': 'a'})
+        cache.save_session('prod', {'token': 'b'})
+        cache.invalidate_session('dev')
+        assert cache.get_session('prod') == {'token': 'b'}
+
+    assert len(writes) == 1
+    assert set(read_file(cache_path)) == {'prod'}
+
+
+def test_batch_changes_survive_a_reload(cache_path):
+    cache = SessionCache(cache_path=cache_path)
+    other = SessionCache(cache_path=cache_path)
+
+    with cache.batch():
+        cache.save_session('dev', {'token': 'a'})
+        other.save_session('prod', {'token': 'b'})
+        # Reloading the file written by the other process keeps the unwritten session
+        assert cache.get_session('prod') == {'token': 'b'}
+        assert cache.get_session('dev') == {'token': 'a'}
+
+    assert set(read_file(cache_path)) == {'dev', 'prod'}
+
+
+def test_expiry_does_not_write(cache_path):
+    cache = SessionCache(cache_path=cache_path)
+    cache.save_session('dev', {'token': 'a'})
+    expire(cache_path, 'dev')
+    with open(cache_path) as f:
+        before = f.read()
+
+    assert cache.get_session('dev') is None
+    with open(cache_path) as f:
+        assert f.read() == before
+
+
+def test_expired_sessions_pruned_on_next_write(cache_path):
+    cache = SessionCache(cache_path=cache_path)
+    cache.save_session('dev', {'token': 'a'})
+    expire(cache_path, 'dev')
+
+    cache.save_session('prod', {'token': 'b'})
+
+    assert set(read_file(cache_path)) == {'prod'}
+
+
+def test_listeners_hear_about_other_processes(cache_path):
+    cache = SessionCache(cache_path=cache_path)
+    other = SessionCache(cache_path=cache_path)
+    cache.save_session('dev', {'token': 'a'})
+    invalidated = []
+    cache.add_invalidation_listener(invalidated.append)
+
+    other.save_session('dev', {'token': 'new'})
+    cache.get_session('dev')
+
+    assert invalidated == ['dev']
+
+
+def test_update_session_keeps_expiry(cache_path):
+    cache = SessionCache(cache_path=cache_path)
+    cache.save_session('dev', {'token': 'a'})
+    expires_at = read_file(cache_path)['dev']['expires_at']
+    invalidated = []
+    cache.add_invalidation_listener(invalidated.append)
+
+    cache.update_session('dev', {'token': 'renewed'})
+
+    assert read_file(cache_path)['dev']['expires_at'] == expires_at
+    assert cache.get_session('dev') == {'token': 'renewed'}
+    assert invalidated == []
+
+
+def test_clear_all(cache_path):
+    cache = SessionCache(cache_path=cache_path)
+    cache.save_session('dev', {'token': 'a'})
+    invalidated = []
+    cache.add_invalidation_listener(invalidated.append)
+
+    cache.clear_all()
+
+    assert read_file(cache_path) == {}
+    assert invalidated == [None]
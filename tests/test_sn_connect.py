@@ -0,0 +1,102 @@
+"""Tests for connecting several instances from sn-connect."""
+
+import json
+import threading
+
+import pytest
+
+from servicenow_mcp.cli import sn_connect
+from servicenow_mcp.config_manager import ConfigManager
+from servicenow_mcp.session_cache import SessionCache
+
+INSTANCES = ('good', 'stale', 'new', 'slow')
+
+
+class FakeAuth:
+    """Accepts cached sessions marked valid; 'slow' logs in only once released."""
+
+    release = None
+
+    def __init__(self, instance_url, **kwargs):
+        self.name = instance_url.split('//')[1].split('.')[0]
+
+    def verify_session(self, session):
+        return session.get('valid', False)
+
+    def authenticate(self, interactive=True):
+        if self.name == 'slow':
+            assert FakeAuth.release.wait(5)
+        return {'valid': True, 'login': self.name}
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    config_path = tmp_path / 'instances.yaml'
+    config_path.write_text('instances:\n' + ''.join(
+        f"  {name}:\n    url: https://{name}.service-now.com\n    username: admin\n    password: pw\n"
+        for name in INSTANCES
+    ))
+    cache = SessionCache(cache_path=str(tmp_path / 'sessions.json'))
+    cache.save_session('good', {'valid': True, 'login': 'cached'})
+    cache.save_session('stale', {'valid': False})
+    FakeAuth.release = threading.Event()
+    monkeypatch.setattr(sn_connect, 'ServiceNowAuth', FakeAuth)
+    return ConfigManager(str(config_path)), cache
+
+
+def on_disk(cache):
+    with open(cache.cache_path) as f:
+        return {name: entry['session'] for name, entry in json.load(f).items()}
+
+
+def test_statuses(setup):
+    config_manager, cache = setup
+    FakeAuth.release.set()
+
+    results = sn_connect.connect_instances(list(INSTANCES), config_manager, cache)
+
+    assert [result['status'] for result in results] == ['verified', 'authenticated', 'authenticated', 'authenticated']
+    assert on_disk(cache) == {
+        'good': {'valid': True, 'login': 'cached'},
+        'stale': {'valid': True, 'login': 'stale'},
+        'new': {'valid': True, 'login': 'new'},
+        'slow': {'valid': True, 'login': 'slow'},
+    }
+
+
+def test_sessions_are_saved_before_slow_logins_finish(setup):
+    config_manager, cache = setup
+    results = []
+    thread = threading.Thread(
+        target=lambda: results.extend(sn_connect.connect_instances(list(INSTANCES), config_manager, cache))
+    )
+    thread.start()
+    try:
+        for _ in range(100):
+            if 'new' in on_disk(cache):
+                break
+            thread.join(0.05)
+        assert on_disk(cache)['new'] == {'valid': True, 'login': 'new'}
+        assert 'slow' not in on_disk(cache)
+    finally:
+        FakeAuth.release.set()
+        thread.join()
+
+    assert on_disk(cache)['slow'] == {'valid': True, 'login': 'slow'}
+
+
+def test_verification_writes_are_coalesced(setup, monkeypatch):
+    config_manager, cache = setup
+    cache.save_session('new', {'valid': False})
+    cache.save_session('slow', {'valid': False})
+    writes = []
+    save_cache = cache._save_cache
+    monkeypatch.setattr(cache, '_save_cache', lambda: writes.append(dict(cache._pending)) or save_cache())
+    FakeAuth.release.set()
+
+    sn_connect.connect_instances(list(INSTANCES), config_manager, cache, force=False)
+
+    # One write removing the three stale sessions, then one per new login
+    removals = [write for write in writes if write and all(entry is None for entry in write.values())]
+    assert removals == [{'stale': None, 'new': None, 'slow': None}]
+    assert len(writes) == 4
@@ -0,0 +1,59 @@
+"""Tests for validating tool calls against the schema catalog."""
+
+import httpx
+import pytest
+
+BASE_URL = 'https://dev.service-now.com'
+FETCH = "validation:\n  fetch_missing_schemas: true\n"
+
+
+def client_answering(status_code, requests):
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(status_code, json={'error': {'message': 'nope'}})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def validate(server, client, query='prioritty=1'):
+    return await server._validate_call(
+        'get_records', client, BASE_URL, {'instance': 'dev', 'table': 'incident', 'query': query}
+    )
+
+
+@pytest.mark.asyncio
+async def test_no_requests_by_default(make_server):
+    server = make_server()
+    requests = []
+
+    assert await validate(server, client_answering(200, requests)) == []
+    assert requests == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('status_code', [403, 404])
+async def test_definite_failures_are_remembered(make_server, status_code):
+    server = make_server(FETCH)
+    requests = []
+    client = client_answering(status_code, requests)
+
+    await validate(server, client)
+    sent = len(requests)
+    await validate(server, client)
+
+    assert sent > 0
+    assert len(requests) == sent
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('status_code', [401, 500])
+async def test_other_failures_are_retried(make_server, status_code):
+    server = make_server(FETCH)
+    requests = []
+    client = client_answering(status_code, requests)
+
+    await validate(server, client)
+    sent = len(requests)
+    await validate(server, client)
+
+    assert sent > 0
+    assert len(requests) == 2 * sent